@@ -0,0 +1,56 @@
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from benchmarks.standin_server import STANDIN_SERVER
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.configuration_table import ConfigurationTable, build_configuration_table
+from fmbp.const import CONTEXT_DATA
+from fmbp.model_interface import UVLLSPInterface
+
+
+THREADS = 100
+# 60 points of the level attribute of the synthetic model's Env
+DOMAIN = {"level": range(60)}
+PROCESS_COUNTS = (1, 4)
+LOOKUPS = 100_000
+
+
+def measure(lsp: Path, processes: int) -> tuple[float, float, float]:
+    """
+    :return: Time to build the table in seconds, per lookup in the table and per live solve in microseconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        model = Path(directory) / "model.uvl"
+        model.write_text(synthetic_uvl(THREADS, 1))
+        path = Path(directory) / "model.table"
+        start = time.perf_counter()
+        build_configuration_table(partial(UVLLSPInterface, model, lsp), DOMAIN, path, model, lsp, processes)
+        build = time.perf_counter() - start
+
+        table = ConfigurationTable(path, model, lsp)
+        contexts: list[CONTEXT_DATA] = [{"level": level} for level in DOMAIN["level"]]
+        start = time.perf_counter()
+        for number in range(LOOKUPS):
+            table.lookup(contexts[number % len(contexts)])
+        lookup = (time.perf_counter() - start) / LOOKUPS * 1e6
+        table.close()
+
+        interface = UVLLSPInterface(model, lsp)
+        start = time.perf_counter()
+        for context in contexts:
+            interface.acquire_configuration(context)
+        solve = (time.perf_counter() - start) / len(contexts) * 1e6
+        interface.close_uvl()
+        return build, lookup, solve
+
+
+if __name__ == "__main__":
+    # the stand-in server unless the path to another one is given
+    server_path = Path(sys.argv[1]).resolve() if len(sys.argv) > 1 else STANDIN_SERVER
+    print(f"{'processes':>10} {'build s':>8} {'lookup us':>10} {'live solve us':>14}")
+    for process_count in PROCESS_COUNTS:
+        build_time, lookup_time, solve_time = measure(server_path, process_count)
+        print(f"{process_count:>10} {build_time:>8.2f} {lookup_time:>10.2f} {solve_time:>14.1f}")
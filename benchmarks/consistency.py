@@ -0,0 +1,49 @@
+import time
+
+from fmbp.bp_model import BThreadFeature, EventAttribute
+from fmbp.consistency_checker import StaticConsistencyChecker
+
+
+THREAD_COUNTS = (10, 100, 1_000)
+EVENT_COUNTS = (1, 10, 50)
+REPETITIONS = 200
+
+
+def b_threads(threads: int, events: int) -> dict[str, BThreadFeature]:
+    return {
+        f"T{thread}": BThreadFeature(
+            f"T{thread}",
+            tuple(EventAttribute(f"E{event}", requested=True, priority=event % 3) for event in range(events)),
+        )
+        for thread in range(threads)
+    }
+
+
+def measure(threads: int, events: int, consistent: bool) -> float:
+    """
+    :return: Time per check in microseconds.
+    """
+    model_info = b_threads(threads, events)
+    runtime = tuple(model_info.values())
+    if not consistent:
+        # one diverging priority per b-thread
+        runtime = tuple(
+            BThreadFeature(b_thread.name, b_thread.events[:-1] + (EventAttribute(f"E{events - 1}", priority=9),))
+            for b_thread in runtime
+        )
+    checker = StaticConsistencyChecker(model_info)
+    checker.check_event_consistency(runtime)
+    start = time.perf_counter()
+    for _ in range(REPETITIONS):
+        checker.check_event_consistency(runtime)
+    return (time.perf_counter() - start) / REPETITIONS * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'threads':>8} {'events':>7} {'consistent us':>14} {'diverged us':>12}")
+    for thread_count in THREAD_COUNTS:
+        for event_count in EVENT_COUNTS:
+            print(
+                f"{thread_count:>8} {event_count:>7} {measure(thread_count, event_count, True):>14.1f} "
+                f"{measure(thread_count, event_count, False):>12.1f}"
+            )
@@ -0,0 +1,45 @@
+import json
+import time
+
+from benchmarks.synthetic import synthetic_export, synthetic_uvl
+from fmbp.fm import Feature
+from fmbp.model_interface import _incremental_changes, _refresh_features
+
+
+THREAD_COUNTS = (100, 1_000, 10_000)
+EVENTS = 5
+
+
+def measure(threads: int) -> tuple[int, int, float, float, float]:
+    """
+    Edits one Config attribute of a synthetic model.
+
+    :return: Full and incremental change size in bytes, time to compute the incremental change,
+    to rebuild all Features and to refresh only the changed ones, in milliseconds.
+    """
+    old_text = synthetic_uvl(threads, EVENTS)
+    new_text = old_text.replace("value3 3", "value3 30")
+    start = time.perf_counter()
+    changes = _incremental_changes(old_text, new_text)
+    diff_time = (time.perf_counter() - start) * 1e3
+    incremental_size = len(json.dumps([change.model_dump() for change in changes]))
+    old_export = synthetic_export(old_text)
+    new_export = synthetic_export(new_text)
+    start = time.perf_counter()
+    tuple(Feature.from_dict(data) for data in new_export)
+    rebuild_time = (time.perf_counter() - start) * 1e3
+    known, _ = _refresh_features({}, old_export)
+    start = time.perf_counter()
+    _refresh_features(known, new_export)
+    refresh_time = (time.perf_counter() - start) * 1e3
+    return len(json.dumps(new_text)), incremental_size, diff_time, rebuild_time, refresh_time
+
+
+if __name__ == "__main__":
+    print(
+        f"{'threads':>8} {'full B':>10} {'incr. B':>8} {'diff ms':>8} "
+        f"{'rebuild ms':>11} {'refresh ms':>11}"
+    )
+    for thread_count in THREAD_COUNTS:
+        full, incremental, diff, rebuild, refresh = measure(thread_count)
+        print(f"{thread_count:>8} {full:>10} {incremental:>8} {diff:>8.2f} {rebuild:>11.2f} {refresh:>11.2f}")
@@ -0,0 +1,45 @@
+import json
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_export, synthetic_uvl
+from fmbp.fm import Attribute, Feature
+
+
+THREAD_COUNTS = (1_000, 10_000, 20_000)
+EVENTS = 5
+REPETITIONS = 3
+
+
+def count_attributes(attributes: tuple[Attribute, ...]) -> int:
+    return sum(
+        1 + (count_attributes(attribute.value) if isinstance(attribute.value, tuple) else 0)
+        for attribute in attributes
+    )
+
+
+def measure(threads: int) -> tuple[int, float, float]:
+    """
+    :return: Number of attributes, best parse time in milliseconds and memory held by the result in MB.
+    """
+    message = json.dumps(synthetic_export(synthetic_uvl(threads, EVENTS)))
+    export = json.loads(message)
+    best = float("inf")
+    for _ in range(REPETITIONS):
+        start = time.perf_counter()
+        tuple(Feature.from_dict(data) for data in export)
+        best = min(best, time.perf_counter() - start)
+    # measures what is left of an export message after parsing, like in UVLLanguageServer.export_model
+    tracemalloc.start()
+    features = tuple(Feature.from_dict(data) for data in json.loads(message))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    attributes = sum(count_attributes(feature.attributes) for feature in features)
+    return attributes, best * 1e3, memory / 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'threads':>8} {'attributes':>11} {'parse ms':>9} {'memory MB':>10}")
+    for thread_count in THREAD_COUNTS:
+        attribute_count, parse_time, memory_size = measure(thread_count)
+        print(f"{thread_count:>8} {attribute_count:>11} {parse_time:>9.1f} {memory_size:>10.2f}")
@@ -0,0 +1,42 @@
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.standin_server import STANDIN_SERVER
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.interface_factory import start_uvl_interfaces
+
+
+FLEET_SIZES = (1, 4, 16)
+THREADS = 100
+EVENTS = 5
+
+
+def measure(lsp: Path, size: int) -> tuple[float, float]:
+    """
+    Starts a fleet of interfaces on synthetic models one after another and concurrently.
+
+    :return: Time until all interfaces were ready, sequentially and concurrently, in seconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        models = []
+        for number in range(size):
+            model = Path(directory) / f"model_{number}.uvl"
+            model.write_text(synthetic_uvl(THREADS, EVENTS))
+            models.append(model)
+        totals = []
+        for max_workers in (1, None):
+            fleet = start_uvl_interfaces(models, lsp, max_workers=max_workers)
+            totals.append(fleet.total)
+            for interface in fleet.interfaces:
+                interface.close_uvl()
+        return totals[0], totals[1]
+
+
+if __name__ == "__main__":
+    # the stand-in server unless the path to another one is given
+    server_path = Path(sys.argv[1]).resolve() if len(sys.argv) > 1 else STANDIN_SERVER
+    print(f"{'models':>7} {'sequential s':>13} {'parallel s':>11} {'speedup':>8}")
+    for fleet_size in FLEET_SIZES:
+        sequential, parallel = measure(server_path, fleet_size)
+        print(f"{fleet_size:>7} {sequential:>13.2f} {parallel:>11.2f} {sequential / parallel:>8.1f}")
@@ -0,0 +1,40 @@
+import sys
+import time
+from pathlib import Path
+
+from fmbp.model_interface import LSPConnection
+
+
+# Writes <count> framed messages of <size> bytes each to stdout, mimicking a language server that answers in bursts.
+WRITER = """
+import sys
+size, count = int(sys.argv[1]), int(sys.argv[2])
+body = b'"' + b"x" * (size - 2) + b'"'
+message = b"Content-Length: " + str(size).encode() + b"\\r\\n\\r\\n" + body
+out = sys.stdout.buffer
+for _ in range(count):
+    out.write(message)
+out.flush()
+"""
+
+PAYLOAD_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+TOTAL_BYTES = 50_000_000
+
+
+def measure(size: int) -> tuple[int, float]:
+    count = max(TOTAL_BYTES // size, 5)
+    connection = LSPConnection(Path(sys.executable), "-c", WRITER, str(size), str(count))
+    start = time.perf_counter()
+    for _ in range(count):
+        connection.recv()
+    return count, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'payload':>10} {'messages':>9} {'msg/s':>10} {'MB/s':>8}")
+    for payload_size in PAYLOAD_SIZES:
+        messages, elapsed = measure(payload_size)
+        print(
+            f"{payload_size:>10} {messages:>9} {messages / elapsed:>10.0f} "
+            f"{messages * payload_size / elapsed / 1e6:>8.1f}"
+        )
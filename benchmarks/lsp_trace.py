@@ -0,0 +1,75 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bppy import SimpleEventSelectionStrategy
+
+from benchmarks.standin_server import STANDIN_SERVER
+from benchmarks.suite import LevelContextSource, RunRecorder, requesting
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.configuration_provider import ContextConfigurationProvider
+from fmbp.consistency_checker import DynamicConsistencyChecker
+from fmbp.fm_bp import BPConfigurator, FMBProgram, fm_thread
+from fmbp.lsp_trace import LSPTracer
+from fmbp.model_interface import UVLLSPInterface
+
+
+THREADS = 100
+EVENTS = 100
+REPETITIONS = 3
+TRACE = Path("lsp_trace.json")
+
+
+def run(lsp: Path, model: Path, tracer: LSPTracer | None) -> float:
+    """
+    Solves a configuration on every event, so every step exchanges messages with the server.
+
+    :return: Time per event in milliseconds.
+    """
+    interface = UVLLSPInterface(model, lsp, tracer=tracer)
+    b_program = FMBProgram(
+        bthreads=[fm_thread(f"T{thread}")(requesting)(f"E{thread}_0") for thread in range(THREADS)],
+        event_selection_strategy=SimpleEventSelectionStrategy(),
+        listener=BPConfigurator(
+            RunRecorder(EVENTS),
+            ContextConfigurationProvider(LevelContextSource(), interface),
+            DynamicConsistencyChecker(interface),
+        ),
+    )
+    start = time.perf_counter()
+    b_program.run()
+    elapsed = time.perf_counter() - start
+    interface.close_uvl()
+    return elapsed / EVENTS * 1e3
+
+
+def measure(lsp: Path) -> tuple[float, float, LSPTracer]:
+    """
+    :return: Best time per event without and with tracing in milliseconds and the tracer of the last traced run.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        model = Path(directory) / "model.uvl"
+        model.write_text(synthetic_uvl(THREADS, 1))
+        untraced = min(run(lsp, model, None) for _ in range(REPETITIONS))
+        traced = float("inf")
+        tracer = LSPTracer()
+        for _ in range(REPETITIONS):
+            tracer = LSPTracer()
+            traced = min(traced, run(lsp, model, tracer))
+        return untraced, traced, tracer
+
+
+if __name__ == "__main__":
+    # the stand-in server unless the path to another one is given, with a delay like a small solve
+    os.environ.setdefault("FMBP_STANDIN_SOLVE_DELAY", "0.001")
+    server_path = Path(sys.argv[1]).resolve() if len(sys.argv) > 1 else STANDIN_SERVER
+    untraced_time, traced_time, last_tracer = measure(server_path)
+    print(f"untraced {untraced_time:.3f} ms/event, traced {traced_time:.3f} ms/event, "
+          f"overhead {traced_time / untraced_time - 1:+.1%}")
+    print()
+    print(last_tracer.summary())
+    last_tracer.write_chrome_trace(TRACE.resolve())
+    print()
+    print(f"Chrome trace written to {TRACE}, open it in chrome://tracing or https://ui.perfetto.dev")
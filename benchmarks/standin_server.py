@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, BinaryIO
+from urllib.parse import unquote, urlparse
+
+if __name__ == "__main__":
+    # started by path as the server executable, not as part of the package
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import feature_data
+from fmbp.uvl import BinaryOperation, Constant, Expression, Not, Reference, UVLFeature, UVLModel, UVLSyntaxError, \
+    parse_uvl
+
+
+# executable to pass as the language server
+STANDIN_SERVER = Path(__file__).resolve()
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$")
+_OPERATIONS: dict[str, Any] = {
+    "<=>": lambda left, right: left == right,
+    "=>": lambda left, right: not left or right,
+    "|": lambda left, right: left or right,
+    "&": lambda left, right: left and right,
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    "<": lambda left, right: left < right,
+    ">": lambda left, right: left > right,
+    "<=": lambda left, right: left <= right,
+    ">=": lambda left, right: left >= right,
+    "+": lambda left, right: left + right,
+    "-": lambda left, right: left - right,
+    "*": lambda left, right: left * right,
+    "/": lambda left, right: left / right,
+}
+
+
+def _offset(text: str, position: dict[str, int]) -> int:
+    # LSP positions count characters in UTF-16 code units
+    lines = _LINE.findall(text)
+    offset = sum(len(line) for line in lines[:position["line"]])
+    line = lines[position["line"]] if position["line"] < len(lines) else ""
+    units = 0
+    index = 0
+    while units < position["character"]:
+        units += len(line[index].encode("utf-16-le")) // 2
+        index += 1
+    return offset + index
+
+
+def apply_changes(text: str, changes: list[dict[str, Any]]) -> str:
+    """
+    :return: The text after applying the content changes of a didChange notification in order.
+    """
+    for change in changes:
+        if change.get("range") is None:
+            text = change["text"]
+        else:
+            start = _offset(text, change["range"]["start"])
+            end = _offset(text, change["range"]["end"])
+            text = text[:start] + change["text"] + text[end:]
+    return text
+
+
+def _evaluate(expression: Expression, values: dict[str, Any], selected: dict[str, bool]) -> Any:
+    match expression:
+        case Constant(value):
+            return value
+        case Reference(name):
+            return values[name] if name in values else selected[name]
+        case Not(operand):
+            return not _evaluate(operand, values, selected)
+        case BinaryOperation(operator, left, right):
+            return _OPERATIONS[operator](_evaluate(left, values, selected), _evaluate(right, values, selected))
+    raise KeyError(expression)
+
+
+def _references(expression: Expression) -> list[str]:
+    match expression:
+        case Reference(name):
+            return [name]
+        case Not(operand):
+            return _references(operand)
+        case BinaryOperation(_, left, right):
+            return _references(left) + _references(right)
+    return []
+
+
+def _deselect(feature: UVLFeature, selected: dict[str, bool]) -> None:
+    stack = [feature]
+    while stack:
+        current = stack.pop()
+        selected[current.name] = False
+        stack.extend(child for group in current.groups for child in group.children)
+
+
+def scripted_configuration(model: UVLModel, context: dict[str, Any]) -> dict[str, bool] | None:
+    """
+    Selects every feature except for the later children of alternative and cardinality groups and the features F of
+    constraints F => condition whose condition does not hold. Constraints on attributes only, e.g. Env.level < 10,
+    have to hold. Other constraints are ignored.
+
+    :param context: Values of Env attributes by attribute name.
+    :return: Selection of every feature, None if a constraint on attributes does not hold.
+    """
+    features = {feature.name: feature for feature in model.features()}
+    values = {}
+    for feature in features.values():
+        is_env = any(attribute.name == "type" and attribute.value == "Env" for attribute in feature.attributes)
+        for attribute in feature.attributes:
+            if not isinstance(attribute.value, tuple):
+                value = context.get(attribute.name, attribute.value) if is_env else attribute.value
+                values[f"{feature.name}.{attribute.name}"] = value
+    selected = {}
+    stack = [(root, True) for root in model.roots]
+    while stack:
+        feature, is_selected = stack.pop()
+        selected[feature.name] = is_selected
+        for group in feature.groups:
+            chosen = len(group.children)
+            if group.kind in {"alternative", "cardinality"} and group.upper is not None:
+                chosen = group.upper
+            stack.extend((child, is_selected and index < chosen) for index, child in enumerate(group.children))
+    for constraint in model.constraints:
+        match constraint:
+            case BinaryOperation("=>", Reference(name), condition) if name in features:
+                try:
+                    holds = _evaluate(condition, values, selected)
+                except (KeyError, TypeError):
+                    continue
+                if not holds:
+                    _deselect(features[name], selected)
+            case _ if all("." in name for name in _references(constraint)):
+                try:
+                    if not _evaluate(constraint, values, selected):
+                        return None
+                except (KeyError, TypeError):
+                    continue
+    return selected
+
+
+class StandInServer:
+    """
+    Scripted stand-in for the UVL language server, so FMBP can be benchmarked without uvls and a solver.
+    Speaks the subset of the protocol used by UVLLanguageServer, see scripted_configuration for the configurations.
+    Latencies in seconds are read from the environment: FMBP_STANDIN_STARTUP_DELAY before the server accepts
+    messages, FMBP_STANDIN_RESPONSE_DELAY before every answer and FMBP_STANDIN_SOLVE_DELAY before a configuration
+    is written. Contexts without a configuration are reported by a showMessage before the answer, like uvls does.
+    With FMBP_STANDIN_PROGRESS set, an informational showMessage follows the answer to a configuration request.
+    """
+    def __init__(self, stdin: BinaryIO, stdout: BinaryIO) -> None:
+        self.__stdin = stdin
+        self.__stdout = stdout
+        self.__response_delay = float(os.environ.get("FMBP_STANDIN_RESPONSE_DELAY", "0"))
+        self.__solve_delay = float(os.environ.get("FMBP_STANDIN_SOLVE_DELAY", "0"))
+        self.__progress = bool(os.environ.get("FMBP_STANDIN_PROGRESS"))
+        # text and parsed model per document uri, the model is None if the text does not parse
+        self.__documents: dict[str, tuple[str, UVLModel | None]] = {}
+
+    def __read(self) -> dict[str, Any] | None:
+        length = None
+        while True:
+            line = self.__stdin.readline()
+            if not line:
+                return None
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode().partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        assert length is not None
+        message: dict[str, Any] = json.loads(self.__stdin.read(length))
+        return message
+
+    def __send(self, message: dict[str, Any]) -> None:
+        body = json.dumps(message).encode()
+        self.__stdout.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        self.__stdout.flush()
+
+    def __notify(self, method: str, params: dict[str, Any]) -> None:
+        self.__send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def __respond(self, message: dict[str, Any], result: Any) -> None:
+        self.__send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def __update_document(self, uri: str, text: str) -> None:
+        diagnostics = []
+        try:
+            model: UVLModel | None = parse_uvl(text)
+        except UVLSyntaxError as error:
+            model = None
+            position = {"line": max(error.line - 1, 0), "character": 0}
+            diagnostics.append({"range": {"start": position, "end": position}, "severity": 1, "message": str(error)})
+        self.__documents[uri] = text, model
+        self.__notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": diagnostics})
+
+    def __execute(self, message: dict[str, Any]) -> None:
+        command = message["params"]["command"]
+        arguments = message["params"]["arguments"]
+        _, model = self.__documents[arguments[0]]
+        if command == "uvls/export_model":
+            exported = [] if model is None else [feature_data(feature) for feature in model.export()]
+            self.__notify("window/showMessage", {"type": 3, "message": json.dumps(exported)})
+            self.__respond(message, None)
+        elif command == "uvls/generate_configurations":
+            context = arguments[2] if len(arguments) > 2 else {}
+            config = None if model is None else scripted_configuration(model, context)
+            if model is not None and config is None:
+                self.__notify("window/showMessage", {"type": 1, "message": "No SAT solution"})
+            self.__respond(message, None)
+            if config is None:
+                return
+            if self.__progress:
+                self.__notify("window/showMessage", {"type": 3, "message": "Generating 1 configuration"})
+            time.sleep(self.__solve_delay)
+            # the real server writes the configuration relative to its working directory
+            name = Path(unquote(urlparse(arguments[0]).path)).name
+            with open(f"{name}-1.json", "w") as file:
+                json.dump({"config": config}, file)
+        else:
+            self.__respond(message, None)
+
+    def serve(self) -> None:
+        while (message := self.__read()) is not None:
+            time.sleep(self.__response_delay)
+            method = message.get("method")
+            params = message.get("params", {})
+            match method:
+                case "initialize":
+                    self.__respond(message, {"capabilities": {"textDocumentSync": {"openClose": True, "change": 2}}})
+                case "initialized":
+                    # the client expects two messages after initialization, like uvls sends
+                    self.__send({
+                        "jsonrpc": "2.0",
+                        "id": "register",
+                        "method": "client/registerCapability",
+                        "params": {"registrations": []},
+                    })
+                    self.__notify("window/logMessage", {"type": 3, "message": "initialized"})
+                case "textDocument/didOpen":
+                    self.__update_document(params["textDocument"]["uri"], params["textDocument"]["text"])
+                case "textDocument/didChange":
+                    uri = params["textDocument"]["uri"]
+                    self.__update_document(uri, apply_changes(self.__documents[uri][0], params["contentChanges"]))
+                    self.__notify("window/logMessage", {"type": 3, "message": "changed"})
+                case "textDocument/didClose":
+                    uri = params["textDocument"]["uri"]
+                    self.__documents.pop(uri, None)
+                    self.__notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+                case "workspace/executeCommand":
+                    self.__execute(message)
+                case "exit":
+                    return
+                case _ if "id" in message and method is not None:
+                    self.__respond(message, None)
+
+
+if __name__ == "__main__":
+    time.sleep(float(os.environ.get("FMBP_STANDIN_STARTUP_DELAY", "0")))
+    StandInServer(sys.stdin.buffer, sys.stdout.buffer).serve()
@@ -0,0 +1,43 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.standin_server import STANDIN_SERVER
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.model_interface import UVLLSPInterface
+from fmbp.model_snapshot import ModelSnapshotCache
+
+
+THREAD_COUNTS = (10, 1_000, 10_000)
+EVENTS = 5
+
+
+def measure(lsp: Path, threads: int) -> tuple[float, float, float]:
+    """
+    Starts an interface on a synthetic model without and with a snapshot of the model.
+
+    :return: Time until the model information is available on a cold and on a warm start,
+    and until the server is running on a warm start, in milliseconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        model = Path(directory) / "model.uvl"
+        model.write_text(synthetic_uvl(threads, EVENTS))
+        times = []
+        for _ in range(2):
+            start = time.perf_counter()
+            interface = UVLLSPInterface(model, lsp, snapshot_cache=ModelSnapshotCache(Path(directory) / "cache"))
+            times.append((time.perf_counter() - start) * 1e3)
+            interface.wait_for_servers()
+            connected = (time.perf_counter() - start) * 1e3
+            interface.close_uvl()
+        return times[0], times[1], connected
+
+
+if __name__ == "__main__":
+    # the stand-in server unless the path to another one is given
+    server_path = Path(sys.argv[1]).resolve() if len(sys.argv) > 1 else STANDIN_SERVER
+    print(f"{'threads':>8} {'cold ms':>9} {'warm ms':>9} {'warm server ms':>15}")
+    for thread_count in THREAD_COUNTS:
+        cold, warm, server = measure(server_path, thread_count)
+        print(f"{thread_count:>8} {cold:>9.1f} {warm:>9.1f} {server:>15.1f}")
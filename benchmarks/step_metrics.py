@@ -0,0 +1,88 @@
+import tempfile
+import time
+from pathlib import Path
+
+from bppy import SimpleEventSelectionStrategy
+
+from benchmarks.suite import LevelContextSource, RunRecorder, requesting
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.configuration_provider import MemoizingConfigurationProvider
+from fmbp.consistency_checker import DynamicConsistencyChecker
+from fmbp.fm_bp import BPConfigurator, FMBProgram, fm_thread
+from fmbp.metrics import CONFIGURATION, B_THREAD_CONSISTENCY, EVENT_CONSISTENCY, LISTENER, RECONFIGURATION, WATCH, \
+    StepMetrics, step_timer
+from fmbp.z3_model_interface import Z3ModelInterface
+
+
+THREAD_COUNTS = (10, 100)
+EVENTS = 2_000
+REPETITIONS = 3
+# laps of a step with consistency checks and a reconfiguration
+LAPS = (WATCH, B_THREAD_CONSISTENCY, EVENT_CONSISTENCY, LISTENER, CONFIGURATION, RECONFIGURATION)
+
+
+def run(interface: Z3ModelInterface, threads: int, metrics: StepMetrics | None) -> float:
+    """
+    :return: Time per step in microseconds.
+    """
+    b_program = FMBProgram(
+        bthreads=[fm_thread(f"T{thread}")(requesting)(f"E{thread}_0") for thread in range(threads)],
+        event_selection_strategy=SimpleEventSelectionStrategy(),
+        listener=BPConfigurator(
+            RunRecorder(EVENTS),
+            MemoizingConfigurationProvider(LevelContextSource(), interface, metrics=metrics),
+            DynamicConsistencyChecker(interface),
+            metrics=metrics,
+        ),
+    )
+    start = time.perf_counter()
+    b_program.run()
+    return (time.perf_counter() - start) / EVENTS * 1e6
+
+
+def measure(threads: int) -> tuple[float, float, StepMetrics]:
+    """
+    Steps mostly hit the configuration cache, so the instrumentation is a noticeable part of them.
+
+    :return: Best time per step without and with metrics in microseconds and the metrics of the last run.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        model = Path(directory) / "model.uvl"
+        model.write_text(synthetic_uvl(threads, 1))
+        interface = Z3ModelInterface(model)
+        disabled = min(run(interface, threads, None) for _ in range(REPETITIONS))
+        enabled = float("inf")
+        metrics = StepMetrics()
+        for _ in range(REPETITIONS):
+            metrics = StepMetrics()
+            enabled = min(enabled, run(interface, threads, metrics))
+        return disabled, enabled, metrics
+
+
+def timer_cost(metrics: StepMetrics | None) -> float:
+    """
+    :return: Time the instrumentation of one step takes in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        timer = step_timer(metrics)
+        for phase in LAPS:
+            timer.lap(phase)
+        timer.stop()
+    return (time.perf_counter() - start) / EVENTS * 1e6
+
+
+if __name__ == "__main__":
+    print(f"instrumentation per step: {timer_cost(None):.2f} us disabled, {timer_cost(StepMetrics()):.2f} us enabled")
+    print()
+    print(f"{'threads':>8} {'disabled us':>12} {'enabled us':>11} {'overhead':>9}")
+    last_metrics = None
+    for thread_count in THREAD_COUNTS:
+        disabled_time, enabled_time, last_metrics = measure(thread_count)
+        print(
+            f"{thread_count:>8} {disabled_time:>12.1f} {enabled_time:>11.1f} "
+            f"{enabled_time / disabled_time - 1:>+9.1%}"
+        )
+    if last_metrics is not None:
+        print()
+        print(last_metrics.summary())
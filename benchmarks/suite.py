@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Iterator
+
+from bppy import BEvent, BProgram, SimpleEventSelectionStrategy, sync
+
+from benchmarks.standin_server import STANDIN_SERVER
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.configuration_provider import ContextConfigurationProvider
+from fmbp.consistency_checker import DynamicConsistencyChecker
+from fmbp.const import CONTEXT_DATA
+from fmbp.context_source import ContextSource
+from fmbp.fm_bp import BPConfigurator, FMBProgram, SimpleBProgramRunnerListener, fm_thread
+from fmbp.model_interface import UVLLSPInterface
+from fmbp.model_watcher import MTimeUpdatingModelWatcher
+
+
+THREAD_COUNTS = (10, 100, 1_000, 10_000)
+EVENTS = 200
+# Env.level cycles through these values, b-threads are enabled and disabled as it passes their thresholds
+LEVELS = 12
+# metrics compared with a baseline, True if higher is better
+COMPARED_METRICS = {
+    "startup_s": False,
+    "memory_mb": False,
+    "events_per_s": True,
+    "event_latency_ms.p50": False,
+    "event_latency_ms.p99": False,
+    "reconfiguration_latency_ms.p50": False,
+    "reconfiguration_latency_ms.p99": False,
+}
+# relative changes below this are considered noise
+TOLERANCE = 0.1
+
+
+def requesting(event: str) -> Iterator[dict[str, Any]]:
+    while True:
+        yield sync(request=BEvent(event))
+
+
+class LevelContextSource(ContextSource):
+    def __init__(self) -> None:
+        self.__step = 0
+
+    def get_data(self) -> CONTEXT_DATA:
+        self.__step += 1
+        return {"level": self.__step % LEVELS}
+
+
+class RunRecorder(SimpleBProgramRunnerListener):
+    """
+    Stops the program after the given number of events and counts reconfigurations.
+    """
+    def __init__(self, events: int) -> None:
+        self.__events = events
+        self.selected = 0
+        self.reconfigurations = 0
+
+    def event_selected(self, b_program: BProgram, event: BEvent) -> bool:
+        self.selected += 1
+        return self.selected >= self.__events
+
+    def reconfigured(self, b_program: BProgram, added: tuple[str, ...], removed: tuple[str, ...]) -> None:
+        self.reconfigurations += 1
+
+
+class TimedConfigurator(BPConfigurator):
+    """
+    Measures every event_selected, separately for the ones that reconfigured the program.
+    """
+    def __init__(self, recorder: RunRecorder, *args: Any) -> None:
+        super().__init__(recorder, *args)
+        self.__recorder = recorder
+        self.latencies: list[float] = []
+        self.reconfiguration_latencies: list[float] = []
+
+    def event_selected(self, b_program: BProgram, event: BEvent) -> bool | None:
+        reconfigurations = self.__recorder.reconfigurations
+        start = time.perf_counter()
+        result = super().event_selected(b_program, event)
+        latency = time.perf_counter() - start
+        self.latencies.append(latency)
+        if self.__recorder.reconfigurations != reconfigurations:
+            self.reconfiguration_latencies.append(latency)
+        return result
+
+
+def percentiles(values: list[float]) -> dict[str, float | int]:
+    """
+    :return: Nearest-rank percentiles, the maximum and the number of the values, in milliseconds.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    result: dict[str, float | int] = {
+        f"p{rank}": ordered[min(len(ordered) - 1, max(0, -(-rank * len(ordered) // 100) - 1))] * 1e3
+        for rank in (50, 90, 99)
+    }
+    result["max"] = ordered[-1] * 1e3
+    result["count"] = len(ordered)
+    return result
+
+
+def measure(lsp: Path, threads: int, events: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        model = Path(directory) / "model.uvl"
+        model.write_text(synthetic_uvl(threads, 1))
+
+        # memory held by an interface after startup, in a separate run as tracing slows everything down
+        tracemalloc.start()
+        interface = UVLLSPInterface(model, lsp)
+        interface.b_threads
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        interface.close_uvl()
+        del interface
+
+        start = time.perf_counter()
+        interface = UVLLSPInterface(model, lsp)
+        startup = time.perf_counter() - start
+
+        recorder = RunRecorder(events)
+        configurator = TimedConfigurator(
+            recorder,
+            ContextConfigurationProvider(LevelContextSource(), interface),
+            DynamicConsistencyChecker(interface),
+            MTimeUpdatingModelWatcher(interface),
+        )
+        b_program = FMBProgram(
+            bthreads=[fm_thread(f"T{thread}")(requesting)(f"E{thread}_0") for thread in range(threads)],
+            event_selection_strategy=SimpleEventSelectionStrategy(),
+            listener=configurator,
+        )
+        start = time.perf_counter()
+        b_program.run()
+        run_time = time.perf_counter() - start
+        interface.close_uvl()
+        return {
+            "threads": threads,
+            "events": recorder.selected,
+            "startup_s": startup,
+            "memory_mb": memory / 1e6,
+            "events_per_s": recorder.selected / run_time,
+            "event_latency_ms": percentiles(configurator.latencies),
+            "reconfiguration_latency_ms": percentiles(configurator.reconfiguration_latencies),
+        }
+
+
+def metric(result: dict[str, Any], name: str) -> float | None:
+    value: Any = result
+    for key in name.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value)
+
+
+def compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]]) -> list[str]:
+    """
+    :return: Lines describing the relative change of every compared metric, marking regressions beyond the tolerance.
+    """
+    lines = []
+    baseline_by_threads = {result["threads"]: result for result in baseline}
+    for result in results:
+        old = baseline_by_threads.get(result["threads"])
+        if old is None:
+            continue
+        for name, higher_is_better in COMPARED_METRICS.items():
+            new_value, old_value = metric(result, name), metric(old, name)
+            if new_value is None or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            regression = change < -TOLERANCE if higher_is_better else change > TOLERANCE
+            lines.append(
+                f"{result['threads']:>8} {name:<32} {old_value:>10.3f} {new_value:>10.3f} {change:>+8.1%}"
+                f"{'  regression' if regression else ''}"
+            )
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks FMBP against the stand-in language server.")
+    parser.add_argument("--threads", type=int, nargs="+", default=THREAD_COUNTS, help="b-threads per model")
+    parser.add_argument("--events", type=int, default=EVENTS, help="events selected per run")
+    parser.add_argument("--response-delay", type=float, default=0.0, help="server delay per answer in seconds")
+    parser.add_argument("--solve-delay", type=float, default=0.0, help="server delay per configuration in seconds")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path, help="results of an earlier run to compare with")
+    arguments = parser.parse_args()
+    # read by the stand-in server
+    os.environ["FMBP_STANDIN_RESPONSE_DELAY"] = str(arguments.response_delay)
+    os.environ["FMBP_STANDIN_SOLVE_DELAY"] = str(arguments.solve_delay)
+
+    print(
+        f"{'threads':>8} {'startup s':>10} {'memory MB':>10} {'events/s':>9} "
+        f"{'event p50 ms':>13} {'reconf. p50 ms':>15} {'reconf. p99 ms':>15}"
+    )
+    results = []
+    for thread_count in arguments.threads:
+        result = measure(STANDIN_SERVER, thread_count, arguments.events)
+        results.append(result)
+        reconfiguration = result["reconfiguration_latency_ms"]
+        print(
+            f"{thread_count:>8} {result['startup_s']:>10.3f} {result['memory_mb']:>10.2f} "
+            f"{result['events_per_s']:>9.1f} {result['event_latency_ms']['p50']:>13.2f} "
+            f"{reconfiguration.get('p50', float('nan')):>15.2f} {reconfiguration.get('p99', float('nan')):>15.2f}"
+        )
+    arguments.output.write_text(json.dumps({
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "events": arguments.events,
+            "response_delay_s": arguments.response_delay,
+            "solve_delay_s": arguments.solve_delay,
+        },
+        "results": results,
+    }, indent=2))
+    if arguments.baseline is not None:
+        print()
+        print("\n".join(compare(results, json.loads(arguments.baseline.read_text())["results"])))
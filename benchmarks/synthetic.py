@@ -0,0 +1,48 @@
+from fmbp.fm import ATTRIBUTES_DICT, Attribute, FEATURE_DICT, Feature
+from fmbp.uvl import parse_uvl
+
+
+def synthetic_uvl(threads: int, events: int, config_attributes: int = 10) -> str:
+    """
+    :return: A model in the style of the examples with the given number of b-threads and events per b-thread.
+    """
+    lines = ["features", "    Program", "        optional"]
+    for thread in range(threads):
+        thread_events = ", ".join(
+            f"E{thread}_{event} {{type 'BEvent', requested true, priority {event % 3}}}"
+            for event in range(events)
+        )
+        lines.append(f"            T{thread} {{type 'BThread', {thread_events}}}")
+    lines.append("    Env {type 'Env', level 0}")
+    config = ", ".join(f"value{number} {number}" for number in range(config_attributes))
+    lines.append(f"    Config {{type 'Config', {config}}}")
+    lines.append("")
+    lines.append("constraints")
+    for thread in range(0, threads, 2):
+        lines.append(f"    T{thread} => Env.level < Config.value{thread % config_attributes}")
+    return "\n".join(lines) + "\n"
+
+
+def _attribute_data(attribute: Attribute) -> ATTRIBUTES_DICT:
+    value = attribute.value
+    if isinstance(value, tuple):
+        return {"name": attribute.name, "value": {"Attributes": [_attribute_data(sub) for sub in value]}}
+    if isinstance(value, bool):
+        return {"name": attribute.name, "value": {"Bool": value}}
+    if isinstance(value, str):
+        return {"name": attribute.name, "value": {"String": value}}
+    return {"name": attribute.name, "value": {"Number": float(value)}}
+
+
+def feature_data(feature: Feature) -> FEATURE_DICT:
+    """
+    :return: The feature as exported by the UVL language server.
+    """
+    return {"name": feature.name, "attributes": [_attribute_data(attribute) for attribute in feature.attributes]}
+
+
+def synthetic_export(uvl: str) -> list[FEATURE_DICT]:
+    """
+    :return: The export of the model as sent by the UVL language server.
+    """
+    return [feature_data(feature) for feature in parse_uvl(uvl).export()]
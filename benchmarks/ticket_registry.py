@@ -0,0 +1,45 @@
+import random
+import time
+
+from bppy import BEvent, SimpleEventSelectionStrategy, sync
+
+from fmbp.fm_bp import FMBProgram, fm_thread
+
+
+THREAD_COUNTS = (100, 1_000, 10_000)
+TOGGLES = 1_000
+
+
+def waiting():
+    while True:
+        yield sync(waitFor=BEvent("NEVER"))
+
+
+def measure(threads: int) -> tuple[float, float]:
+    """
+    :return: Time per enable while enabling all b-threads and per enable or disable of random ones, in microseconds.
+    """
+    names = [f"T{number}" for number in range(threads)]
+    b_program = FMBProgram(
+        bthreads=[fm_thread(name)(waiting)() for name in names],
+        event_selection_strategy=SimpleEventSelectionStrategy(),
+    )
+    start = time.perf_counter()
+    for name in names:
+        b_program.enable_b_thread(name)
+    enable_all = (time.perf_counter() - start) / threads * 1e6
+    toggled = random.Random(0).choices(names, k=TOGGLES)
+    start = time.perf_counter()
+    for name in toggled:
+        b_program.disable_b_thread(name)
+        b_program.enable_b_thread(name)
+    toggle = (time.perf_counter() - start) / (2 * TOGGLES) * 1e6
+    assert len(b_program.active_b_thread_names()) == threads
+    return enable_all, toggle
+
+
+if __name__ == "__main__":
+    print(f"{'threads':>8} {'enable all us/op':>17} {'toggle us/op':>13}")
+    for thread_count in THREAD_COUNTS:
+        enable_time, toggle_time = measure(thread_count)
+        print(f"{thread_count:>8} {enable_time:>17.1f} {toggle_time:>13.1f}")
@@ -0,0 +1,39 @@
+import json
+import sys
+from pathlib import Path
+
+from fmbp.conformance import check_conformance, domain_contexts
+from fmbp.configuration_table import CONTEXT_DOMAIN
+from fmbp.model_interface import UVLLSPInterface
+from fmbp.z3_model_interface import Z3ModelInterface
+
+
+# Context values to compare the backends on, per example model.
+DOMAINS: dict[str, CONTEXT_DOMAIN] = {
+    "water_tank/water_tank.uvl": {"temp": range(0, 41, 5), "level": range(0, 101, 10)},
+    "smart_home/smart_home.uvl": {"windows_open": (0, 1), "internal_temp": range(14, 27)},
+    **{
+        f"drones/drone_{number}.uvl": {"charge": range(0, 101, 10), "is_charging": (0, 1)}
+        for number in range(4)
+    },
+}
+
+
+if __name__ == "__main__":
+    # Compares the in-process z3 backend with the language server on all example models.
+    examples = Path(__file__).parent
+    server_path = Path(json.loads((examples / "config.json").read_text())["uvls_path"])
+    passed = True
+    for model, domain in DOMAINS.items():
+        reference = UVLLSPInterface(examples / model, server_path)
+        candidate = Z3ModelInterface(examples / model)
+        report = check_conformance(reference, candidate, domain_contexts(domain))
+        reference.close_uvl()
+        passed &= report.passed
+        print(
+            f"{model}: {report.checked - len(report.mismatches)}/{report.checked} configurations identical, "
+            f"model info {'identical' if report.model_info_matches else 'differs'}"
+        )
+        for mismatch in report.mismatches:
+            print(f"    {mismatch.context}\n        lsp: {mismatch.reference}\n        z3:  {mismatch.candidate}")
+    sys.exit(0 if passed else 1)
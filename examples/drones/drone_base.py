@@ -8,7 +8,6 @@ from flask import Flask
 
 from fmbp.const import CONTEXT_DATA
 from fmbp.context_source import ContextSource
-from fmbp.fm import Feature, Attribute
 from fmbp.fm_bp import fm_thread, SimpleBProgramRunnerListener
 from fmbp.model_interface import ModelInterface
 
@@ -163,11 +162,8 @@ def follow_at_distance(drone_id: str, distance: float) -> tuple[float, float] |
 @fm_thread("Patrol")
 def patrol(interface: ModelInterface):
     while True:
-        # extracts target config from the model
-        config_feature: Feature = list(filter(lambda feature: feature.name == "Config", interface.model_info))[0]
-        patrol_targets: Attribute = \
-            list(filter(lambda attribute: attribute.name == "patrol_targets", config_feature.attributes))[0]
-        parsed_patrol_targets: tuple[str, ...] = tuple(patrol_targets.value.split(","))
+        # extracts target config from the model, the split list is cached until the model changes
+        parsed_patrol_targets = interface.feature_model.split("Config.patrol_targets")
         # gets next target to fly to
         maybe_nearest = find_min_distance(parsed_patrol_targets)
         if maybe_nearest is not None:
@@ -178,13 +174,11 @@ def patrol(interface: ModelInterface):
 def follow(interface: ModelInterface):
     while True:
         # extracts following config from the model
-        config_feature: Feature = list(filter(lambda feature: feature.name == "Config", interface.model_info))[0]
-        follow_target: Attribute = \
-            list(filter(lambda attribute: attribute.name == "leader_to_follow", config_feature.attributes))[0]
-        follow_distance: Attribute = \
-            list(filter(lambda attribute: attribute.name == "follow_distance", config_feature.attributes))[0]
+        feature_model = interface.feature_model
+        follow_target = feature_model.string("Config.leader_to_follow")
+        follow_distance = feature_model.number("Config.follow_distance")
         # gets coordinates to fly to
-        maybe_target = follow_at_distance(follow_target.value, follow_distance.value)
+        maybe_target = follow_at_distance(follow_target, follow_distance)
         if maybe_target is not None:
             yield sync(request=BEvent("FOLLOW", {"target": maybe_target}))
 
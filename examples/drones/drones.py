@@ -11,7 +11,7 @@ from examples.drones.drone_base import DroneContextSource, patrol, charge, Drone
 from fmbp.configuration_provider import CachingConfigurationProvider, ContextConfigurationProvider
 from fmbp.consistency_checker import DynamicConsistencyChecker
 from fmbp.fm_bp import FMBProgram, BPConfigurator
-from fmbp.model_interface import UVLLSPInterface
+from fmbp.interface_factory import start_uvl_interfaces
 from fmbp.model_watcher import MTimeUpdatingModelWatcher
 
 
@@ -29,18 +29,21 @@ if __name__ == "__main__":
     log.setLevel(logging.ERROR)
     logging.basicConfig(level=logging.CRITICAL)
 
+    # The language servers of all drones are started at the same time.
+    server_path = Path(json.loads((Path(__file__).parent.parent / "config.json").read_text())["uvls_path"])
+    fleet = start_uvl_interfaces([Path(__file__).parent / f"drone_{i}.uvl" for i in range(4)], server_path)
+    print(fleet.summary())
+
     # The 4 drones are controlled in their own processes.
     # We use Python's multiprocessing to achieve that.
+    # Their models differ in the Config values, so a ConfigurationBatcher would not combine their requests anyway.
     # All processes get a queue where they put there state in which gets collected here and printed.
     queues: list[Queue] = []
-    for i in range(4):
+    for i, interface in enumerate(fleet.interfaces):
         queue = Queue()
         queues.append(queue)
 
         # Very similar setup as with the water tank.
-        uvl_path = Path(__file__).parent / f"drone_{i}.uvl"
-        server_path = Path(json.loads((Path(__file__).parent.parent / "config.json").read_text())["uvls_path"])
-        interface = UVLLSPInterface(uvl_path, server_path)
         config_provider = CachingConfigurationProvider(
             ContextConfigurationProvider(
                 DroneContextSource(),
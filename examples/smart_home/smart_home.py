@@ -8,7 +8,6 @@ from fmbp.configuration_provider import ContextConfigurationProvider, LoggingCon
     CachingConfigurationProvider
 from fmbp.consistency_checker import DynamicConsistencyChecker
 from fmbp.context_source import ContextSource
-from fmbp.fm import Feature, Attribute
 from fmbp.fm_bp import fm_thread, FMBProgram, BPConfigurator, SimpleBProgramRunnerListener
 from fmbp.model_interface import UVLLSPInterface
 from fmbp.model_watcher import MTimeUpdatingModelWatcher
@@ -128,13 +127,8 @@ if __name__ == "__main__":
         )
     )
 
-    env_feature: Feature = list(filter(lambda feature: feature.name == "Env", interface.model_info))[0]
-    initial_window_state: Attribute = \
-        list(filter(lambda attribute: attribute.name == "windows_open", env_feature.attributes))[0]
-    initial_temp: Attribute = \
-        list(filter(lambda attribute: attribute.name == "internal_temp", env_feature.attributes))[0]
-    HOME.windows_open = initial_window_state.value
-    HOME.temp = initial_temp.value
+    HOME.windows_open = interface.feature_model.number("Env.windows_open")
+    HOME.temp = interface.feature_model.number("Env.internal_temp")
 
     b_program = FMBProgram(
         bthreads=[
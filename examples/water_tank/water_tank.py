@@ -5,11 +5,10 @@ from pathlib import Path
 
 from bppy import *
 
-from fmbp.configuration_provider import ContextConfigurationProvider, CachingConfigurationProvider, \
+from fmbp.configuration_provider import MemoizingConfigurationProvider, CachingConfigurationProvider, \
     LoggingConfigurationProvider
 from fmbp.consistency_checker import DynamicConsistencyChecker
 from fmbp.context_source import ContextSource
-from fmbp.fm import Feature, Attribute
 from fmbp.fm_bp import fm_thread, FMBProgram, BPConfigurator, SimpleBProgramRunnerListener
 from fmbp.model_interface import UVLLSPInterface
 from fmbp.model_watcher import MTimeUpdatingModelWatcher
@@ -109,7 +108,7 @@ if __name__ == "__main__":
     interface = UVLLSPInterface(uvl_path, server_path)
     config_provider = LoggingConfigurationProvider( # logs if a configuration has been returned by the level below
         CachingConfigurationProvider(   # caches configurations and only returns new ones
-            ContextConfigurationProvider(   # uses a ContextSource to gather context data and feeds them into the interface
+            MemoizingConfigurationProvider(   # feeds context data into the interface, remembers results per context
                 WaterTankContextSource(),
                 interface,
             ),
@@ -117,13 +116,8 @@ if __name__ == "__main__":
     )
 
     # We extract the initial context values from the provided model and set them in the runtime
-    env_feature: Feature = list(filter(lambda feature: feature.name == "Env", interface.model_info))[0]
-    initial_temp: Attribute = \
-        list(filter(lambda attribute: attribute.name == "temp", env_feature.attributes))[0]
-    initial_level: Attribute = \
-        list(filter(lambda attribute: attribute.name == "level", env_feature.attributes))[0]
-    TANK.water_temperature = initial_temp.value
-    TANK.water_level = initial_level.value
+    TANK.water_temperature = interface.feature_model.number("Env.temp")
+    TANK.water_level = interface.feature_model.number("Env.level")
 
     # Behavioral program initialization
     b_program = FMBProgram(
@@ -0,0 +1,375 @@
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from sansio_lsp_client import PublishDiagnostics, Diagnostic
+from sansio_lsp_client.client import CAPABILITIES
+
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.fm import Feature
+from fmbp.model_interface import ScratchDirectory, _content_length, _maybe_raise_defect
+
+
+class LSPResponseError(Exception):
+    """
+    The language server answered a request with an error.
+    """
+    def __init__(self, error: dict[str, Any]) -> None:
+        super().__init__(error.get("message", "Unknown error"))
+        self.code = error.get("code")
+        self.data = error.get("data")
+
+
+class AsyncLSPConnection:
+    """
+    asyncio based JSON-RPC connection to a language server running as subprocess.
+    Replies are matched to their requests by id, so any number of requests may be in flight at once.
+    Notifications are routed to the handler registered for their method.
+    """
+    def __init__(self, process: asyncio.subprocess.Process, request_timeout: float = 30.0) -> None:
+        """
+        :param request_timeout: Maximum time to wait for the reply to a request in seconds.
+        """
+        self.__process = process
+        self.__request_timeout = request_timeout
+        self.__next_id = 0
+        self.__pending: dict[int, asyncio.Future[Any]] = {}
+        self.__handlers: dict[str, Callable[[Any], None]] = {}
+        self.__closed_error: ConnectionError | None = None
+        self.__reader = asyncio.get_running_loop().create_task(self.__read_loop())
+
+    @classmethod
+    async def start(
+            cls,
+            path_to_server: Path,
+            *args: str,
+            cwd: Path | None = None,
+            request_timeout: float = 30.0,
+    ) -> "AsyncLSPConnection":
+        process = await asyncio.create_subprocess_exec(
+            path_to_server,
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=cwd,
+        )
+        return cls(process, request_timeout)
+
+    def on_notification(self, method: str, handler: Callable[[Any], None]) -> None:
+        self.__handlers[method] = handler
+
+    @property
+    def in_progress(self) -> int | None:
+        """
+        Id of the oldest request still waiting for its reply. The server handles requests in order,
+        so notifications arriving in the meantime have been sent while handling this request.
+        """
+        return min(self.__pending, default=None)
+
+    async def request(
+            self,
+            method: str,
+            params: Any = None,
+            on_sent: Callable[[int], None] | None = None,
+    ) -> Any:
+        """
+        Sends a request and waits for its reply. Other requests may be sent while waiting.
+
+        :param on_sent: Called with the id of the request before it is sent.
+        :return: The result of the reply.
+        :raises asyncio.TimeoutError: If the server does not reply within the request timeout.
+        """
+        if self.__closed_error is not None:
+            raise self.__closed_error
+        request_id = self.__next_id
+        self.__next_id += 1
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self.__pending[request_id] = future
+        if on_sent is not None:
+            on_sent(request_id)
+        try:
+            await self.__write({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+            return await asyncio.wait_for(future, self.__request_timeout)
+        finally:
+            self.__pending.pop(request_id, None)
+
+    async def notify(self, method: str, params: Any = None) -> None:
+        if self.__closed_error is not None:
+            raise self.__closed_error
+        await self.__write({"jsonrpc": "2.0", "method": method, "params": params})
+
+    async def __write(self, message: dict[str, Any]) -> None:
+        stdin = self.__process.stdin
+        assert stdin is not None
+        body = json.dumps(message).encode("utf-8")
+        stdin.write(b"Content-Length: %d\r\n\r\n%b" % (len(body), body))
+        await stdin.drain()
+
+    async def __read_loop(self) -> None:
+        stdout = self.__process.stdout
+        assert stdout is not None
+        try:
+            while True:
+                header = await stdout.readuntil(b"\r\n\r\n")
+                body = await stdout.readexactly(_content_length(header[:-4]))
+                try:
+                    self.__dispatch(json.loads(body))
+                except Exception:
+                    # a failing handler must not stop the replies to all other requests
+                    logging.exception("Failed to handle a message of the language server")
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self.__closed_error = ConnectionError("Language server closed the connection")
+            self.__closed_error.__cause__ = e
+            for future in self.__pending.values():
+                if not future.done():
+                    future.set_exception(self.__closed_error)
+
+    def __dispatch(self, message: dict[str, Any]) -> None:
+        method = message.get("method")
+        if method is None:
+            request_id = message.get("id")
+            # removed right away, the request is no longer in progress once its reply is read
+            future = self.__pending.pop(request_id, None) if isinstance(request_id, int) else None
+            if future is None or future.done():
+                return
+            if message.get("error") is not None:
+                future.set_exception(LSPResponseError(message["error"]))
+            else:
+                future.set_result(message.get("result"))
+            return
+        if "id" in message:
+            # Requests from the server (e.g. capability registrations) need an answer, the content is irrelevant.
+            stdin = self.__process.stdin
+            assert stdin is not None
+            body = json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": None}).encode("utf-8")
+            stdin.write(b"Content-Length: %d\r\n\r\n%b" % (len(body), body))
+        handler = self.__handlers.get(method)
+        if handler is not None:
+            handler(message.get("params"))
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """
+        Shuts the server down gracefully, kills it if it does not exit in time.
+        """
+        try:
+            if self.__closed_error is None:
+                await asyncio.wait_for(self.request("shutdown"), timeout)
+                await self.notify("exit")
+            await asyncio.wait_for(self.__process.wait(), timeout)
+        except (asyncio.TimeoutError, ConnectionError, LSPResponseError):
+            if self.__process.returncode is None:
+                self.__process.kill()
+                await self.__process.wait()
+        finally:
+            self.__reader.cancel()
+
+
+class AsyncUVLLSPInterface:
+    """
+    asyncio counterpart of the UVLLSPInterface, for embedding FMBP into asyncio applications.
+    Requests are pipelined: model export, diagnostics and configuration generation may overlap.
+    Configuration generation is serialized per interface though, since the server always writes the same file.
+    Instances are created with the create coroutine.
+    """
+    def __init__(
+            self,
+            model: Path,
+            connection: AsyncLSPConnection,
+            scratch: ScratchDirectory,
+            configuration_timeout: float,
+    ) -> None:
+        self.model = model
+        self.version = 0
+        self.model_info: tuple[Feature, ...] = ()
+        self.diagnostics: tuple[Diagnostic, ...] = ()
+        self.__connection = connection
+        self.__scratch = scratch
+        self.__configuration_timeout = configuration_timeout
+        self.__file_version = 1
+        self.__generation_lock = asyncio.Lock()
+        # The server delivers exported models and solver errors as showMessage notifications.
+        self.__exports: deque[asyncio.Future[Any]] = deque()
+        # id of the generate_configurations request in flight and the future of a message sent while handling it
+        self.__generation: tuple[int, asyncio.Future[str]] | None = None
+        self.__diagnostics_waiters: list[asyncio.Future[list[Diagnostic]]] = []
+        connection.on_notification("window/showMessage", self.__on_show_message)
+        connection.on_notification("textDocument/publishDiagnostics", self.__on_diagnostics)
+
+    @classmethod
+    async def create(
+            cls,
+            model: Path,
+            lsp: Path,
+            configuration_timeout: float = 30.0,
+    ) -> "AsyncUVLLSPInterface":
+        scratch = ScratchDirectory()
+        connection = await AsyncLSPConnection.start(lsp, cwd=scratch.path, request_timeout=configuration_timeout)
+        interface = cls(model, connection, scratch, configuration_timeout)
+        await interface.__initialize()
+        return interface
+
+    async def __initialize(self) -> None:
+        await self.__connection.request(
+            "initialize",
+            {"processId": os.getpid(), "rootUri": None, "capabilities": CAPABILITIES},
+        )
+        await self.__connection.notify("initialized", {})
+        diagnostics = self.__expect_diagnostics()
+        await self.__connection.notify(
+            "textDocument/didOpen",
+            {
+                "textDocument": {
+                    "uri": self.model.as_uri(),
+                    "languageId": "uvl",
+                    "version": self.__file_version,
+                    "text": self.model.read_text(),
+                },
+            },
+        )
+        _, self.model_info = await asyncio.gather(
+            self.__check_diagnostics(diagnostics),
+            self._acquire_model_info(),
+        )
+
+    def __on_show_message(self, params: dict[str, Any]) -> None:
+        message = params.get("message", "")
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            data = None
+        # exports that timed out are removed by their waiters, skip any that are done nonetheless
+        while self.__exports and self.__exports[0].done():
+            self.__exports.popleft()
+        if isinstance(data, list) and self.__exports:
+            self.__exports.popleft().set_result(data)
+        elif (
+                self.__generation is not None
+                and self.__generation[0] == self.__connection.in_progress
+                and not self.__generation[1].done()
+        ):
+            # like the synchronous interface, a message before the reply means the solver failed
+            self.__generation[1].set_result(message)
+        else:
+            logging.info(message)
+
+    def __on_diagnostics(self, params: dict[str, Any]) -> None:
+        event = PublishDiagnostics.model_validate(params)
+        if event.uri != self.model.as_uri():
+            return
+        self.diagnostics = tuple(event.diagnostics)
+        waiters = self.__diagnostics_waiters
+        self.__diagnostics_waiters = []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(event.diagnostics)
+
+    def __expect_diagnostics(self) -> asyncio.Future[list[Diagnostic]]:
+        # Has to be registered before the document is sent, the diagnostics may arrive at any await after that.
+        future: asyncio.Future[list[Diagnostic]] = asyncio.get_running_loop().create_future()
+        self.__diagnostics_waiters.append(future)
+        return future
+
+    async def __check_diagnostics(self, future: asyncio.Future[list[Diagnostic]]) -> None:
+        try:
+            diagnostics = await asyncio.wait_for(future, self.__configuration_timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"No diagnostics received for {self.model.name}")
+            return
+        _maybe_raise_defect(diagnostics)
+
+    async def execute_command(
+            self,
+            command: str,
+            arguments: list[Any],
+            on_sent: Callable[[int], None] | None = None,
+    ) -> Any:
+        return await self.__connection.request(
+            "workspace/executeCommand",
+            {"command": command, "arguments": arguments},
+            on_sent,
+        )
+
+    async def _acquire_model_info(self) -> tuple[Feature, ...]:
+        export: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self.__exports.append(export)
+        try:
+            await self.execute_command("uvls/export_model", [self.model.as_uri()])
+            data = await asyncio.wait_for(export, self.__configuration_timeout)
+        finally:
+            # otherwise the next exported model would be delivered to this export
+            with suppress(ValueError):
+                self.__exports.remove(export)
+        return tuple(Feature.from_dict(feature_data) for feature_data in data)
+
+    async def acquire_configuration(
+            self,
+            context_vars: CONTEXT_DATA | None = None,
+    ) -> RUNTIME_CONFIG | None:
+        """
+        Acquires a new configuration, see ModelInterface.acquire_configuration.
+        """
+        async with self.__generation_lock:
+            config_name = f"{self.model.name}-1.json"
+            self.__scratch.discard(config_name)
+            arguments: list[Any] = [self.model.as_uri(), 1]
+            if context_vars is not None:
+                arguments.append(context_vars)
+            message: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+
+            def sent(request_id: int) -> None:
+                self.__generation = request_id, message
+
+            try:
+                await self.execute_command("uvls/generate_configurations", arguments, sent)
+            finally:
+                self.__generation = None
+            if message.done():
+                raise ValueError("No SAT solution for this file")
+            json_data = await self.__scratch.wait_for_json_async(config_name, self.__configuration_timeout)
+        if json_data is None:
+            logging.error(f"No configuration for {self.model.name} within {self.__configuration_timeout} s")
+            return None
+        return {
+            key: value
+            for key, value in json_data["config"].items()
+            if isinstance(value, bool) and "." not in key
+        }
+
+    async def acquire_configurations(
+            self,
+            contexts: Sequence[CONTEXT_DATA],
+    ) -> tuple[RUNTIME_CONFIG | None, ...]:
+        """
+        Queues one request per context at once. This is not concurrent: the server writes every configuration
+        to the same file, so the solves are serialized by the generation lock and run one after another.
+        Other requests, e.g. model exports, can still overlap with them.
+        """
+        return tuple(await asyncio.gather(*(self.acquire_configuration(context) for context in contexts)))
+
+    async def update(self) -> None:
+        """
+        Sends the current file content to the server and reloads the model information.
+        """
+        self.__file_version += 1
+        diagnostics = self.__expect_diagnostics()
+        await self.__connection.notify(
+            "textDocument/didChange",
+            {
+                "textDocument": {"uri": self.model.as_uri(), "version": self.__file_version},
+                "contentChanges": [{"text": self.model.read_text()}],
+            },
+        )
+        _, self.model_info = await asyncio.gather(
+            self.__check_diagnostics(diagnostics),
+            self._acquire_model_info(),
+        )
+        self.version += 1
+
+    async def close(self) -> None:
+        await self.__connection.close()
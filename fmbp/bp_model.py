@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+from typing import Any
 
 from fmbp.fm import Attribute, Feature
 
 
-@dataclass(frozen=True, eq=True)
+@dataclass(frozen=True, eq=True, slots=True)
 class EventAttribute:
     name: str
     requested: bool = False
@@ -12,12 +13,19 @@ class EventAttribute:
     optional: bool = False
     priority: int = 0
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # unpickling through the state of a frozen slotted dataclass is several times slower
+        return EventAttribute, (self.name, self.requested, self.blocked, self.waited_for, self.optional, self.priority)
 
-@dataclass(frozen=True, eq=True)
+
+@dataclass(frozen=True, eq=True, slots=True)
 class BThreadFeature:
     name: str
     events: tuple[EventAttribute, ...]
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        return BThreadFeature, (self.name, self.events)
+
 
 def events_from_attributes(attributes: tuple[Attribute, ...]) -> tuple[EventAttribute, ...]:
     events = []
@@ -1,7 +1,14 @@
+import time
 from abc import abstractmethod, ABC
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Condition, Thread
+from typing import Hashable, Sequence
 
-from fmbp.const import RUNTIME_CONFIG
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.context_gate import ContextGate
 from fmbp.context_source import ContextSource
+from fmbp.metrics import StepMetrics, CACHE_HITS, SOLVES
 from fmbp.model_interface import ModelInterface
 
 
@@ -32,17 +39,253 @@ class StaticConfigurationProvider(ConfigurationProvider):
 class ContextConfigurationProvider(ConfigurationProvider):
     """
     Uses a ContextSource and a ModelInterface to generate context-sensitive configurations.
+    Optional ContextGates may skip solving, e.g. if the context did not change. Skipped calls return None.
+    Every gate sees every call, solving requires all of them to allow it.
+    Gates are bypassed once after the model has been updated.
     """
     def __init__(
             self,
             context_source: ContextSource,
             model_interface: ModelInterface,
+            gates: Sequence[ContextGate] = (),
+            metrics: StepMetrics | None = None,
     ) -> None:
+        """
+        :param metrics: Counts the solves.
+        """
+        self.__context_source = context_source
+        self.__model_interface = model_interface
+        self.__gates = tuple(gates)
+        self.__model_version = model_interface.version
+        self.__metrics = metrics
+
+    def get_configuration(self) -> RUNTIME_CONFIG | None:
+        context = self.__context_source.get_data()
+        if self.__model_interface.version != self.__model_version:
+            self.__model_version = self.__model_interface.version
+            for gate in self.__gates:
+                gate.reset()
+        else:
+            # not short-circuited, so counting gates see every call regardless of their order
+            allowed = [gate.allows(context) for gate in self.__gates]
+            if not all(allowed):
+                return None
+        if self.__metrics is not None:
+            self.__metrics.count(SOLVES)
+        config = self.__model_interface.acquire_configuration(context)
+        for gate in self.__gates:
+            gate.solved(context)
+        return config
+
+
+def canonicalize_context(context: CONTEXT_DATA) -> Hashable:
+    """
+    Converts context data into a hashable key that is independent of insertion order.
+    Types are part of the key, so e.g. True and 1 are kept apart.
+    """
+    return tuple(sorted((name, type(value), value) for name, value in context.items()))
+
+
+class MemoizingConfigurationProvider(ConfigurationProvider):
+    """
+    Like the ContextConfigurationProvider, but memoizes configurations per context and model version.
+    Repeated contexts are answered without calling the ModelInterface.
+    The cache is bounded and evicts the least recently used entry first, entries may additionally expire after a TTL.
+    """
+    def __init__(
+            self,
+            context_source: ContextSource,
+            model_interface: ModelInterface,
+            max_size: int = 1024,
+            ttl: float | None = None,
+            metrics: StepMetrics | None = None,
+    ) -> None:
+        """
+        :param max_size: Maximum number of cached configurations.
+        :param ttl: Optional time to live of cached configurations in seconds.
+        :param metrics: Counts cache hits and solves.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
         self.__context_source = context_source
         self.__model_interface = model_interface
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__cache: OrderedDict[Hashable, tuple[float, RUNTIME_CONFIG]] = OrderedDict()
+        self.__model_version = model_interface.version
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__metrics = metrics
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        return self.__evictions
+
+    def __len__(self) -> int:
+        return len(self.__cache)
+
+    def clear(self) -> None:
+        self.__evictions += len(self.__cache)
+        self.__cache.clear()
 
     def get_configuration(self) -> RUNTIME_CONFIG | None:
-        return self.__model_interface.acquire_configuration(self.__context_source.get_data())
+        if self.__model_interface.version != self.__model_version:
+            # configurations of an outdated model can never be hit again
+            self.clear()
+            self.__model_version = self.__model_interface.version
+        context = self.__context_source.get_data()
+        key = canonicalize_context(context)
+        now = time.monotonic() if self.__ttl is not None else 0.0
+        config: RUNTIME_CONFIG | None
+        entry = self.__cache.get(key)
+        if entry is not None:
+            created, config = entry
+            if self.__ttl is None or now - created < self.__ttl:
+                self.__cache.move_to_end(key)
+                self.__hits += 1
+                if self.__metrics is not None:
+                    self.__metrics.count(CACHE_HITS)
+                return dict(config)
+            del self.__cache[key]
+            self.__evictions += 1
+        self.__misses += 1
+        if self.__metrics is not None:
+            self.__metrics.count(SOLVES)
+        config = self.__model_interface.acquire_configuration(context)
+        if config is not None:
+            self.__cache[key] = (now, dict(config))
+            if len(self.__cache) > self.__max_size:
+                self.__cache.popitem(last=False)
+                self.__evictions += 1
+        return config
+
+
+class ConfigurationBatcher:
+    """
+    Collects configuration requests of many programs for a short window and solves them together.
+    Requests for interfaces with the same batch_key, i.e. the same model and backend, are sent as one batch to one of
+    them (see ModelInterface.acquire_configurations), identical contexts within a batch are solved once.
+    Batches of different models are solved concurrently.
+    """
+    def __init__(
+            self,
+            window_ms: float = 5.0,
+            expected_requests: int | None = None,
+            max_workers: int | None = None,
+    ) -> None:
+        """
+        :param window_ms: How long to collect requests after the first one arrived.
+        :param expected_requests: Dispatch immediately once this many requests are collected, e.g. the fleet size.
+        :param max_workers: Maximum number of batches solved concurrently.
+        """
+        self.__window = window_ms / 1000
+        self.__expected_requests = expected_requests
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fmbp-batch")
+        self.__condition = Condition()
+        self.__requests: list[tuple[ModelInterface, CONTEXT_DATA, Future[RUNTIME_CONFIG | None]]] = []
+        self.__batches = 0
+        self.__requests_total = 0
+        self.__closed = False
+        self.__dispatcher = Thread(target=self.__dispatch_loop, name="fmbp-batcher", daemon=True)
+        self.__dispatcher.start()
+
+    @property
+    def batches(self) -> int:
+        return self.__batches
+
+    @property
+    def requests(self) -> int:
+        return self.__requests_total
+
+    def submit(self, model_interface: ModelInterface, context: CONTEXT_DATA) -> Future[RUNTIME_CONFIG | None]:
+        future: Future[RUNTIME_CONFIG | None] = Future()
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError("The batcher has been closed")
+            self.__requests.append((model_interface, context, future))
+            self.__requests_total += 1
+            self.__condition.notify_all()
+        return future
+
+    def __dispatch_loop(self) -> None:
+        while True:
+            with self.__condition:
+                while not self.__requests and not self.__closed:
+                    self.__condition.wait()
+                if not self.__requests:
+                    return
+                deadline = time.monotonic() + self.__window
+                while (
+                        not self.__closed
+                        and (self.__expected_requests is None or len(self.__requests) < self.__expected_requests)
+                        and (remaining := deadline - time.monotonic()) > 0
+                ):
+                    self.__condition.wait(remaining)
+                requests = self.__requests
+                self.__requests = []
+            by_model: dict[Hashable, list[tuple[ModelInterface, CONTEXT_DATA, Future[RUNTIME_CONFIG | None]]]] = {}
+            for request in requests:
+                by_model.setdefault(request[0].batch_key, []).append(request)
+            for batch in by_model.values():
+                self.__batches += 1
+                self.__executor.submit(self.__solve, batch)
+
+    @staticmethod
+    def __solve(batch: list[tuple[ModelInterface, CONTEXT_DATA, Future[RUNTIME_CONFIG | None]]]) -> None:
+        model_interface = batch[0][0]
+        try:
+            keys = [canonicalize_context(context) for _, context, _ in batch]
+            unique: dict[Hashable, CONTEXT_DATA] = {}
+            for key, (_, context, _) in zip(keys, batch):
+                unique.setdefault(key, context)
+            configs = dict(zip(unique, model_interface.acquire_configurations(tuple(unique.values()))))
+        except BaseException as e:
+            # every caller of the batch is waiting for its future
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for key, (_, _, future) in zip(keys, batch):
+            config = configs[key]
+            future.set_result(None if config is None else dict(config))
+
+    def close(self) -> None:
+        """
+        Solves the requests submitted so far, then stops the dispatcher and the workers.
+        Submitting afterwards raises a RuntimeError.
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        self.__dispatcher.join()
+        self.__executor.shutdown(wait=True)
+
+
+class BatchingConfigurationProvider(ConfigurationProvider):
+    """
+    Like the ContextConfigurationProvider, but solves through a ConfigurationBatcher shared by many programs.
+    Blocks until the batch containing the request has been solved.
+    """
+    def __init__(
+            self,
+            context_source: ContextSource,
+            model_interface: ModelInterface,
+            batcher: ConfigurationBatcher,
+    ) -> None:
+        self.__context_source = context_source
+        self.__model_interface = model_interface
+        self.__batcher = batcher
+
+    def get_configuration(self) -> RUNTIME_CONFIG | None:
+        return self.__batcher.submit(self.__model_interface, self.__context_source.get_data()).result()
 
 
 class CachingConfigurationProvider(ConfigurationProvider):
@@ -73,3 +316,138 @@ class LoggingConfigurationProvider(ConfigurationProvider):
         if new_config is not None:
             print("### Reconfiguring ###")
         return new_config
+
+
+class BackgroundConfigurationProvider(ConfigurationProvider):
+    """
+    Solves configurations on a worker thread, so the event loop does not wait for the solver.
+    Each call reads the context on the calling thread and requests a configuration for it, then returns the newest
+    finished one that has not been returned yet.
+    Requests arriving while a solve is in flight are coalesced, only the latest one is kept pending.
+    Only the ModelInterface is called from the worker thread.
+    """
+    def __init__(
+            self,
+            context_source: ContextSource,
+            model_interface: ModelInterface,
+            max_staleness_steps: int | None = None,
+            max_staleness_ms: float | None = None,
+    ) -> None:
+        """
+        :param max_staleness_steps: If set, blocks as soon as the newest finished solve was requested more
+            than this many calls ago, until it catches up.
+        :param max_staleness_ms: Same as max_staleness_steps, but measured in milliseconds.
+        """
+        self.__context_source = context_source
+        self.__model_interface = model_interface
+        self.__max_staleness_steps = max_staleness_steps
+        self.__max_staleness_ms = max_staleness_ms
+        self.__condition = Condition()
+        self.__step = 0
+        # (step, monotonic time, context) of the request waiting for the worker
+        self.__pending: tuple[int, float, CONTEXT_DATA] | None = None
+        # (step, monotonic time) of the request the last finished solve was started for
+        self.__completed: tuple[int, float] | None = None
+        self.__ready: RUNTIME_CONFIG | None = None
+        self.__error: BaseException | None = None
+        self.__closed = False
+        self.__solves = 0
+        self.__coalesced = 0
+        self.__blocked = 0
+        self.__worker = Thread(target=self.__work, name="fmbp-configuration-worker", daemon=True)
+        self.__worker.start()
+
+    @property
+    def solves(self) -> int:
+        return self.__solves
+
+    @property
+    def coalesced(self) -> int:
+        """
+        :return: Number of requests that have been superseded by a newer one before the worker picked them up.
+        """
+        return self.__coalesced
+
+    @property
+    def blocked(self) -> int:
+        """
+        :return: Number of calls that had to wait because the staleness limit has been exceeded.
+        """
+        return self.__blocked
+
+    def __work(self) -> None:
+        while True:
+            with self.__condition:
+                while self.__pending is None and not self.__closed:
+                    self.__condition.wait()
+                if self.__closed:
+                    return
+                pending = self.__pending
+                assert pending is not None
+                self.__pending = None
+            step, requested_at, context = pending
+            request = (step, requested_at)
+            try:
+                config = self.__model_interface.acquire_configuration(context)
+            except BaseException as e:
+                with self.__condition:
+                    self.__error = e
+                    self.__completed = request
+                    self.__condition.notify_all()
+                continue
+            with self.__condition:
+                if config is not None:
+                    self.__ready = config
+                self.__completed = request
+                self.__solves += 1
+                self.__condition.notify_all()
+
+    def __is_too_stale(self, now: float) -> bool:
+        if self.__completed is None:
+            # nothing has been solved yet, the program must not start without a configuration
+            return True
+        completed_step, completed_at = self.__completed
+        if self.__max_staleness_steps is not None and self.__step - completed_step > self.__max_staleness_steps:
+            return True
+        if self.__max_staleness_ms is not None and (now - completed_at) * 1000 > self.__max_staleness_ms:
+            return True
+        return False
+
+    def get_configuration(self) -> RUNTIME_CONFIG | None:
+        # read here rather than on the worker, so the solve matches the state of the current step
+        context = dict(self.__context_source.get_data())
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError("Provider has been closed")
+            self.__step += 1
+            now = time.monotonic()
+            if self.__pending is not None:
+                self.__coalesced += 1
+            self.__pending = (self.__step, now, context)
+            self.__condition.notify_all()
+            if self.__is_too_stale(now):
+                self.__blocked += 1
+                # wait for the first solve that brings us back into the limits, at worst the one just requested
+                step = self.__step
+                while (
+                        self.__error is None
+                        and (self.__completed is None or self.__completed[0] < step)
+                        and self.__is_too_stale(time.monotonic())
+                ):
+                    self.__condition.wait()
+            if self.__error is not None:
+                error = self.__error
+                self.__error = None
+                raise error
+            config = self.__ready
+            self.__ready = None
+            return config
+
+    def close(self) -> None:
+        """
+        Stops the worker thread after the solve currently in flight.
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        self.__worker.join()
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import mmap
+import random
+import struct
+from math import prod
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Callable, Iterable, Mapping, Sequence
+
+from fmbp.configuration_provider import ConfigurationProvider
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.context_source import ContextSource
+from fmbp.model_interface import ModelInterface
+
+
+CONTEXT_VALUE = str | int | float | bool
+CONTEXT_DOMAIN = Mapping[str, Sequence[CONTEXT_VALUE]]
+
+_MAGIC = b"FMBPCT01"
+_HEADER_LENGTH = struct.Struct("<I")
+_CHUNK_SIZE = 64
+
+
+class OutdatedConfigurationTable(ValueError):
+    """
+    The configuration table was built from another version of the model or with another server.
+    """
+
+
+def model_fingerprint(model: Path, backend: Path | None = None) -> str:
+    """
+    :param model: The model file.
+    :param backend: Executable of the server solving the configurations, if any.
+    :return: Hash of the model's content and the executable (path, size and modification time).
+    """
+    digest = hashlib.sha256()
+    if backend is not None:
+        executable = backend.resolve()
+        stat = executable.stat()
+        digest.update(f"{executable}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+    digest.update(model.read_bytes())
+    return digest.hexdigest()
+
+
+class ConfigurationTable:
+    """
+    Read-only, memory-mapped table of precomputed configurations, written by build_configuration_table.
+    Maps every point of a discrete context domain to a configuration bitmask in O(1).
+    """
+    def __init__(self, path: Path, model: Path, backend: Path | None = None) -> None:
+        """
+        :param model: The model file the table has to be built from.
+        :param backend: Executable of the server the table has to be built with, see model_fingerprint.
+        :raises OutdatedConfigurationTable: If model or server changed since the table was built.
+        """
+        with path.open("rb") as table_file:
+            self.__mmap = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.__mmap[:len(_MAGIC)] != _MAGIC:
+            self.__mmap.close()
+            raise ValueError(f"Not a configuration table: {path}")
+        (header_length,) = _HEADER_LENGTH.unpack_from(self.__mmap, len(_MAGIC))
+        header_start = len(_MAGIC) + _HEADER_LENGTH.size
+        header = json.loads(self.__mmap[header_start:header_start + header_length])
+        if header["fingerprint"] != model_fingerprint(model, backend):
+            self.__mmap.close()
+            raise OutdatedConfigurationTable(f"{path} was not built from the current version of {model}")
+        self.attributes: tuple[str, ...] = tuple(header["attributes"])
+        self.features: tuple[str, ...] = tuple(header["features"])
+        self.__indices = tuple(
+            {value: index for index, value in enumerate(values)}
+            for values in header["domains"]
+        )
+        self.__strides = _strides(tuple(len(values) for values in header["domains"]))
+        self.__record_size: int = header["record_size"]
+        self.__records_start = _align(header_start + header_length)
+
+    def __len__(self) -> int:
+        return prod(len(indices) for indices in self.__indices)
+
+    def lookup(self, context: Mapping[str, CONTEXT_VALUE]) -> RUNTIME_CONFIG | None:
+        """
+        :return: The precomputed configuration. None if the context lies outside the table or was not computed.
+        """
+        if len(context) != len(self.attributes):
+            return None
+        index = 0
+        try:
+            for attribute, indices, stride in zip(self.attributes, self.__indices, self.__strides):
+                index += indices[context[attribute]] * stride
+        except (KeyError, TypeError):
+            return None
+        start = self.__records_start + index * self.__record_size
+        mask = int.from_bytes(self.__mmap[start:start + self.__record_size], "little")
+        if not mask & 1:
+            return None
+        return {name: bool(mask >> (bit + 1) & 1) for bit, name in enumerate(self.features)}
+
+    def close(self) -> None:
+        self.__mmap.close()
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _strides(sizes: tuple[int, ...]) -> tuple[int, ...]:
+    strides = []
+    stride = 1
+    for size in reversed(sizes):
+        strides.append(stride)
+        stride *= size
+    return tuple(reversed(strides))
+
+
+def _context_at(index: int, domain: CONTEXT_DOMAIN, strides: tuple[int, ...]) -> CONTEXT_DATA:
+    context = {}
+    for (attribute, values), stride in zip(domain.items(), strides):
+        context[attribute] = values[index // stride % len(values)]
+    return context
+
+
+_WORKER_INTERFACE: ModelInterface | None = None
+
+
+def _initialize_worker(interface_factory: Callable[[], ModelInterface]) -> None:
+    global _WORKER_INTERFACE
+    _WORKER_INTERFACE = interface_factory()
+
+
+def _solve_chunk(
+        job: tuple[tuple[int, ...], CONTEXT_DOMAIN, tuple[int, ...]],
+) -> list[tuple[int, RUNTIME_CONFIG | None]]:
+    indices, domain, strides = job
+    assert _WORKER_INTERFACE is not None
+    contexts = [_context_at(index, domain, strides) for index in indices]
+    results = []
+    for index, context in zip(indices, contexts):
+        try:
+            config = _WORKER_INTERFACE.acquire_configuration(context)
+        except ValueError:
+            # no solution for this context, live solving will report it
+            config = None
+        results.append((index, config))
+    return results
+
+
+def _chunks(indices: Iterable[int]) -> Iterable[tuple[int, ...]]:
+    chunk: list[int] = []
+    for index in indices:
+        chunk.append(index)
+        if len(chunk) == _CHUNK_SIZE:
+            yield tuple(chunk)
+            chunk = []
+    if chunk:
+        yield tuple(chunk)
+
+
+def build_configuration_table(
+        interface_factory: Callable[[], ModelInterface],
+        domain: CONTEXT_DOMAIN,
+        path: Path,
+        model: Path,
+        backend: Path | None = None,
+        processes: int | None = None,
+        sample: int | None = None,
+        seed: int | None = None,
+) -> int:
+    """
+    Solves configurations for the points of a context domain and writes them to a ConfigurationTable file.
+    Each worker process creates its own ModelInterface once and solves chunks of points with it.
+
+    :param interface_factory: Picklable callable creating the ModelInterface, e.g. a functools.partial.
+    :param domain: Values per context attribute, i.e. the attributes of the model's Env feature.
+    :param path: Output file.
+    :param model: The model file the interfaces solve, its fingerprint is stored in the table.
+    :param backend: Executable of the server the interfaces use, if any.
+    :param processes: Number of worker processes, defaults to the number of CPUs.
+    :param sample: Only solve this many randomly chosen points, the others fall back to live solving.
+    :param seed: Seed for the sample.
+    :return: Number of points a configuration has been stored for.
+    """
+    sizes = tuple(len(values) for values in domain.values())
+    strides = _strides(sizes)
+    total = prod(sizes)
+    indices: Iterable[int] = range(total)
+    if sample is not None and sample < total:
+        indices = sorted(random.Random(seed).sample(range(total), sample))
+    fingerprint = model_fingerprint(model, backend)
+    plain_domain: dict[str, list[CONTEXT_VALUE]] = {attribute: list(values) for attribute, values in domain.items()}
+    results: dict[int, RUNTIME_CONFIG] = {}
+    with Pool(processes, initializer=_initialize_worker, initargs=(interface_factory,)) as pool:
+        jobs = ((chunk, plain_domain, strides) for chunk in _chunks(indices))
+        for chunk_results in pool.imap_unordered(_solve_chunk, jobs):
+            for index, config in chunk_results:
+                if config is not None:
+                    results[index] = config
+    features = sorted({name for config in results.values() for name in config})
+    bits = {name: bit + 1 for bit, name in enumerate(features)}
+    record_size = (len(features) + 1 + 7) // 8
+    header = json.dumps({
+        "attributes": list(domain),
+        "domains": list(plain_domain.values()),
+        "features": features,
+        "record_size": record_size,
+        "fingerprint": fingerprint,
+    }).encode("utf-8")
+    with path.open("wb") as table_file:
+        table_file.write(_MAGIC)
+        table_file.write(_HEADER_LENGTH.pack(len(header)))
+        table_file.write(header)
+        records_start = _align(table_file.tell())
+        # points without a configuration stay zero, the file is sparse where supported
+        table_file.truncate(records_start + total * record_size)
+        for index in sorted(results):
+            mask = 1
+            for name, enabled in results[index].items():
+                if enabled:
+                    mask |= 1 << bits[name]
+            table_file.seek(records_start + index * record_size)
+            table_file.write(mask.to_bytes(record_size, "little"))
+    return len(results)
+
+
+class PrecomputedConfigurationProvider(ConfigurationProvider):
+    """
+    Answers from a ConfigurationTable and falls back to live solving for contexts outside of it.
+    Once the model has been updated, the table is outdated and every context is solved live.
+    """
+    def __init__(
+            self,
+            context_source: ContextSource,
+            table: ConfigurationTable,
+            model_interface: ModelInterface | None = None,
+    ) -> None:
+        """
+        :param model_interface: Used for live solving. Without it, contexts outside the table yield None.
+        """
+        self.__context_source = context_source
+        self.__table = table
+        self.__model_interface = model_interface
+        self.__model_version = model_interface.version if model_interface is not None else 0
+        self.__hits = 0
+        self.__fallbacks = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def fallbacks(self) -> int:
+        return self.__fallbacks
+
+    def get_configuration(self) -> RUNTIME_CONFIG | None:
+        context = self.__context_source.get_data()
+        if self.__model_interface is None or self.__model_interface.version == self.__model_version:
+            config = self.__table.lookup(context)
+            if config is not None:
+                self.__hits += 1
+                return config
+        self.__fallbacks += 1
+        if self.__model_interface is None:
+            return None
+        return self.__model_interface.acquire_configuration(context)
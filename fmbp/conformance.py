@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from itertools import product
+from typing import Iterable, Iterator
+
+from fmbp.configuration_table import CONTEXT_DOMAIN
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.model_interface import ModelInterface
+
+
+# outcome of a solve: the configuration, None on failure or UNSAT if the backend found no solution
+SOLVE_OUTCOME = RUNTIME_CONFIG | str | None
+UNSAT = "unsat"
+
+
+@dataclass(frozen=True)
+class ConformanceMismatch:
+    context: CONTEXT_DATA
+    reference: SOLVE_OUTCOME
+    candidate: SOLVE_OUTCOME
+
+
+@dataclass(frozen=True)
+class ConformanceReport:
+    model_info_matches: bool
+    checked: int
+    mismatches: tuple[ConformanceMismatch, ...]
+
+    @property
+    def passed(self) -> bool:
+        return self.model_info_matches and not self.mismatches
+
+
+def domain_contexts(domain: CONTEXT_DOMAIN) -> Iterator[CONTEXT_DATA]:
+    """
+    :return: Every point of the domain as context.
+    """
+    for values in product(*domain.values()):
+        yield dict(zip(domain, values))
+
+
+def _solve(interface: ModelInterface, context: CONTEXT_DATA) -> SOLVE_OUTCOME:
+    try:
+        return interface.acquire_configuration(context)
+    except ValueError:
+        return UNSAT
+
+
+def check_conformance(
+        reference: ModelInterface,
+        candidate: ModelInterface,
+        contexts: Iterable[CONTEXT_DATA],
+) -> ConformanceReport:
+    """
+    Checks that two backends export the same model information and return identical configurations.
+
+    :param reference: Backend defining the expected results, usually the UVLLSPInterface.
+    :param candidate: Backend under test.
+    :param contexts: Contexts to solve with both backends.
+    """
+    checked = 0
+    mismatches = []
+    for context in contexts:
+        checked += 1
+        expected = _solve(reference, context)
+        actual = _solve(candidate, context)
+        if expected != actual:
+            mismatches.append(ConformanceMismatch(dict(context), expected, actual))
+    return ConformanceReport(reference.model_info == candidate.model_info, checked, tuple(mismatches))
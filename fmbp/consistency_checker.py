@@ -1,7 +1,7 @@
 from abc import abstractmethod, ABC
 from dataclasses import dataclass
 
-from fmbp.bp_model import BThreadFeature, EventAttribute, b_threads_from_features
+from fmbp.bp_model import BThreadFeature, EventAttribute
 from fmbp.model_interface import ModelInterface
 
 
@@ -58,38 +58,95 @@ class UnexpectedEvent(EventInconsistencyInfo):
     event: EventAttribute
 
 
+@dataclass(frozen=True)
+class _IndexedBThread:
+    """
+    Model events of a b-thread, prepared for fast comparisons with the runtime.
+    """
+    b_thread: BThreadFeature
+    events: dict[str, EventAttribute]
+    all_events: frozenset[EventAttribute]
+    required_events: frozenset[EventAttribute]
+
+    @classmethod
+    def from_b_thread(cls, b_thread: BThreadFeature) -> "_IndexedBThread":
+        return cls(
+            b_thread,
+            {event.name: event for event in b_thread.events},
+            frozenset(b_thread.events),
+            frozenset(event for event in b_thread.events if not event.optional),
+        )
+
+
 class ConsistencyChecker(ABC):
     """
     Validates the consistency between runtime and feature model.
     """
+    def __init__(self) -> None:
+        self.__indexed_source: dict[str, BThreadFeature] | None = None
+        self.__indexed: dict[str, _IndexedBThread] = {}
+
+    @property
+    def model_version(self) -> int:
+        """
+        Changes whenever the model information changes, so results of previous checks can be reused until then.
+        """
+        return 0
+
     @abstractmethod
     def _get_model_info(self) -> dict[str, BThreadFeature]:
         pass
 
+    def __get_indexed_model_info(self) -> dict[str, _IndexedBThread]:
+        model_info = self._get_model_info()
+        # implementations return the same dict until the model changes
+        if model_info is not self.__indexed_source:
+            self.__indexed = {name: _IndexedBThread.from_b_thread(b_thread) for name, b_thread in model_info.items()}
+            self.__indexed_source = model_info
+        return self.__indexed
+
     def check_event_consistency(
             self,
             runtime_b_threads: tuple[BThreadFeature, ...]
     ) -> tuple[EventInconsistencyInfo, ...]:
-        model_info = self._get_model_info()
+        model_info = self.__get_indexed_model_info()
         info: list[EventInconsistencyInfo] = []
         for runtime_b_thread in runtime_b_threads:
-            model_b_thread = model_info.get(runtime_b_thread.name)
-            if model_b_thread is None:
+            indexed = model_info.get(runtime_b_thread.name)
+            if indexed is None:
                 raise ValueError(f"B-thread not in model: {runtime_b_thread.name}")
-            for model_event in model_b_thread.events:
-                found_event = False
-                for runtime_event in runtime_b_thread.events:
-                    if runtime_event.name == model_event.name:
-                        found_event = True
-                        if runtime_event != model_event:
-                            info.append(IncorrectEvent(model_b_thread.name, model_event, runtime_event))
-                if not found_event and not model_event.optional:
-                    info.append(MissingEvent(model_b_thread.name, model_event))
-            for runtime_event in runtime_b_thread.events:
-                if not list(filter(lambda e: e.name == runtime_event.name, model_b_thread.events)):
-                    info.append(UnexpectedEvent(runtime_b_thread.name, runtime_event))
+            # Model event names are unique per b-thread, so the runtime is consistent
+            # if its events are a subset of the model events containing all required ones.
+            runtime_events = frozenset(runtime_b_thread.events)
+            if runtime_events == indexed.all_events or indexed.required_events <= runtime_events <= indexed.all_events:
+                continue
+            info.extend(self.__diff_events(indexed, runtime_b_thread))
         return tuple(info)
 
+    @staticmethod
+    def __diff_events(
+            indexed: _IndexedBThread,
+            runtime_b_thread: BThreadFeature,
+    ) -> list[EventInconsistencyInfo]:
+        info: list[EventInconsistencyInfo] = []
+        runtime_by_name: dict[str, list[EventAttribute]] = {}
+        for runtime_event in runtime_b_thread.events:
+            runtime_by_name.setdefault(runtime_event.name, []).append(runtime_event)
+        model_b_thread = indexed.b_thread
+        for model_event in model_b_thread.events:
+            matching_events = runtime_by_name.get(model_event.name)
+            if matching_events is None:
+                if not model_event.optional:
+                    info.append(MissingEvent(model_b_thread.name, model_event))
+                continue
+            for runtime_event in matching_events:
+                if runtime_event != model_event:
+                    info.append(IncorrectEvent(model_b_thread.name, model_event, runtime_event))
+        for runtime_event in runtime_b_thread.events:
+            if runtime_event.name not in indexed.events:
+                info.append(UnexpectedEvent(runtime_b_thread.name, runtime_event))
+        return info
+
     def check_b_thread_consistency(
             self,
             b_threads: tuple[str, ...],
@@ -115,6 +172,7 @@ class StaticConsistencyChecker(ConsistencyChecker):
     Performs consistency checks on statically provided model information.
     """
     def __init__(self, model_info: dict[str, BThreadFeature]) -> None:
+        super().__init__()
         self.__model_info = model_info
 
     def _get_model_info(self) -> dict[str, BThreadFeature]:
@@ -126,7 +184,13 @@ class DynamicConsistencyChecker(ConsistencyChecker):
     Performs consistency checks on dynamically retrieved model information from a ModelInterface.
     """
     def __init__(self, uvl_interface: ModelInterface) -> None:
+        super().__init__()
         self.__uvl_interface = uvl_interface
 
+    @property
+    def model_version(self) -> int:
+        return self.__uvl_interface.version
+
     def _get_model_info(self) -> dict[str, BThreadFeature]:
-        return b_threads_from_features(self.__uvl_interface.model_info)
+        # cached by the interface until the model is updated
+        return self.__uvl_interface.b_threads
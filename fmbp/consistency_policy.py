@@ -0,0 +1,91 @@
+import random
+from abc import ABC, abstractmethod
+
+
+class ConsistencyPolicy(ABC):
+    """
+    Decides on which selected events the BPConfigurator checks the consistency between runtime and model.
+    Counts the checks it allowed and skipped.
+    """
+    def __init__(self) -> None:
+        self.__checks = 0
+        self.__skipped = 0
+
+    @property
+    def checks(self) -> int:
+        return self.__checks
+
+    @property
+    def skipped(self) -> int:
+        return self.__skipped
+
+    def should_check(self, model_changed: bool, reconfigured: bool) -> bool:
+        """
+        :param model_changed: If the model has been updated since the last selected event.
+        :param reconfigured: If the program has been reconfigured since the last selected event.
+        """
+        if self._should_check(model_changed, reconfigured):
+            self.__checks += 1
+            return True
+        self.__skipped += 1
+        return False
+
+    @abstractmethod
+    def _should_check(self, model_changed: bool, reconfigured: bool) -> bool:
+        pass
+
+
+class StrictConsistencyPolicy(ConsistencyPolicy):
+    """
+    Checks on every event.
+    """
+    def _should_check(self, model_changed: bool, reconfigured: bool) -> bool:
+        return True
+
+
+class SampledConsistencyPolicy(ConsistencyPolicy):
+    """
+    Checks every n-th event or a random fraction of the events, and always after a model update.
+    """
+    def __init__(self, every: int | None = None, fraction: float | None = None, seed: int | None = None) -> None:
+        """
+        :param every: Check every n-th event.
+        :param fraction: Check this fraction of the events, chosen randomly.
+        :param seed: Seed for the random choice.
+        """
+        super().__init__()
+        if (every is None) == (fraction is None):
+            raise ValueError("Exactly one of every and fraction has to be given")
+        if every is not None and every < 1:
+            raise ValueError("every must be at least 1")
+        if fraction is not None and not 0 <= fraction <= 1:
+            raise ValueError("fraction must be between 0 and 1")
+        self.__every = every
+        self.__fraction = fraction
+        self.__random = random.Random(seed)
+        self.__events = 0
+
+    def _should_check(self, model_changed: bool, reconfigured: bool) -> bool:
+        self.__events += 1
+        if model_changed:
+            return True
+        if self.__every is not None:
+            return self.__events % self.__every == 0
+        assert self.__fraction is not None
+        return self.__random.random() < self.__fraction
+
+
+class OnChangeConsistencyPolicy(ConsistencyPolicy):
+    """
+    Checks only after the model has been updated or the program has been reconfigured.
+    """
+    def _should_check(self, model_changed: bool, reconfigured: bool) -> bool:
+        return model_changed or reconfigured
+
+
+class DisabledConsistencyPolicy(ConsistencyPolicy):
+    """
+    Never checks after the program has started.
+    """
+    def _should_check(self, model_changed: bool, reconfigured: bool) -> bool:
+        return False
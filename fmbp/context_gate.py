@@ -0,0 +1,135 @@
+import time
+from abc import ABC, abstractmethod
+
+from fmbp.const import CONTEXT_DATA
+
+
+class ContextGate(ABC):
+    """
+    Decides if a context justifies solving a new configuration.
+    Counts the solves it prevented.
+    """
+    def __init__(self) -> None:
+        self.__skipped = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.__skipped
+
+    def allows(self, context: CONTEXT_DATA) -> bool:
+        if self._allows(context):
+            return True
+        self.__skipped += 1
+        return False
+
+    @abstractmethod
+    def _allows(self, context: CONTEXT_DATA) -> bool:
+        pass
+
+    def solved(self, context: CONTEXT_DATA) -> None:
+        """
+        Called after a configuration has been solved for the given context.
+        """
+        pass
+
+    def reset(self) -> None:
+        """
+        Forgets everything about previous solves, e.g. because the model changed.
+        """
+        pass
+
+
+class UnchangedContextGate(ContextGate):
+    """
+    Skips solving if the context equals the one of the last solve.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.__last_context: CONTEXT_DATA | None = None
+
+    def _allows(self, context: CONTEXT_DATA) -> bool:
+        return context != self.__last_context
+
+    def solved(self, context: CONTEXT_DATA) -> None:
+        self.__last_context = dict(context)
+
+    def reset(self) -> None:
+        self.__last_context = None
+
+
+class EventIntervalGate(ContextGate):
+    """
+    Solves at most every n-th call.
+    """
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.__every = every
+        self.__calls_since_solve: int | None = None
+
+    def _allows(self, context: CONTEXT_DATA) -> bool:
+        if self.__calls_since_solve is None:
+            return True
+        self.__calls_since_solve += 1
+        return self.__calls_since_solve >= self.__every
+
+    def solved(self, context: CONTEXT_DATA) -> None:
+        self.__calls_since_solve = 0
+
+    def reset(self) -> None:
+        self.__calls_since_solve = None
+
+
+class TimeIntervalGate(ContextGate):
+    """
+    Solves at most once per interval.
+    """
+    def __init__(self, interval_ms: float) -> None:
+        super().__init__()
+        self.__interval = interval_ms / 1000
+        self.__last_solve: float | None = None
+
+    def _allows(self, context: CONTEXT_DATA) -> bool:
+        return self.__last_solve is None or time.monotonic() - self.__last_solve >= self.__interval
+
+    def solved(self, context: CONTEXT_DATA) -> None:
+        self.__last_solve = time.monotonic()
+
+    def reset(self) -> None:
+        self.__last_solve = None
+
+
+class ThresholdContextGate(ContextGate):
+    """
+    Solves only if at least one context attribute changed noticeably since the last solve.
+    Numeric attributes with a threshold have to move by at least that amount,
+    all other attributes count on any change.
+    """
+    def __init__(self, thresholds: dict[str, float]) -> None:
+        super().__init__()
+        self.__thresholds = thresholds
+        self.__last_context: CONTEXT_DATA | None = None
+
+    def _allows(self, context: CONTEXT_DATA) -> bool:
+        if self.__last_context is None or context.keys() != self.__last_context.keys():
+            return True
+        for name, value in context.items():
+            last_value = self.__last_context[name]
+            threshold = self.__thresholds.get(name)
+            if (
+                    threshold is not None
+                    and isinstance(value, (int, float))
+                    and isinstance(last_value, (int, float))
+            ):
+                if abs(value - last_value) >= threshold:
+                    return True
+            elif value != last_value:
+                return True
+        return False
+
+    def solved(self, context: CONTEXT_DATA) -> None:
+        self.__last_context = dict(context)
+
+    def reset(self) -> None:
+        self.__last_context = None
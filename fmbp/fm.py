@@ -1,34 +1,163 @@
 from dataclasses import dataclass
+from functools import lru_cache
+from sys import intern
+from typing import Any, Callable, Hashable, TypeVar
 
 
 ATTRIBUTES_DICT = dict[str, str | dict[str , str | float | bool | list]]
 FEATURE_DICT = dict[str, str | list[ATTRIBUTES_DICT]]
 
 
-@dataclass
+# Immutable and hashable, so equal attributes are shared between Features and names are interned.
+@dataclass(frozen=True, slots=True)
 class Attribute:
     name: str
     value: str | float | bool | tuple["Attribute", ...]
 
+    def __post_init__(self) -> None:
+        # frozen, so the interned strings are set as described in the dataclass documentation
+        object.__setattr__(self, "name", intern(self.name))
+        if isinstance(self.value, str):
+            object.__setattr__(self, "value", intern(self.value))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # unpickling through the state of a frozen slotted dataclass is several times slower
+        return Attribute, (self.name, self.value)
+
     @classmethod
     def from_dict(cls, data: ATTRIBUTES_DICT) -> "Attribute":
-        value = list(data["value"].values())[0]
-        if isinstance(value, list):
-            value = tuple(Attribute.from_dict(sub_data) for sub_data in value)
-        return cls(
-            data["name"],
-            value,
-        )
+        return _attributes_from_dicts([data])[0]
+
+
+# Leaf attributes like type 'BEvent' or requested true repeat throughout a model and are shared between Features.
+# Typed, so the value type is part of the key, as True == 1.0.
+@lru_cache(maxsize=1 << 16, typed=True)
+def _leaf_attribute(name: str, value: str | float | bool) -> Attribute:
+    return Attribute(name, value)
+
 
+def _attributes_from_dicts(data: list[ATTRIBUTES_DICT]) -> tuple[Attribute, ...]:
+    # Iterative, so deeply nested attributes cannot exceed the recursion limit.
+    # A frame holds the name of the nested attribute being built, its data, the position to continue at and the
+    # finished children. A nested attribute is completed before its parent continues.
+    root: list[Attribute] = []
+    stack: list[tuple[str | None, list[ATTRIBUTES_DICT], int, list[Attribute]]] = [(None, data, 0, root)]
+    while stack:
+        name, items, position, built = stack.pop()
+        for index in range(position, len(items)):
+            item = items[index]
+            item_name, typed_value = item["name"], item["value"]
+            assert isinstance(item_name, str) and isinstance(typed_value, dict)
+            # the only entry is keyed by the type of the value
+            value = next(iter(typed_value.values()))
+            if isinstance(value, list):
+                stack.append((name, items, index + 1, built))
+                stack.append((item_name, value, 0, []))
+                break
+            built.append(_leaf_attribute(item_name, value))
+        else:
+            if name is not None:
+                stack[-1][3].append(Attribute(name, tuple(built)))
+    return tuple(root)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class Feature:
     name: str
     attributes: tuple[Attribute, ...]
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        return Feature, (self.name, self.attributes)
+
     @classmethod
     def from_dict(cls, data: FEATURE_DICT) -> "Feature":
-        return cls(
-            data["name"],
-            tuple(Attribute.from_dict(attribute_data) for attribute_data in data["attributes"]),
-        )
\ No newline at end of file
+        attributes = data["attributes"]
+        assert isinstance(attributes, list)
+        return cls(intern(str(data["name"])), _attributes_from_dicts(attributes))
+
+ATTRIBUTE_VALUE = str | float | bool | tuple[Attribute, ...]
+T = TypeVar("T")
+
+
+class FeatureModel:
+    """
+    Indexed view of the model information with O(1) lookups by feature, attribute or path like Config.target_temp.
+    Derived values are cached until the model changes, ModelInterface.feature_model builds one per model version.
+    """
+    def __init__(self, features: tuple[Feature, ...]) -> None:
+        self.features = features
+        self.__features = {feature.name: feature for feature in features}
+        self.__attributes = {
+            (feature.name, attribute.name): attribute
+            for feature in features
+            for attribute in feature.attributes
+        }
+        self.__derived: dict[Hashable, Any] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__features
+
+    def feature(self, name: str) -> Feature:
+        return self.__features[name]
+
+    def attr(self, feature: str, name: str) -> Attribute:
+        return self.__attributes[(feature, name)]
+
+    def value(self, path: str) -> ATTRIBUTE_VALUE:
+        """
+        :param path: Feature and attribute names separated by dots, e.g. Config.follow_distance.
+        Nested attributes are addressed by further names, e.g. Charge.CHARGE.priority.
+        :raises KeyError: If the path does not exist.
+        """
+        return self.derived(("value", path), lambda model: model.__resolve(path))
+
+    def __resolve(self, path: str) -> ATTRIBUTE_VALUE:
+        feature, name, *nested = path.split(".")
+        value = self.attr(feature, name).value
+        for nested_name in nested:
+            if not isinstance(value, tuple):
+                raise KeyError(path)
+            for attribute in value:
+                if attribute.name == nested_name:
+                    value = attribute.value
+                    break
+            else:
+                raise KeyError(path)
+        return value
+
+    def number(self, path: str) -> float:
+        value = self.value(path)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"{path} is not a number: {value!r}")
+        return value
+
+    def string(self, path: str) -> str:
+        value = self.value(path)
+        if not isinstance(value, str):
+            raise TypeError(f"{path} is not a string: {value!r}")
+        return value
+
+    def boolean(self, path: str) -> bool:
+        value = self.value(path)
+        if not isinstance(value, bool):
+            raise TypeError(f"{path} is not a boolean: {value!r}")
+        return value
+
+    def split(self, path: str, separator: str = ",") -> tuple[str, ...]:
+        """
+        :return: The string value split into its stripped parts, e.g. a list of ids.
+        """
+        return self.derived(
+            ("split", path, separator),
+            lambda model: tuple(part.strip() for part in model.string(path).split(separator)),
+        )
+
+    def derived(self, key: Hashable, compute: Callable[["FeatureModel"], T]) -> T:
+        """
+        :return: The value computed once per model version for the given key.
+        """
+        try:
+            value: T = self.__derived[key]
+        except KeyError:
+            value = self.__derived[key] = compute(self)
+        return value
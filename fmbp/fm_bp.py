@@ -6,10 +6,17 @@ from fmbp.bp_model import BThreadFeature, EventAttribute
 from fmbp.configuration_provider import ConfigurationProvider, StaticConfigurationProvider
 from fmbp.consistency_checker import ConsistencyChecker, MissingEvent, IncorrectEvent, UnexpectedEvent, \
     MissingBThread, UnexpectedBThread, EventInconsistencyError, BThreadInconsistencyError
+from fmbp.consistency_policy import ConsistencyPolicy, StrictConsistencyPolicy
 from fmbp.const import RUNTIME_CONFIG
+from fmbp.metrics import StepMetrics, step_timer, WATCH, B_THREAD_CONSISTENCY, EVENT_CONSISTENCY, LISTENER, \
+    CONFIGURATION, RECONFIGURATION, NEW_CONFIGURATIONS, RECONFIGURATIONS, B_THREADS_ENABLED, B_THREADS_DISABLED
 from fmbp.model_watcher import ModelWatcher
 
 
+# names of the requested, blocked and waited-for events and the priority of a sync statement
+SYNC_SIGNATURE = tuple[str | None, str | None, str | None, int | None]
+
+
 class FMThread:
     def __init__(self, name: str, bp_wrapper: Any, *args: Any) -> None:
         self.name = name
@@ -40,6 +47,10 @@ class FMBProgram(BProgram):
         self.__listener = listener
         self.__name_to_thread = {}
         self.__thread_to_name = {}
+        # Position of each named b-thread's ticket in self.tickets and the names of all tickets in the same order,
+        # so tickets can be found and removed in O(1).
+        self.__ticket_positions: dict[str, int] = {}
+        self.__ticket_names: list[str | None] = []
         for b_thread in bthreads:
             name = b_thread.name
             gen = b_thread.get_generator()
@@ -52,32 +63,77 @@ class FMBProgram(BProgram):
             listener
         )
 
+    def load_new_bthreads(self) -> None:
+        start = len(self.tickets)
+        super().load_new_bthreads()
+        for position in range(start, len(self.tickets)):
+            name = self.__thread_to_name.get(self.tickets[position].get("bt"))
+            self.__ticket_names.append(name)
+            if name is not None:
+                self.__ticket_positions[name] = position
+
+    def __remove_ticket(self, name: str) -> None:
+        position = self.__ticket_positions.pop(name, None)
+        if position is None:
+            return
+        # the last ticket takes the place of the removed one, the order of tickets is irrelevant for event selection
+        last = len(self.tickets) - 1
+        if position != last:
+            self.tickets[position] = self.tickets[last]
+            moved_name = self.__ticket_names[last]
+            self.__ticket_names[position] = moved_name
+            if moved_name is not None:
+                self.__ticket_positions[moved_name] = position
+        self.tickets.pop()
+        self.__ticket_names.pop()
+
+    def is_enabled(self, name: str) -> bool:
+        position = self.__ticket_positions.get(name)
+        # finished b-threads leave an empty ticket behind
+        return position is not None and "bt" in self.tickets[position]
+
+    def active_b_thread_names(self) -> tuple[str, ...]:
+        return tuple(name for name in self.__ticket_positions if self.is_enabled(name))
+
     def enable_b_thread(self, name: str) -> bool:
         maybe_thread_function = self.__name_to_thread.get(name)
-        if maybe_thread_function is None:
+        if maybe_thread_function is None or self.is_enabled(name):
             return False
-        ticket: dict[str, Any]
-        for ticket in self.tickets:
-            if ticket["bt"] is maybe_thread_function:
-                return False
+        self.__remove_ticket(name)
         self.add_bthread(maybe_thread_function)
         self.load_new_bthreads()
         return True
 
     def disable_b_thread(self, name: str) -> bool:
-        maybe_thread_function = self.__name_to_thread.get(name)
-        if maybe_thread_function is None:
+        if name not in self.__name_to_thread:
             return False
-        ticket_to_delete = None
-        ticket: dict[str, Any]
-        for ticket in self.tickets:
-            if ticket["bt"] is maybe_thread_function:
-                ticket_to_delete = ticket
-                break
-        if ticket_to_delete is not None:
-            self.tickets.remove(ticket_to_delete)
-            return True
-        return False
+        enabled = self.is_enabled(name)
+        self.__remove_ticket(name)
+        return enabled
+
+    def apply_configuration(self, config: RUNTIME_CONFIG) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """
+        Enables and disables b-threads according to a configuration.
+        Only b-threads whose state differs are touched, newly enabled ones are loaded together in one pass.
+        Names that are no b-threads of this program are ignored.
+
+        :return: Names of the enabled and of the disabled b-threads.
+        """
+        added = []
+        removed = []
+        for name, to_activate in config.items():
+            b_thread = self.__name_to_thread.get(name)
+            if b_thread is None or to_activate == self.is_enabled(name):
+                continue
+            self.__remove_ticket(name)
+            if to_activate:
+                self.add_bthread(b_thread)
+                added.append(name)
+            else:
+                removed.append(name)
+        if added:
+            self.load_new_bthreads()
+        return tuple(added), tuple(removed)
 
     def get_generator(self, name: str) -> Any | None:
         return self.__name_to_thread.get(name)
@@ -124,6 +180,12 @@ class SimpleBProgramRunnerListener(BProgramRunnerListener):
     def halted(self, b_program):
         pass
 
+    def reconfigured(self, b_program, added: tuple[str, ...], removed: tuple[str, ...]):
+        """
+        Called by the BPConfigurator after a new configuration enabled or disabled b-threads.
+        """
+        pass
+
 
 class BPConfigurator(SimpleBProgramRunnerListener):
     """
@@ -136,34 +198,80 @@ class BPConfigurator(SimpleBProgramRunnerListener):
             configuration_provider: ConfigurationProvider | None = None,
             fm_consistency_checker: ConsistencyChecker | None = None,
             uvl_file_watcher: ModelWatcher | None = None,
+            consistency_policy: ConsistencyPolicy | None = None,
+            metrics: StepMetrics | None = None,
     ) -> None:
+        """
+        :param consistency_policy: Decides on which events consistency is checked, defaults to every event.
+        :param metrics: Records the duration of every phase of a step and counts configurations and reconfigurations.
+        """
         self.__listener = listener or SimpleBProgramRunnerListener()
         self.__configuration_provider = configuration_provider
         self.__consistency_checker = fm_consistency_checker
         self.__watcher = uvl_file_watcher
+        self.__consistency_policy = consistency_policy or StrictConsistencyPolicy()
+        self.__metrics = metrics
+        self.__policy_model_version: int | None = None
+        self.__reconfigured = False
+        # Model versions the last successful checks ran against and the sync statements checked since then.
+        # Only b-threads whose sync statement changed have to be checked again.
+        self.__b_thread_consistency_version: int | None = None
+        self.__event_consistency_version: int | None = None
+        self.__checked_syncs: dict[Any, SYNC_SIGNATURE] = {}
+
+    @property
+    def consistency_policy(self) -> ConsistencyPolicy:
+        return self.__consistency_policy
 
     def __maybe_get_new_config(self) -> dict[str, bool] | None:
         assert self.__configuration_provider is not None
         return self.__configuration_provider.get_configuration()
 
+    @staticmethod
+    def __sync_signature(ticket: dict[str, Any]) -> SYNC_SIGNATURE:
+        request: BEvent | None = ticket.get("request")
+        block: BEvent | None = ticket.get("block")
+        wait_for: BEvent | None = ticket.get("waitFor")
+        return (
+            request.name if request else None,
+            block.name if block else None,
+            wait_for.name if wait_for else None,
+            ticket.get("priority"),
+        )
+
+    @staticmethod
+    def __runtime_b_thread(name: str | None, sync: SYNC_SIGNATURE) -> BThreadFeature:
+        request, block, wait_for, priority = sync
+        events = []
+        if request is not None:
+            events.append(EventAttribute(request, requested=True, priority=priority or 0))
+        if block is not None:
+            events.append(EventAttribute(block, blocked=True, priority=priority or 0))
+        if wait_for is not None:
+            events.append(EventAttribute(wait_for, waited_for=True, priority=priority or 0))
+        return BThreadFeature(name, tuple(events))
+
     def __assert_event_consistency(self, b_program: FMBProgram) -> None:
         if self.__consistency_checker is not None:
-            runtime_b_threads = []
+            if self.__consistency_checker.model_version != self.__event_consistency_version:
+                self.__checked_syncs = {}
+                self.__event_consistency_version = self.__consistency_checker.model_version
+            changed_syncs = {}
             ticket: dict[str, Any]
             for ticket in b_program.tickets:
-                events = []
-                request: BEvent | None = ticket.get("request")
-                block: BEvent | None = ticket.get("block")
-                wait_for: BEvent | None = ticket.get("waitFor")
-                priority: int | None = ticket.get("priority")
-                if request:
-                    events.append(EventAttribute(request.name, requested=True, priority=priority or 0))
-                if block:
-                    events.append(EventAttribute(block.name, blocked=True, priority=priority or 0))
-                if wait_for:
-                    events.append(EventAttribute(wait_for.name, waited_for=True, priority=priority or 0))
-                name = b_program.get_name(ticket["bt"])
-                runtime_b_threads.append(BThreadFeature(name, tuple(events)))
+                # finished b-threads leave empty tickets behind
+                b_thread = ticket.get("bt")
+                if b_thread is None:
+                    continue
+                sync = self.__sync_signature(ticket)
+                if self.__checked_syncs.get(b_thread) != sync:
+                    changed_syncs[b_thread] = sync
+            if not changed_syncs:
+                return
+            runtime_b_threads = [
+                self.__runtime_b_thread(b_program.get_name(b_thread), sync)
+                for b_thread, sync in changed_syncs.items()
+            ]
             final_errors = []
             for result in self.__consistency_checker.check_event_consistency(tuple(runtime_b_threads)):
                 match result:
@@ -187,9 +295,14 @@ class BPConfigurator(SimpleBProgramRunnerListener):
                 raise EventInconsistencyError(
                     "Runtime and model have diverged:\n\n" + "\n\n".join(final_errors)
                 )
+            self.__checked_syncs.update(changed_syncs)
 
     def __assert_b_thread_consistency(self, b_program: FMBProgram) -> None:
-        if self.__consistency_checker is not None:
+        # the b-thread names of a program are fixed, so the result only changes with the model
+        if (
+                self.__consistency_checker is not None
+                and self.__consistency_checker.model_version != self.__b_thread_consistency_version
+        ):
             final_errors = []
             for result in self.__consistency_checker.check_b_thread_consistency(b_program.get_all_b_thread_names())  :
                 match result:
@@ -202,6 +315,7 @@ class BPConfigurator(SimpleBProgramRunnerListener):
                     raise BThreadInconsistencyError(
                         "Runtime and model have diverged:\n\n" + "\n".join(final_errors)
                     )
+            self.__b_thread_consistency_version = self.__consistency_checker.model_version
 
 
     def starting(self, b_program: BProgram):
@@ -216,24 +330,51 @@ class BPConfigurator(SimpleBProgramRunnerListener):
         if maybe_new_config is not None:
             self.__reconfigure_program(b_program, maybe_new_config)
 
-    @staticmethod
-    def __reconfigure_program(b_program: FMBProgram, config: RUNTIME_CONFIG) -> None:
-        for b_thread, to_activate in config.items():
-            if to_activate:
-                b_program.enable_b_thread(b_thread)
-            else:
-                b_program.disable_b_thread(b_thread)
+    def __reconfigure_program(self, b_program: FMBProgram, config: RUNTIME_CONFIG) -> None:
+        # Compared with the enabled b-threads rather than the last configuration,
+        # b-threads may have finished or been enabled and disabled directly since then.
+        added, removed = b_program.apply_configuration(config)
+        if self.__metrics is not None:
+            self.__metrics.count(NEW_CONFIGURATIONS)
+            if added or removed:
+                self.__metrics.count(RECONFIGURATIONS)
+                self.__metrics.count(B_THREADS_ENABLED, len(added))
+                self.__metrics.count(B_THREADS_DISABLED, len(removed))
+        if added or removed:
+            self.__reconfigured = True
+            if isinstance(self.__listener, SimpleBProgramRunnerListener):
+                self.__listener.reconfigured(b_program, added, removed)
+
+    def __should_check_consistency(self, model_updated: bool) -> bool:
+        if self.__consistency_checker is None:
+            return False
+        # the model may also have been updated by someone else than the watcher
+        model_version = self.__consistency_checker.model_version
+        model_changed = model_updated or model_version != self.__policy_model_version
+        self.__policy_model_version = model_version
+        reconfigured = self.__reconfigured
+        self.__reconfigured = False
+        return self.__consistency_policy.should_check(model_changed, reconfigured)
 
     def event_selected(self, b_program: BProgram, event: BEvent) -> bool | None:
         assert isinstance(b_program, FMBProgram)
-        if self.__watcher:
-            self.__watcher.check()
-        self.__assert_b_thread_consistency(b_program)
-        self.__assert_event_consistency(b_program)
+        timer = step_timer(self.__metrics)
+        model_updated = self.__watcher.check() if self.__watcher else False
+        timer.lap(WATCH)
+        if self.__should_check_consistency(model_updated):
+            self.__assert_b_thread_consistency(b_program)
+            timer.lap(B_THREAD_CONSISTENCY)
+            self.__assert_event_consistency(b_program)
+            timer.lap(EVENT_CONSISTENCY)
         to_return = self.__listener.event_selected(b_program, event)
+        timer.lap(LISTENER)
         if to_return:
+            timer.stop()
             return to_return
         maybe_new_config = self.__maybe_get_new_config()
+        timer.lap(CONFIGURATION)
         if maybe_new_config is not None:
             self.__reconfigure_program(b_program, maybe_new_config)
+            timer.lap(RECONFIGURATION)
+        timer.stop()
         return None
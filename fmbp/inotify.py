@@ -0,0 +1,112 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class InotifyEvent:
+    watch_descriptor: int
+    mask: int
+    cookie: int
+    name: str
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        # probe the symbols, older or exotic libcs may lack them
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_LIBC = _load_libc()
+
+
+def inotify_available() -> bool:
+    """
+    :return: If inotify can be used on this platform.
+    """
+    return _LIBC is not None
+
+
+class Inotify:
+    """
+    Minimal ctypes binding to the Linux inotify API.
+    Events are read from a non-blocking descriptor, waiting is done with poll, so no thread burns CPU while waiting.
+    """
+    def __init__(self) -> None:
+        if _LIBC is None:
+            raise OSError("inotify is not available on this platform")
+        fd = _LIBC.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.__fd: int = fd
+        self.__poll = select.poll()
+        self.__poll.register(fd, select.POLLIN)
+
+    def fileno(self) -> int:
+        return self.__fd
+
+    def add_watch(self, path: Path, mask: int) -> int:
+        assert _LIBC is not None
+        watch_descriptor = _LIBC.inotify_add_watch(self.__fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if watch_descriptor < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return int(watch_descriptor)
+
+    def read_events(self, timeout: float | None = None) -> tuple[InotifyEvent, ...]:
+        """
+        Waits for events.
+
+        :param timeout: Maximum time to wait in seconds. None waits indefinitely, 0 does not wait at all.
+        :return: The pending events. Empty if the timeout expired.
+        """
+        if not self.__poll.poll(None if timeout is None else max(timeout, 0.0) * 1000):
+            return ()
+        try:
+            data = os.read(self.__fd, _READ_SIZE)
+        except BlockingIOError:
+            return ()
+        events = []
+        offset = 0
+        while offset < len(data):
+            watch_descriptor, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append(InotifyEvent(watch_descriptor, mask, cookie, os.fsdecode(name)))
+        return tuple(events)
+
+    def close(self) -> None:
+        if self.__fd >= 0:
+            os.close(self.__fd)
+            self.__fd = -1
@@ -0,0 +1,92 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+from fmbp.lsp_trace import LSPTracer
+from fmbp.model_interface import LSPServerPool, UVLLSPInterface
+from fmbp.model_snapshot import ModelSnapshotCache
+
+
+@dataclass(frozen=True)
+class InterfaceStartup:
+    """
+    Startup times of one interface in seconds.
+    """
+    model: Path
+    # time spent constructing the interface
+    duration: float
+    # time from the start of the fleet until the interface could serve the first event of its program,
+    # including the server connect running in the background when the model information came from a snapshot
+    ready: float
+
+
+@dataclass(frozen=True)
+class FleetStartup:
+    """
+    Interfaces started by start_uvl_interfaces, in the order of their models, and how long starting them took.
+    """
+    interfaces: tuple[UVLLSPInterface, ...]
+    startups: tuple[InterfaceStartup, ...]
+    # seconds until all interfaces were ready
+    total: float
+
+    def summary(self) -> str:
+        lines = [f"{'model':<30} {'duration s':>11} {'ready s':>8}"]
+        for startup in self.startups:
+            lines.append(f"{startup.model.name:<30} {startup.duration:>11.3f} {startup.ready:>8.3f}")
+        lines.append(f"{'total':<30} {'':>11} {self.total:>8.3f}")
+        return "\n".join(lines)
+
+
+def start_uvl_interfaces(
+        models: Sequence[Path],
+        lsp: Path | LSPServerPool,
+        max_workers: int | None = None,
+        configuration_timeout: float = 30.0,
+        snapshot_cache: ModelSnapshotCache | None = None,
+        tracer: LSPTracer | None = None,
+) -> FleetStartup:
+    """
+    Starts one UVLLSPInterface per model concurrently.
+    Spawning the servers, the handshakes, opening the documents and the exports of different models overlap.
+    If an interface fails to start, the others are closed once they have been started and the error is raised.
+
+    :param lsp: Path to the server executable or a pool of running servers, see UVLLSPInterface.
+    :param max_workers: Maximum number of interfaces started at the same time, 1 starts them one after another.
+    All at once by default.
+    :param tracer: Shared by all interfaces, their spans are told apart by the threads that recorded them.
+    """
+    start = time.perf_counter()
+
+    def start_interface(model: Path) -> tuple[UVLLSPInterface, InterfaceStartup]:
+        interface_start = time.perf_counter()
+        interface = UVLLSPInterface(model, lsp, configuration_timeout, snapshot_cache, tracer)
+        constructed = time.perf_counter()
+        # raises if the server failed to start in the background, there is nothing to close then
+        interface.wait_for_servers()
+        return interface, InterfaceStartup(model, constructed - interface_start, time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(models), 1)) as executor:
+        futures = [executor.submit(start_interface, model) for model in models]
+    started = []
+    error: BaseException | None = None
+    for future in futures:
+        try:
+            started.append(future.result())
+        except BaseException as e:
+            error = error or e
+    if error is not None:
+        for interface, _ in started:
+            try:
+                interface.close_uvl()
+            except Exception:
+                logging.exception(f"Failed to close the interface of {interface.model}")
+        raise error
+    return FleetStartup(
+        tuple(interface for interface, _ in started),
+        tuple(startup for _, startup in started),
+        time.perf_counter() - start,
+    )
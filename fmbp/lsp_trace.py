@@ -0,0 +1,189 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, ContextManager, Iterator
+
+
+# Arguments of the spans
+# bytes written to and read from the server
+BYTES_SENT = "bytes_sent"
+BYTES_RECEIVED = "bytes_received"
+# time waiting for a server of the pool
+QUEUE = "queue_ms"
+# time writing requests and waiting for the answers of the server
+SEND = "send_ms"
+SERVER = "server_ms"
+# time decoding answers
+PARSE = "parse_ms"
+# time waiting for the server to write a generated configuration
+CONFIG_FILE = "config_file_ms"
+
+
+@dataclass(frozen=True, slots=True)
+class TraceSpan:
+    """
+    A finished span, times are in seconds since the tracer was created.
+    """
+    name: str
+    category: str
+    start: float
+    duration: float
+    thread_id: int
+    thread_name: str
+    args: dict[str, Any]
+
+
+class ActiveSpan:
+    """
+    A span that is being recorded.
+    """
+    __slots__ = ("args",)
+
+    def __init__(self, args: dict[str, Any]) -> None:
+        self.args = args
+
+    def add(self, key: str, amount: int) -> None:
+        self.args[key] = self.args.get(key, 0) + amount
+
+    def add_time(self, key: str, seconds: float) -> None:
+        """
+        Adds to a time argument, kept in milliseconds.
+        """
+        self.args[key] = self.args.get(key, 0.0) + seconds * 1e3
+
+
+class _DisabledSpan:
+    def add(self, key: str, amount: int) -> None:
+        pass
+
+    def add_time(self, key: str, seconds: float) -> None:
+        pass
+
+
+_DISABLED_SPAN = _DisabledSpan()
+
+
+class LSPTracer:
+    """
+    Records spans of the exchanges with language servers in a ring buffer, dropping the oldest ones when it is full.
+    Spans of nested operations, e.g. of a configuration request and the exchanges it consists of,
+    are recorded separately and nest by time when dumped to the Chrome trace-event format.
+    """
+    def __init__(self, capacity: int = 10_000) -> None:
+        """
+        :param capacity: Maximum number of spans kept.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.__lock = Lock()
+        self.__spans: deque[TraceSpan] = deque(maxlen=capacity)
+        self.__recorded = 0
+        self.__origin = time.perf_counter()
+
+    @property
+    def dropped(self) -> int:
+        """
+        :return: Number of spans that have been pushed out of the buffer.
+        """
+        with self.__lock:
+            return self.__recorded - len(self.__spans)
+
+    @contextmanager
+    def span(self, name: str, category: str = "lsp", **args: Any) -> Iterator[ActiveSpan]:
+        """
+        Records a span covering the context, also if it raises.
+        Arguments can be added to the yielded span while it is active.
+        """
+        active = ActiveSpan(dict(args))
+        start = time.perf_counter()
+        try:
+            yield active
+        finally:
+            end = time.perf_counter()
+            thread = threading.current_thread()
+            span = TraceSpan(
+                name, category, start - self.__origin, end - start, threading.get_ident(), thread.name, active.args,
+            )
+            with self.__lock:
+                self.__spans.append(span)
+                self.__recorded += 1
+
+    def spans(self) -> tuple[TraceSpan, ...]:
+        with self.__lock:
+            return tuple(self.__spans)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__spans.clear()
+            self.__recorded = 0
+
+    def summary(self) -> str:
+        """
+        :return: Count, mean duration and means of the time arguments per span name.
+        """
+        by_name: dict[str, list[TraceSpan]] = {}
+        for span in self.spans():
+            by_name.setdefault(span.name, []).append(span)
+        lines = [f"{'span':<28} {'count':>7} {'mean ms':>9}  mean arguments"]
+        for name, spans in sorted(by_name.items()):
+            totals: dict[str, float] = {}
+            for span in spans:
+                for key, value in span.args.items():
+                    if isinstance(value, (int, float)):
+                        totals[key] = totals.get(key, 0.0) + value
+            arguments = " ".join(f"{key}={total / len(spans):.3f}" for key, total in sorted(totals.items()))
+            mean = sum(span.duration for span in spans) / len(spans) * 1e3
+            lines.append(f"{name:<28} {len(spans):>7} {mean:>9.3f}  {arguments}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """
+        :return: The spans in the Chrome trace-event format, as read by chrome://tracing and Perfetto.
+        """
+        pid = os.getpid()
+        events: list[dict[str, Any]] = []
+        threads: dict[int, str] = {}
+        for span in self.spans():
+            threads.setdefault(span.thread_id, span.thread_name)
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.args,
+            })
+        for thread_id, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """
+        Writes the spans atomically in the Chrome trace-event format.
+        """
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as file:
+            json.dump(self.chrome_trace(), file, default=str)
+        os.replace(file.name, path)
+
+
+def trace_span(
+        tracer: LSPTracer | None,
+        name: str,
+        category: str = "lsp",
+        **args: Any,
+) -> ContextManager[ActiveSpan | _DisabledSpan]:
+    """
+    :return: Context recording a span with the tracer. Records nothing without tracer.
+    """
+    if tracer is None:
+        return nullcontext(_DISABLED_SPAN)
+    return tracer.span(name, category, **args)
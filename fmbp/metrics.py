@@ -0,0 +1,202 @@
+import os
+import tempfile
+import time
+from bisect import bisect_left
+from pathlib import Path
+from threading import Lock
+from typing import Sequence
+
+
+# Upper bounds in seconds, from the microseconds of a cached step to the seconds of a slow solve.
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Phases of BPConfigurator.event_selected, STEP covers all of them.
+STEP = "step"
+WATCH = "watch"
+B_THREAD_CONSISTENCY = "b_thread_consistency"
+EVENT_CONSISTENCY = "event_consistency"
+LISTENER = "listener"
+CONFIGURATION = "configuration"
+RECONFIGURATION = "reconfiguration"
+# Counters
+SOLVES = "solves"
+CACHE_HITS = "cache_hits"
+NEW_CONFIGURATIONS = "new_configurations"
+RECONFIGURATIONS = "reconfigurations"
+B_THREADS_ENABLED = "b_threads_enabled"
+B_THREADS_DISABLED = "b_threads_disabled"
+
+
+class Histogram:
+    """
+    Counts observations in fixed buckets, like a Prometheus histogram.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        :param buckets: Increasing upper bounds of the buckets, a last bucket for larger values is added.
+        """
+        if list(buckets) != sorted(set(buckets)):
+            raise ValueError("Bucket bounds must be strictly increasing")
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile by linear interpolation inside its bucket, like Prometheus' histogram_quantile.
+        Quantiles in the last bucket are reported as its lower bound.
+
+        :param q: Quantile between 0 and 1.
+        :return: The estimate, 0 without observations.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if cumulative + count >= rank and count > 0:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+
+class _PhaseTimer:
+    def __init__(self, metrics: "StepMetrics") -> None:
+        self.__metrics = metrics
+        self.__laps: list[tuple[str, float]] = []
+        self.__start = self.__last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """
+        Attributes the time since the last lap to the phase.
+        """
+        now = time.perf_counter()
+        self.__laps.append((phase, now - self.__last))
+        self.__last = now
+
+    def stop(self) -> None:
+        """
+        Records the laps and the whole step at once.
+        """
+        self.__laps.append((STEP, time.perf_counter() - self.__start))
+        self.__metrics.observe_all(self.__laps)
+
+
+class _DisabledTimer:
+    def lap(self, phase: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+_DISABLED_TIMER = _DisabledTimer()
+
+
+class StepMetrics:
+    """
+    Latency histograms per phase of the BPConfigurator step and counters of what the steps did.
+    Components count into it if they are given the same StepMetrics.
+    Exports to the Prometheus text format, e.g. for the textfile collector of the node exporter.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.__buckets = tuple(buckets)
+        self.__lock = Lock()
+        self.__histograms: dict[str, Histogram] = {}
+        self.__counters: dict[str, int] = {}
+
+    def timer(self) -> _PhaseTimer:
+        """
+        :return: Timer of one step, started now.
+        """
+        return _PhaseTimer(self)
+
+    def observe(self, phase: str, seconds: float) -> None:
+        self.observe_all(((phase, seconds),))
+
+    def observe_all(self, observations: Sequence[tuple[str, float]]) -> None:
+        with self.__lock:
+            for phase, seconds in observations:
+                histogram = self.__histograms.get(phase)
+                if histogram is None:
+                    histogram = self.__histograms[phase] = Histogram(self.__buckets)
+                histogram.observe(seconds)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        with self.__lock:
+            self.__counters[counter] = self.__counters.get(counter, 0) + amount
+
+    def counter(self, counter: str) -> int:
+        return self.__counters.get(counter, 0)
+
+    def histogram(self, phase: str) -> Histogram | None:
+        return self.__histograms.get(phase)
+
+    def quantile(self, q: float, phase: str = STEP) -> float:
+        """
+        :return: Estimated quantile of the phase's latency in seconds, 0 if it has not been observed.
+        """
+        histogram = self.__histograms.get(phase)
+        return 0.0 if histogram is None else histogram.quantile(q)
+
+    def summary(self) -> str:
+        lines = [f"{'phase':<22} {'count':>8} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8}"]
+        with self.__lock:
+            for phase, histogram in sorted(self.__histograms.items()):
+                mean = histogram.sum / histogram.count
+                lines.append(
+                    f"{phase:<22} {histogram.count:>8} {mean * 1e3:>9.3f} "
+                    f"{histogram.quantile(0.5) * 1e3:>8.3f} {histogram.quantile(0.99) * 1e3:>8.3f}"
+                )
+            for counter, value in sorted(self.__counters.items()):
+                lines.append(f"{counter:<22} {value:>8}")
+        return "\n".join(lines)
+
+    def prometheus_text(self, prefix: str = "fmbp") -> str:
+        """
+        :return: All histograms and counters in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.__lock:
+            if self.__histograms:
+                name = f"{prefix}_step_phase_seconds"
+                lines.append(f"# HELP {name} Duration of the phases of a BPConfigurator step.")
+                lines.append(f"# TYPE {name} histogram")
+                for phase, histogram in sorted(self.__histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{phase="{phase}"}} {histogram.sum}')
+                    lines.append(f'{name}_count{{phase="{phase}"}} {histogram.count}')
+            for counter, value in sorted(self.__counters.items()):
+                name = f"{prefix}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path, prefix: str = "fmbp") -> None:
+        """
+        Writes the metrics atomically, so scrapers never read a partial file.
+        """
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as file:
+            file.write(self.prometheus_text(prefix))
+        os.replace(file.name, path)
+
+
+def step_timer(metrics: StepMetrics | None) -> _PhaseTimer | _DisabledTimer:
+    """
+    :return: Timer of one step, started now. Does nothing without metrics.
+    """
+    return _DISABLED_TIMER if metrics is None else metrics.timer()
@@ -1,17 +1,65 @@
+import asyncio
 import json
 import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+import weakref
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from difflib import SequenceMatcher
 from json import JSONDecodeError
 from pathlib import Path
+from io import BufferedReader
 from subprocess import Popen, PIPE
-from typing import Optional
+from threading import Lock, RLock, Thread
+from typing import Any, Hashable, Iterator, Optional, Sequence
 
 from sansio_lsp_client import Client, JSONDict, TextDocumentItem, Event, TextDocumentIdentifier, \
     VersionedTextDocumentIdentifier, TextDocumentContentChangeEvent, ShowMessage, PublishDiagnostics, Diagnostic, \
-    DiagnosticSeverity
+    DiagnosticSeverity, Initialized, Position, Range
 
+from fmbp.bp_model import BThreadFeature, b_threads_from_features
 from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
-from fmbp.fm import Feature
+from fmbp.fm import Feature, FeatureModel, FEATURE_DICT
+from fmbp.inotify import Inotify, inotify_available, IN_CLOSE_WRITE, IN_MOVED_TO
+from fmbp.lsp_trace import ActiveSpan, LSPTracer, trace_span, BYTES_RECEIVED, BYTES_SENT, CONFIG_FILE, PARSE, QUEUE, \
+    SEND, SERVER
+from fmbp.model_snapshot import ModelSnapshot, ModelSnapshotCache
+
+
+class ModelState:
+    """
+    Model information of one version of the model and the views derived from it, each built at most once.
+    Replaced as a whole on updates, so readers never see parts of different versions.
+    """
+    __slots__ = ("version", "model_info", "__feature_model", "__b_threads")
+
+    def __init__(
+            self,
+            version: int,
+            model_info: tuple[Feature, ...],
+            b_threads: dict[str, BThreadFeature] | None = None,
+    ) -> None:
+        self.version = version
+        self.model_info = model_info
+        self.__feature_model: FeatureModel | None = None
+        self.__b_threads = b_threads
+
+    @property
+    def feature_model(self) -> FeatureModel:
+        if self.__feature_model is None:
+            self.__feature_model = FeatureModel(self.model_info)
+        return self.__feature_model
+
+    @property
+    def b_threads(self) -> dict[str, BThreadFeature]:
+        if self.__b_threads is None:
+            self.__b_threads = b_threads_from_features(self.model_info)
+        return self.__b_threads
 
 
 class ModelInterface(ABC):
@@ -20,7 +68,52 @@ class ModelInterface(ABC):
     Provides access to model information and generates new configurations using the implemented backend.
     """
     def __init__(self) -> None:
-        self.model_info = self._acquire_model_info()
+        self.__known_b_threads: tuple[tuple[Feature, ...], dict[str, BThreadFeature]] | None = None
+        self.__state = self.__new_state(0, self._acquire_model_info())
+
+    @property
+    def version(self) -> int:
+        """
+        Incremented on every update, allows components to invalidate data derived from the model.
+        """
+        return self.__state.version
+
+    @property
+    def model_info(self) -> tuple[Feature, ...]:
+        return self.__state.model_info
+
+    @property
+    def feature_model(self) -> FeatureModel:
+        """
+        Indexed view of the model information, rebuilt after updates.
+        """
+        return self.__state.feature_model
+
+    @property
+    def b_threads(self) -> dict[str, BThreadFeature]:
+        """
+        B-threads described by the model information, rebuilt after updates.
+        """
+        return self.__state.b_threads
+
+    @property
+    def batch_key(self) -> Hashable:
+        """
+        Interfaces with equal keys return the same configuration for every context, so one of them can solve the
+        requests of all, see ConfigurationBatcher. By default, an interface only equals itself.
+        """
+        return id(self)
+
+    def _cache_b_threads(self, model_info: tuple[Feature, ...], b_threads: dict[str, BThreadFeature]) -> None:
+        """
+        Provides already known b-threads of model information, e.g. from a ModelSnapshot.
+        """
+        self.__known_b_threads = model_info, b_threads
+
+    def __new_state(self, version: int, model_info: tuple[Feature, ...]) -> ModelState:
+        known = self.__known_b_threads
+        self.__known_b_threads = None
+        return ModelState(version, model_info, known[1] if known is not None and known[0] is model_info else None)
 
     @abstractmethod
     def acquire_configuration(
@@ -35,6 +128,19 @@ class ModelInterface(ABC):
         """
         pass
 
+    def acquire_configurations(
+            self,
+            contexts: Sequence[CONTEXT_DATA],
+    ) -> tuple[RUNTIME_CONFIG | None, ...]:
+        """
+        Acquires one configuration per context.
+        Backends override this if they can solve several contexts cheaper than one after another.
+
+        :param contexts: Context values, one entry per requested configuration.
+        :return: New configurations in the order of the contexts, see acquire_configuration.
+        """
+        return tuple(self.acquire_configuration(context) for context in contexts)
+
     @abstractmethod
     def _acquire_model_info(self) -> tuple[Feature, ...]:
         pass
@@ -43,12 +149,32 @@ class ModelInterface(ABC):
     def _update(self) -> None:
         pass
 
+    def prepare_update(self) -> ModelState:
+        """
+        Triggers self-update and builds the state of the new model information, without publishing it.
+        Runs the slow part of an update, e.g. on a background thread, while the current state is still being served.
+        The backend already solves on the new model once this returns.
+
+        :return: The state to pass to publish_update.
+        """
+        self._update()
+        state = self.__new_state(self.version + 1, self._acquire_model_info())
+        # built here, so whoever publishes the state does not wait for them
+        state.feature_model
+        state.b_threads
+        return state
+
+    def publish_update(self, state: ModelState) -> None:
+        """
+        Replaces the served state by one built by prepare_update in a single step.
+        """
+        self.__state = state
+
     def update(self) -> None:
         """
         Triggers self-update and loads new model information into cache.
         """
-        self._update()
-        self.model_info = self._acquire_model_info()
+        self.publish_update(self.prepare_update())
 
 
 class FileBasedModelInterface(ModelInterface, ABC):
@@ -68,30 +194,207 @@ class FlexibleClient(Client):
 
 
 class LSPConnection:
-    def __init__(self, path_to_server: Path) -> None:
+    """
+    Spawns a language server and exchanges Content-Length framed JSON-RPC messages with it via stdin/stdout.
+    """
+    def __init__(
+            self,
+            path_to_server: Path,
+            *args: str,
+            chunk_size: int = 65536,
+            cwd: Path | None = None,
+    ) -> None:
         self.__server = Popen(
-            path_to_server,
+            [path_to_server, *args],
             stdin=PIPE,
             stdout=PIPE,
             stderr=PIPE,
+            cwd=cwd,
         )
+        self.__chunk_size = chunk_size
+        # Holds bytes that have already been read from the server but belong to subsequent messages.
+        self.__buffer = bytearray()
+        # bytes received and sent
         self.total = 0
+        self.sent = 0
+        # seconds spent waiting for the headers of messages, i.e. for the server to answer
+        self.waited = 0.0
 
     def send(self, content: bytes) -> None:
         assert self.__server.stdin is not None
         self.__server.stdin.write(content)
         self.__server.stdin.flush()
+        self.sent += len(content)
 
     def recv(self) -> bytes:
-        assert self.__server.stdout is not None
-        headers = b""
-        while not headers.endswith(b"\r\n\r\n"):
-            headers += self.__server.stdout.read(1)
-        size = int(headers.split(b": ")[1].split(b"\r\n\r\n")[0])
-        for b in range(size):
-            headers += self.__server.stdout.read(1)
-        # print(headers)
-        return headers
+        """
+        Reads exactly one message from the server.
+        The header is parsed from buffered chunks, the body is read in bulk into a buffer sized by its Content-Length.
+        Surplus bytes belonging to following messages are kept for the next call.
+
+        :return: The complete message, including its header.
+        """
+        # the pipe is buffered since Popen is used with the default bufsize
+        stdout = self.__server.stdout
+        assert isinstance(stdout, BufferedReader)
+        buffer = self.__buffer
+        header_end = buffer.find(b"\r\n\r\n")
+        if header_end < 0:
+            waiting = time.perf_counter()
+            while header_end < 0:
+                chunk = stdout.read1(self.__chunk_size)
+                if not chunk:
+                    raise ConnectionError("Language server closed the connection")
+                search_start = max(len(buffer) - 3, 0)
+                buffer += chunk
+                header_end = buffer.find(b"\r\n\r\n", search_start)
+            self.waited += time.perf_counter() - waiting
+        body_start = header_end + 4
+        message = bytearray(body_start + _content_length(buffer[:header_end]))
+        view = memoryview(message)
+        available = min(len(buffer), len(message))
+        view[:available] = buffer[:available]
+        del buffer[:available]
+        while available < len(message):
+            read = stdout.readinto(view[available:])
+            if not read:
+                raise ConnectionError("Language server closed the connection")
+            available += read
+        view.release()
+        self.total += len(message)
+        return bytes(message)
+
+
+def _content_length(header: bytes | bytearray) -> int:
+    for line in header.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            return int(value)
+    raise ValueError(f"Message header without Content-Length: {bytes(header)!r}")
+
+
+def _scratch_root() -> str | None:
+    # Prefer tmpfs so that configuration files never touch a disk.
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK | os.X_OK):
+        return str(shm)
+    return None
+
+
+def _remove_scratch_directory(path: Path, inotify: Inotify | None) -> None:
+    if inotify is not None:
+        inotify.close()
+    shutil.rmtree(path, ignore_errors=True)
+
+
+class ScratchDirectory:
+    """
+    Private directory the language server writes its output files to.
+    Completed files are detected via inotify (closed after writing or renamed into the directory).
+    Platforms without inotify fall back to polling with exponential back-off.
+    """
+    def __init__(self) -> None:
+        self.path = Path(tempfile.mkdtemp(prefix="fmbp-", dir=_scratch_root()))
+        self.__inotify: Inotify | None = None
+        if inotify_available():
+            self.__inotify = Inotify()
+            self.__inotify.add_watch(self.path, IN_CLOSE_WRITE | IN_MOVED_TO)
+        weakref.finalize(self, _remove_scratch_directory, self.path, self.__inotify)
+
+    def discard(self, name: str) -> None:
+        """
+        Removes a file and drops pending notifications, e.g. left over by an earlier request that timed out.
+        """
+        (self.path / name).unlink(missing_ok=True)
+        if self.__inotify is not None:
+            while self.__inotify.read_events(0):
+                pass
+
+    def wait_for_json(self, name: str, timeout: float) -> Any | None:
+        """
+        Waits until the file has been written completely, then parses and removes it.
+
+        :param name: Name of the file inside the directory.
+        :param timeout: Maximum time to wait in seconds.
+        :return: The parsed content. None if no complete file appeared in time.
+        """
+        file_path = self.path / name
+        deadline = time.monotonic() + timeout
+        try:
+            if self.__inotify is not None:
+                return self.__wait_inotify(file_path, deadline)
+            return self.__wait_polling(file_path, deadline)
+        finally:
+            file_path.unlink(missing_ok=True)
+
+    def __wait_inotify(self, file_path: Path, deadline: float) -> Any | None:
+        assert self.__inotify is not None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            for event in self.__inotify.read_events(remaining):
+                if event.name == file_path.name:
+                    try:
+                        return json.loads(file_path.read_bytes())
+                    except (FileNotFoundError, JSONDecodeError):
+                        # written in several passes, a later close event delivers the rest
+                        continue
+
+    @staticmethod
+    def __wait_polling(file_path: Path, deadline: float) -> Any | None:
+        delay = 0.0001
+        while time.monotonic() < deadline:
+            try:
+                return json.loads(file_path.read_bytes())
+            except (FileNotFoundError, JSONDecodeError):
+                time.sleep(delay)
+                delay = min(delay * 2, 0.01)
+        return None
+
+    async def wait_for_json_async(self, name: str, timeout: float) -> Any | None:
+        """
+        Same as wait_for_json, but waits within the running event loop instead of blocking the thread.
+        """
+        file_path = self.path / name
+        deadline = time.monotonic() + timeout
+        try:
+            if self.__inotify is not None:
+                return await self.__wait_inotify_async(file_path, deadline)
+            delay = 0.0001
+            while time.monotonic() < deadline:
+                try:
+                    return json.loads(file_path.read_bytes())
+                except (FileNotFoundError, JSONDecodeError):
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 0.01)
+            return None
+        finally:
+            file_path.unlink(missing_ok=True)
+
+    async def __wait_inotify_async(self, file_path: Path, deadline: float) -> Any | None:
+        assert self.__inotify is not None
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        loop.add_reader(self.__inotify.fileno(), readable.set)
+        try:
+            while True:
+                readable.clear()
+                for event in self.__inotify.read_events(0):
+                    if event.name == file_path.name:
+                        try:
+                            return json.loads(file_path.read_bytes())
+                        except (FileNotFoundError, JSONDecodeError):
+                            continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(readable.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+        finally:
+            loop.remove_reader(self.__inotify.fileno())
 
 
 class DefectUVLModel(Exception):
@@ -109,32 +412,140 @@ def _maybe_raise_defect(diagnostics: list[Diagnostic]) -> None:
 
 
 
-class UVLLSPInterface(FileBasedModelInterface):
+# LSP line terminators, other characters splitlines breaks at are part of a line for the server
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$")
+_INCREMENTAL_SYNC = 2
+
+
+def _lines(text: str) -> list[str]:
+    return _LINE.findall(text)
+
+
+def _line_start(lines: list[str], line: int) -> Position:
+    if line == len(lines) and lines and not lines[-1].endswith(("\n", "\r")):
+        # end of a document without a trailing line break, characters are counted in UTF-16 code units
+        return Position(line=line - 1, character=len(lines[-1].encode("utf-16-le")) // 2)
+    return Position(line=line, character=0)
+
+
+def _incremental_changes(old_text: str, new_text: str) -> list[TextDocumentContentChangeEvent]:
     """
-    Implementation of the ModelInterface using the UVL language server as backend.
+    Line based changes turning old_text into new_text.
+    They are ordered bottom-up, so every range still refers to the text as the server knows it
+    after applying the previous changes.
     """
-    def __init__(self, model: Path, lsp: Path) -> None:
-        self.__model = model
-        self.__server = lsp
-        self.__connection = LSPConnection(lsp)
+    old_lines = _lines(old_text)
+    new_lines = _lines(new_text)
+    # most updates touch a few lines, trimming the common ends keeps the diff itself small
+    prefix = 0
+    while prefix < min(len(old_lines), len(new_lines)) and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+            suffix < min(len(old_lines), len(new_lines)) - prefix
+            and old_lines[-1 - suffix] == new_lines[-1 - suffix]
+    ):
+        suffix += 1
+    matcher = SequenceMatcher(
+        None,
+        old_lines[prefix:len(old_lines) - suffix],
+        new_lines[prefix:len(new_lines) - suffix],
+        autojunk=False,
+    )
+    changes = []
+    for tag, old_start, old_end, new_start, new_end in reversed(matcher.get_opcodes()):
+        if tag == "equal":
+            continue
+        changes.append(TextDocumentContentChangeEvent(
+            text="".join(new_lines[prefix + new_start:prefix + new_end]),
+            range=Range(
+                start=_line_start(old_lines, prefix + old_start),
+                end=_line_start(old_lines, prefix + old_end),
+            ),
+            rangeLength=None,
+        ))
+    return changes
+
+
+def _refresh_features(
+        known_features: dict[str, tuple[FEATURE_DICT, Feature]],
+        exported: list[FEATURE_DICT],
+) -> tuple[dict[str, tuple[FEATURE_DICT, Feature]], tuple[Feature, ...]]:
+    """
+    Builds Features from exported data, reusing the ones whose data did not change since the last export.
+
+    :param known_features: Data and Feature per feature name of the last export.
+    :return: Data and Feature per feature name for the next refresh and the Features in export order.
+    """
+    features = {}
+    model_info = []
+    for data in exported:
+        name = str(data["name"])
+        known = known_features.get(name)
+        if known is None or known[0] != data:
+            known = data, Feature.from_dict(data)
+        features[name] = known
+        model_info.append(known[1])
+    return features, tuple(model_info)
+
+
+class UVLLanguageServer:
+    """
+    A running UVL language server process and the client state belonging to it.
+    Several documents may be open at the same time, message exchanges are serialized by the lock.
+    With a tracer, a span is recorded for every exchange.
+    """
+    def __init__(self, lsp: Path, tracer: LSPTracer | None = None) -> None:
+        self.lock = RLock()
+        self.__tracer = tracer
+        # span of the exchange in progress, only set while tracing
+        self.__span: ActiveSpan | None = None
+        # Number of operations currently waiting for or using this server, maintained by the LSPServerPool.
+        self.load = 0
+        # The server writes generated configurations relative to its working directory.
+        self.__scratch = ScratchDirectory()
+        self.__connection = LSPConnection(lsp, cwd=self.__scratch.path)
         self.__client = FlexibleClient()
+        # version and text of the open documents as last sent to the server
+        self.__documents: dict[str, tuple[int, str]] = {}
+        self.__incremental_sync = False
         self.__initialize_connection()
-        self.__file_version = 1
-        self.open_uvl()
-        super().__init__(model)
+
+    @contextmanager
+    def __exchange(self, method: str, command: str | None = None) -> Iterator[None]:
+        """
+        Traces the messages sent and received in the context as one exchange, named after the method or command.
+        """
+        if self.__tracer is None:
+            yield
+            return
+        args = {"method": method} if command is None else {"method": method, "command": command}
+        with self.__tracer.span(command or method, **args) as span:
+            outer, self.__span = self.__span, span
+            try:
+                yield
+            finally:
+                self.__span = outer
 
     def __initialize_connection(self) -> None:
         if not self.__client.is_initialized:
-            self.__send_and_receive()
-            assert self.__client.is_initialized
-            # extra send for initialized response
-            self.__send_and_receive()
-            # receive for extra watchers (don't ask me why they do it...)
-            self.__receive()
+            with self.__exchange("initialize"):
+                for event in self.__send_and_receive():
+                    if isinstance(event, Initialized):
+                        sync = event.capabilities.get("textDocumentSync")
+                        sync_kind = sync.get("change") if isinstance(sync, dict) else sync
+                        self.__incremental_sync = sync_kind == _INCREMENTAL_SYNC
+                assert self.__client.is_initialized
+                # extra send for initialized response
+                self.__send_and_receive()
+                # receive for extra watchers (don't ask me why they do it...)
+                self.__receive()
 
     def __receive(self) -> tuple[Event, ...]:
         events = []
+        waited = self.__connection.waited
         data = self.__connection.recv()
+        parsing = time.perf_counter()
         try:
             for event in self.__client.recv(data):
                 if isinstance(event, PublishDiagnostics):
@@ -143,108 +554,407 @@ class UVLLSPInterface(FileBasedModelInterface):
                 events.append(event)
         except NotImplementedError:
             pass
+        if self.__span is not None:
+            self.__span.add(BYTES_RECEIVED, len(data))
+            self.__span.add_time(SERVER, self.__connection.waited - waited)
+            self.__span.add_time(PARSE, time.perf_counter() - parsing)
         return tuple(events)
 
     def __send(self) -> None:
         to_send = self.__client.send()
         # print(to_send)
+        sending = time.perf_counter()
         self.__connection.send(to_send)
+        if self.__span is not None:
+            self.__span.add(BYTES_SENT, len(to_send))
+            self.__span.add_time(SEND, time.perf_counter() - sending)
 
     def __send_and_receive(self) -> tuple[Event, ...]:
         self.__send()
         return self.__receive()
 
-    def open_uvl(self) -> tuple[Event, ...]:
-        with self.__model.open() as uvl_file:
+    @property
+    def open_documents(self) -> int:
+        return len(self.__documents)
+
+    def document_version(self, uri: str) -> int | None:
+        """
+        :return: Version of the document as known by this server, None if it is not open here.
+        """
+        document = self.__documents.get(uri)
+        return None if document is None else document[0]
+
+    def open_document(self, uri: str, version: int, text: str) -> tuple[Event, ...]:
+        with self.lock:
             self.__client.did_open(
                 TextDocumentItem(
-                    uri=self.__model.as_uri(),
+                    uri=uri,
                     languageId="uvl",
-                    version=self.__file_version,
-                    text=uvl_file.read(),
+                    version=version,
+                    text=text,
                 )
-        )
-        return self.__send_and_receive()
+            )
+            self.__documents[uri] = version, text
+            with self.__exchange("textDocument/didOpen"):
+                return self.__send_and_receive()
+
+    def change_document(self, uri: str, version: int, text: str) -> tuple[Event, ...]:
+        """
+        Sends only the changed lines if the server supports incremental synchronization, the whole text otherwise.
+        """
+        with self.lock:
+            document = VersionedTextDocumentIdentifier(uri=uri, version=version)
+            known = self.__documents.get(uri)
+            if self.__incremental_sync and known is not None:
+                # an unchanged text is sent as a whole, the server answers an empty change list differently
+                changes = _incremental_changes(known[1], text) or [
+                    TextDocumentContentChangeEvent(text=text, range=None, rangeLength=None)
+                ]
+            else:
+                changes = [TextDocumentContentChangeEvent(text=text, range=None, rangeLength=None)]
+            self.__client.did_change(document, changes)
+            self.__documents[uri] = version, text
+            with self.__exchange("textDocument/didChange"):
+                first = self.__send_and_receive()
+                second = self.__receive()
+            return first + second
+
+    def close_document(self, uri: str) -> tuple[Event, ...]:
+        with self.lock:
+            self.__client.did_close(TextDocumentIdentifier(uri=uri))
+            del self.__documents[uri]
+            with self.__exchange("textDocument/didClose"):
+                return self.__send_and_receive()
+
+    def sync_document(self, uri: str, version: int, text: str) -> tuple[Event, ...]:
+        """
+        Makes sure the server knows the given version of the document (or a newer one),
+        (re)opening or changing it if necessary.
+        """
+        with self.lock:
+            known_version = self.document_version(uri)
+            if known_version is None:
+                return self.open_document(uri, version, text)
+            if known_version < version:
+                return self.change_document(uri, version, text)
+            return ()
+
+    def generate_configuration(
+            self,
+            uri: str,
+            config_name: str,
+            context_vars: CONTEXT_DATA | None,
+            timeout: float,
+    ) -> RUNTIME_CONFIG | None:
+        """
+        :param config_name: Name of the file the server writes the configuration to.
+        """
+        with self.lock:
+            self.__scratch.discard(config_name)
+            command = "uvls/generate_configurations"
+            arguments = [uri, 1]
+            if context_vars is not None:
+                arguments.append(context_vars)
+            with self.__exchange("workspace/executeCommand", command):
+                self.__client.send_request(
+                    "workspace/executeCommand",
+                    {"command": command, "arguments": arguments},
+                )
+                events = self.__send_and_receive()
+                if len(events) > 0:
+                    event = events[0]
+                    if isinstance(event, ShowMessage):
+                        raise ValueError("No SAT solution for this file")
+                # The UVL language server exports generated configurations into a json file inside its working directory.
+                waiting = time.perf_counter()
+                json_data = self.__scratch.wait_for_json(config_name, timeout)
+                if self.__span is not None:
+                    self.__span.add_time(CONFIG_FILE, time.perf_counter() - waiting)
+            if json_data is None:
+                logging.error(f"No configuration for {uri} within {timeout} s")
+                return None
+            return {
+                key: value
+                for key, value in json_data["config"].items()
+                if isinstance(value, bool) and "." not in key
+            }
+
+    def export_model(self, uri: str) -> tuple[Feature, ...]:
+        return tuple(Feature.from_dict(data) for data in self.export_model_data(uri))
+
+    def export_model_data(self, uri: str) -> list[FEATURE_DICT]:
+        """
+        :return: The exported features as sent by the server.
+        """
+        with self.lock, self.__exchange("workspace/executeCommand", "uvls/export_model"):
+            self.__client.send_request(
+                "workspace/executeCommand",
+                {"command": "uvls/export_model", "arguments": [uri]},
+            )
+            # For some reason, the LSP sends OK before the data sometimes
+            events = self.__send_and_receive()
+            if len(events) == 0:
+                events = self.__receive()
+            else:
+                self.__receive()
+            event = events[0]
+            if not isinstance(event, ShowMessage):
+                raise TypeError()
+            parsing = time.perf_counter()
+            data: list[FEATURE_DICT] = json.loads(event.message)
+            if self.__span is not None:
+                self.__span.add_time(PARSE, time.perf_counter() - parsing)
+            return data
+
+
+class LSPServerPool:
+    """
+    Fixed number of UVL language servers shared by many UVLLSPInterfaces, e.g. all programs of a fleet.
+    Each operation is dispatched to the least loaded server that already has the document open.
+    Only if there is none or all of them are busy, it is moved to an idle server, which opens the document.
+    Copies of a document that fell behind its latest version are closed by close_stale.
+    The pool is thread-safe, but must not be shared across processes.
+    """
+    def __init__(self, lsp: Path, size: int, tracer: LSPTracer | None = None) -> None:
+        """
+        :param tracer: Records the exchanges with the servers.
+        """
+        if size < 1:
+            raise ValueError("A pool needs at least one server")
+        self.__lock = Lock()
+        self.__lsp = lsp
+        self.__servers = tuple(UVLLanguageServer(lsp, tracer) for _ in range(size))
+
+    @property
+    def lsp(self) -> Path:
+        return self.__lsp
+
+    @property
+    def servers(self) -> tuple[UVLLanguageServer, ...]:
+        return self.__servers
+
+    def __choose(self, uri: str, version: int | None) -> UVLLanguageServer:
+        def outdated(holder: UVLLanguageServer) -> bool:
+            known_version = holder.document_version(uri)
+            return version is not None and known_version is not None and known_version < version
+
+        holders = [server for server in self.__servers if server.document_version(uri) is not None]
+        # servers already knowing the requested version need no sync
+        holder = min(holders, key=lambda candidate: (candidate.load, outdated(candidate)), default=None)
+        if holder is not None and holder.load == 0:
+            return holder
+        idle = [server for server in self.__servers if server.load == 0]
+        if idle:
+            # opening the document costs the full text, so it is only moved to a server with nothing else to do
+            return min(idle, key=lambda candidate: candidate.open_documents)
+        if holder is not None:
+            return holder
+        return min(self.__servers, key=lambda candidate: candidate.load)
+
+    @contextmanager
+    def lease(self, uri: str, version: int | None = None) -> Iterator[UVLLanguageServer]:
+        """
+        Reserves a server for an operation on the given document for the duration of the context.
+        The caller is responsible for syncing the document (see UVLLanguageServer.sync_document).
+
+        :param version: Version of the document the operation needs, servers already knowing it are preferred.
+        """
+        with self.__lock:
+            server = self.__choose(uri, version)
+            server.load += 1
+        try:
+            with server.lock:
+                yield server
+        finally:
+            with self.__lock:
+                server.load -= 1
+
+    def close_stale(self, uri: str, version: int) -> tuple[Event, ...]:
+        """
+        Closes the document on the servers that only know versions older than the given one,
+        so documents do not pile up on servers that are no longer chosen for them.
+        """
+        events: tuple[Event, ...] = ()
+        for server in self.__servers:
+            with server.lock:
+                known_version = server.document_version(uri)
+                if known_version is not None and known_version < version:
+                    events += server.close_document(uri)
+        return events
+
+
+def _connect_in_background(
+        lsp: Path,
+        uri: str,
+        version: int,
+        text: str,
+        tracer: LSPTracer | None,
+) -> Future[LSPServerPool]:
+    """
+    Starts a server and opens the document on it in a background thread.
+
+    :return: Future of a pool of the server, holds the error if starting or opening failed.
+    """
+    connecting: Future[LSPServerPool] = Future()
+
+    def connect() -> None:
+        try:
+            servers = LSPServerPool(lsp, 1, tracer)
+            with servers.lease(uri) as server:
+                server.sync_document(uri, version, text)
+            connecting.set_result(servers)
+        except BaseException as error:
+            connecting.set_exception(error)
+
+    Thread(target=connect, name=f"connect {uri}", daemon=True).start()
+    return connecting
+
+
+class UVLLSPInterface(FileBasedModelInterface):
+    """
+    Implementation of the ModelInterface using the UVL language server as backend.
+    Either starts its own server or leases servers from a shared LSPServerPool.
+    With a ModelSnapshotCache, the model information of unchanged models is loaded from disk.
+    An own server is then started in the background, operations needing it wait until it is running.
+    With an LSPTracer, the operations of the interface and the exchanges with an own server are traced.
+    """
+    def __init__(
+            self,
+            model: Path,
+            lsp: Path | LSPServerPool,
+            configuration_timeout: float = 30.0,
+            snapshot_cache: ModelSnapshotCache | None = None,
+            tracer: LSPTracer | None = None,
+    ) -> None:
+        """
+        :param lsp: Path to the server executable or a pool of running servers.
+        :param configuration_timeout: Maximum time to wait for a generated configuration in seconds.
+        :param snapshot_cache: Cache for the model information, keyed by model content and server executable.
+        :param tracer: Records the operations, the exchanges of a pool are recorded by the tracer of the pool.
+        """
+        # Serializes operations, e.g. between a background solver and a model update.
+        self.__lock = RLock()
+        self.__model = model
+        self.__lsp = lsp.lsp if isinstance(lsp, LSPServerPool) else lsp
+        self.__configuration_timeout = configuration_timeout
+        self.__snapshot_cache = snapshot_cache
+        self.__tracer = tracer
+        self.__file_version = 1
+        self.__text = model.read_text()
+        # exported data and Feature of every feature, features with unchanged data are reused on updates
+        self.__features: dict[str, tuple[FEATURE_DICT, Feature]] = {}
+        self.__connecting: Future[LSPServerPool]
+        if isinstance(lsp, LSPServerPool):
+            self.__connecting = Future()
+            self.__connecting.set_result(lsp)
+            self.open_uvl()
+        elif snapshot_cache is not None and snapshot_cache.key(self.__text, lsp) in snapshot_cache:
+            self.__connecting = _connect_in_background(lsp, model.as_uri(), self.__file_version, self.__text, tracer)
+        else:
+            self.__connecting = Future()
+            self.__connecting.set_result(LSPServerPool(lsp, 1, tracer))
+            self.open_uvl()
+        super().__init__(model)
+
+    @property
+    def batch_key(self) -> Hashable:
+        # the configurations only depend on the served text and the server executable, not on the file
+        with self.__lock:
+            return type(self), self.__lsp, self.__text
+
+    @property
+    def __servers(self) -> LSPServerPool:
+        return self.__connecting.result()
+
+    def wait_for_servers(self) -> None:
+        """
+        Blocks until the servers are running, raises the error if starting the server in the background failed.
+        """
+        self.__connecting.result()
+
+    def open_uvl(self) -> tuple[Event, ...]:
+        with self.__lock:
+            self.__text = self.__model.read_text()
+            with self.__servers.lease(self.__model.as_uri(), self.__file_version) as server:
+                return server.sync_document(self.__model.as_uri(), self.__file_version, self.__text)
 
     def change_uvl(
             self,
             uvl_content: str,
     ) -> tuple[Event, ...]:
-        self.__file_version += 1
-        document = VersionedTextDocumentIdentifier(uri=self.__model.as_uri(), version=self.__file_version)
-        changes = [TextDocumentContentChangeEvent(text=uvl_content, range=None, rangeLength=None)]
-        self.__client.did_change(document, changes)
-        first = self.__send_and_receive()
-        second = self.__receive()
-        return first + second
+        with self.__lock, trace_span(self.__tracer, "change_uvl", "interface") as span:
+            self.__file_version += 1
+            self.__text = uvl_content
+            queued = time.perf_counter()
+            with self.__servers.lease(self.__model.as_uri(), self.__file_version) as server:
+                span.add_time(QUEUE, time.perf_counter() - queued)
+                events = server.sync_document(self.__model.as_uri(), self.__file_version, self.__text)
+            return events + self.__servers.close_stale(self.__model.as_uri(), self.__file_version)
 
     def close_uvl(self) -> tuple[Event, ...]:
-        self.__client.did_close(TextDocumentIdentifier(uri=self.__model.as_uri()))
-        return self.__send_and_receive()
+        with self.__lock:
+            uri = self.__model.as_uri()
+            events: tuple[Event, ...] = ()
+            for server in self.__servers.servers:
+                with server.lock:
+                    if server.document_version(uri) is not None:
+                        events += server.close_document(uri)
+            return events
 
     def acquire_configuration(
             self,
             context_vars: CONTEXT_DATA | None = None,
     ) -> RUNTIME_CONFIG | None:
-        config_path = Path(f"./{self.__model.name}-1.json")
-        try:
-            command = "uvls/generate_configurations"
-            arguments = [self.__model.as_uri(), 1]
-            if context_vars is not None:
-                arguments.append(context_vars)
-            self.__client.send_request(
-                "workspace/executeCommand",
-                {"command": command, "arguments": arguments},
-            )
-            events = self.__send_and_receive()
-            if len(events) > 0:
-                event = events[0]
-                if isinstance(event, ShowMessage):
-                    raise ValueError("No SAT solution for this file")
-            # The UVL language server exports generated configurations into a json file.
-            # We wait for the file to be created and read it then.
-            while not config_path.exists():
-                pass
-            with config_path.open() as config_file:
-                # It seems as if UVL first creates the file and then writes to it, which is not an atomic process.
-                # This sometimes causes a race condition when we try to read the file before it is finished.
-                # As a consequence, incomplete data gets parsed and json complains.
-                # If this happens 10 times in a row, we log and return None.
-                retries = 0
-                while True:
-                    try:
-                        json_data = json.loads(config_file.read())
-                    except JSONDecodeError as e:
-                        if retries > 10:
-                            logging.error(e)
-                            return None
-                        retries += 1
-                    else:
-                        break
-        finally:
-            if config_path.exists():
-                config_path.unlink()
-        return {
-            key: value
-            for key, value in json_data["config"].items()
-            if isinstance(value, bool) and "." not in key
-        }
+        # The document state is only locked while reading it, so several solves can run on different servers.
+        with self.__lock:
+            version, text = self.__file_version, self.__text
+        with trace_span(self.__tracer, "acquire_configuration", "interface") as span:
+            queued = time.perf_counter()
+            with self.__servers.lease(self.__model.as_uri(), version) as server:
+                span.add_time(QUEUE, time.perf_counter() - queued)
+                server.sync_document(self.__model.as_uri(), version, text)
+                return server.generate_configuration(
+                    self.__model.as_uri(),
+                    f"{self.__model.name}-1.json",
+                    context_vars,
+                    self.__configuration_timeout,
+                )
+
+    def acquire_configurations(
+            self,
+            contexts: Sequence[CONTEXT_DATA],
+    ) -> tuple[RUNTIME_CONFIG | None, ...]:
+        """
+        Sends the contexts as a burst spread over all servers of the pool.
+        A single server writes every configuration to the same file, so it can only solve one context at a time.
+        """
+        workers = min(len(self.__servers.servers), len(contexts))
+        if workers <= 1:
+            return super().acquire_configurations(contexts)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return tuple(executor.map(self.acquire_configuration, contexts))
 
     def _acquire_model_info(self) -> tuple[Feature, ...]:
-        self.__client.send_request(
-            "workspace/executeCommand",
-            {"command": "uvls/export_model", "arguments": [self.__model.as_uri()]},
-        )
-        # For some reason, the LSP sends OK before the data sometimes
-        events = self.__send_and_receive()
-        if len(events) == 0:
-            events = self.__receive()
-        else:
-            self.__receive()
-        event = events[0]
-        if not isinstance(event, ShowMessage):
-            raise TypeError()
-        return tuple(Feature.from_dict(data) for data in json.loads(event.message))
+        with self.__lock, trace_span(self.__tracer, "acquire_model_info", "interface") as span:
+            key = None
+            if self.__snapshot_cache is not None:
+                key = self.__snapshot_cache.key(self.__text, self.__lsp)
+                snapshot = self.__snapshot_cache.load(key)
+                if snapshot is not None:
+                    span.add("snapshot", 1)
+                    self._cache_b_threads(snapshot.model_info, snapshot.b_threads)
+                    return snapshot.model_info
+            queued = time.perf_counter()
+            with self.__servers.lease(self.__model.as_uri(), self.__file_version) as server:
+                span.add_time(QUEUE, time.perf_counter() - queued)
+                server.sync_document(self.__model.as_uri(), self.__file_version, self.__text)
+                exported = server.export_model_data(self.__model.as_uri())
+            self.__features, model_info = _refresh_features(self.__features, exported)
+            if self.__snapshot_cache is not None and key is not None:
+                b_threads = b_threads_from_features(model_info)
+                self._cache_b_threads(model_info, b_threads)
+                self.__snapshot_cache.store(key, ModelSnapshot(model_info, b_threads))
+            return model_info
 
     def _update(self) -> None:
         self.change_uvl(self.__model.read_text())
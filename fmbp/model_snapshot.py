@@ -0,0 +1,116 @@
+import gc
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from fmbp.bp_model import BThreadFeature
+from fmbp.fm import Feature
+
+
+# Part of every key, increment it when the pickled classes change.
+_SNAPSHOT_FORMAT = 1
+
+
+def _default_directory() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    return (Path(cache_home) if cache_home else Path.home() / ".cache") / "fmbp"
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """
+    Model information of a model file as exported by a language server and the b-threads derived from it.
+    """
+    model_info: tuple[Feature, ...]
+    b_threads: dict[str, BThreadFeature]
+
+
+class ModelSnapshotCache:
+    """
+    Persistent cache of ModelSnapshots, so unchanged models are available without a language server round trip.
+    Snapshots are keyed by the content of the model and the server executable (path, size and modification time).
+    Unreadable snapshots are treated as missing. Only load caches you trust, the snapshots are pickled.
+    """
+    def __init__(self, directory: Path | None = None) -> None:
+        """
+        :param directory: Directory of the snapshots, defaults to fmbp in the user's cache directory.
+        """
+        self.__directory = directory if directory is not None else _default_directory()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def directory(self) -> Path:
+        return self.__directory
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @staticmethod
+    def key(text: str, lsp: Path) -> str:
+        """
+        :param text: Content of the model.
+        :param lsp: Path to the server executable that exports the model.
+        :return: Key of the snapshot of the model.
+        """
+        executable = lsp.resolve()
+        stat = executable.stat()
+        digest = hashlib.sha256(f"{_SNAPSHOT_FORMAT}\0{executable}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode())
+        digest.update(text.encode())
+        return digest.hexdigest()
+
+    def __path(self, key: str) -> Path:
+        return self.__directory / f"{key}.pickle"
+
+    def __contains__(self, key: str) -> bool:
+        return self.__path(key).is_file()
+
+    def load(self, key: str) -> ModelSnapshot | None:
+        """
+        :return: The snapshot stored under the key, None if there is none.
+        """
+        # Snapshots are acyclic, collecting while loading their many small objects only costs time.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            with self.__path(key).open("rb") as file:
+                snapshot = pickle.load(file)
+        except FileNotFoundError:
+            snapshot = None
+        except Exception as error:
+            logging.warning(f"Ignoring unreadable model snapshot {key}: {error}")
+            snapshot = None
+        finally:
+            if collecting:
+                gc.enable()
+        if not isinstance(snapshot, ModelSnapshot):
+            self.__misses += 1
+            return None
+        self.__hits += 1
+        return snapshot
+
+    def store(self, key: str, snapshot: ModelSnapshot) -> None:
+        """
+        Writes the snapshot atomically, concurrent readers see either the old or the new file.
+        Failing to write is logged, the cache is an optimization only.
+        """
+        temporary = None
+        try:
+            self.__directory.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.__directory, suffix=".tmp", delete=False) as file:
+                temporary = Path(file.name)
+                pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.__path(key))
+        except OSError as error:
+            logging.warning(f"Could not store model snapshot {key}: {error}")
+            if temporary is not None:
+                temporary.unlink(missing_ok=True)
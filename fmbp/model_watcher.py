@@ -1,12 +1,18 @@
+import hashlib
 import os
 from abc import ABC, abstractmethod
+from threading import Event, Lock, Thread
 
-from fmbp.model_interface import ModelInterface, FileBasedModelInterface
+from fmbp.inotify import Inotify, inotify_available, IN_CLOSE_WRITE, IN_MODIFY, IN_MOVED_TO
+from fmbp.model_interface import ModelInterface, FileBasedModelInterface, ModelState
 
 
 class ModelWatcher(ABC):
     @abstractmethod
-    def check(self) -> None:
+    def check(self) -> bool:
+        """
+        :return: If the model has been updated.
+        """
         pass
 
 
@@ -24,9 +30,11 @@ class UpdatingModelWatcher(ModelWatcher, ABC):
         """
         pass
 
-    def check(self) -> None:
+    def check(self) -> bool:
         if self._file_modified():
             self.__interface.update()
+            return True
+        return False
 
 
 class MTimeUpdatingModelWatcher(UpdatingModelWatcher):
@@ -44,3 +52,104 @@ class MTimeUpdatingModelWatcher(UpdatingModelWatcher):
             self.__mod_time = new_mod_time
             return True
         return False
+
+
+class InotifyUpdatingModelWatcher(ModelWatcher):
+    """
+    Watches the model file from a background thread and prepares the update of the ModelInterface there,
+    i.e. sends the change to the backend and builds the new model information and the views derived from it.
+    check publishes a prepared update by replacing the ModelState in one step, so the event loop neither waits for the
+    backend nor sees a partially updated model. Until then, the previous state is served.
+    Bursts of writes are debounced and saves that leave the content unchanged are ignored.
+    Unless an update is ready, check only reads a field, so the event loop makes no system calls.
+    Falls back to polling the file where inotify is not available.
+    """
+    def __init__(
+            self,
+            model_interface: FileBasedModelInterface,
+            debounce_ms: float = 100.0,
+            poll_interval_ms: float = 500.0,
+    ) -> None:
+        """
+        :param debounce_ms: Time without further writes before the file is read.
+        :param poll_interval_ms: Interval to read the file in if inotify is not available.
+        """
+        self.__interface = model_interface
+        self.__model = model_interface.model
+        self.__debounce = debounce_ms / 1000
+        self.__poll_interval = poll_interval_ms / 1000
+        self.__digest = self.__read_digest()
+        self.__lock = Lock()
+        # the latest prepared update or the error preparing it, whichever happened last
+        self.__prepared: ModelState | None = None
+        self.__error: Exception | None = None
+        self.__stopped = Event()
+        self.__inotify: Inotify | None = None
+        if inotify_available():
+            self.__inotify = Inotify()
+            # editors often replace the file, so the directory is watched
+            self.__inotify.add_watch(self.__model.parent, IN_CLOSE_WRITE | IN_MOVED_TO | IN_MODIFY)
+        self.__thread = Thread(target=self.__run, name=f"model-watcher-{self.__model.name}", daemon=True)
+        self.__thread.start()
+
+    def __read_digest(self) -> bytes | None:
+        try:
+            return hashlib.sha256(self.__model.read_bytes()).digest()
+        except FileNotFoundError:
+            # in the middle of a replacement
+            return None
+
+    def __wait_for_change(self) -> bool:
+        if self.__inotify is None:
+            return not self.__stopped.wait(self.__poll_interval)
+        events = self.__inotify.read_events(self.__poll_interval)
+        if not any(event.name == self.__model.name for event in events):
+            return False
+        while not self.__stopped.is_set():
+            events = self.__inotify.read_events(self.__debounce)
+            if not any(event.name == self.__model.name for event in events):
+                return True
+        return False
+
+    def __run(self) -> None:
+        while not self.__stopped.is_set():
+            if not self.__wait_for_change():
+                continue
+            digest = self.__read_digest()
+            if digest is None or digest == self.__digest:
+                continue
+            self.__digest = digest
+            try:
+                state = self.__interface.prepare_update()
+            except Exception as e:
+                with self.__lock:
+                    self.__prepared = None
+                    self.__error = e
+                continue
+            with self.__lock:
+                self.__prepared = state
+                self.__error = None
+
+    def check(self) -> bool:
+        """
+        Publishes the update prepared since the last check, if any.
+
+        :return: If the model has been updated.
+        :raises Exception: The error of a failed update, e.g. a DefectUVLModel.
+        """
+        if self.__prepared is None and self.__error is None:
+            return False
+        with self.__lock:
+            state, error = self.__prepared, self.__error
+            self.__prepared = self.__error = None
+            if state is not None:
+                self.__interface.publish_update(state)
+        if error is not None:
+            raise error
+        return state is not None
+
+    def close(self) -> None:
+        self.__stopped.set()
+        self.__thread.join()
+        if self.__inotify is not None:
+            self.__inotify.close()
@@ -0,0 +1,155 @@
+import pickle
+from pathlib import Path
+from threading import Lock
+from typing import Any, Hashable, Sequence
+
+from fmbp.configuration_provider import canonicalize_context
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.fm import Feature
+from fmbp.model_interface import ModelInterface, FileBasedModelInterface
+
+
+# Records of the log, the model index counts the recorded model information, starting at 0 for the initial one.
+_MODEL = "model"
+_CONFIGURATION = "configuration"
+# a context the backend raised a ValueError for, e.g. because it is unsatisfiable
+_FAILURE = "failure"
+
+
+class NotRecordedError(Exception):
+    """
+    A strict ReplayModelInterface was asked for a configuration or model update that has not been recorded.
+    """
+
+
+def _context_key(context: CONTEXT_DATA | None) -> Hashable:
+    return None if context is None else canonicalize_context(context)
+
+
+class RecordingModelInterface(FileBasedModelInterface):
+    """
+    Wraps a FileBasedModelInterface and records its model information and configurations per context to a log,
+    so a ReplayModelInterface can serve them without a backend.
+    Contexts the backend fails to solve with a ValueError are recorded as failures.
+    Only the first result per context and model version is recorded. Records are flushed as they are written.
+    Watchers of the wrapped model file can watch the recording interface instead.
+    """
+    def __init__(self, model_interface: FileBasedModelInterface, log: Path) -> None:
+        """
+        :param log: File the records are written to, replaced if it exists.
+        """
+        self.__interface = model_interface
+        self.__lock = Lock()
+        self.__file = log.open("wb")
+        self.__models = 0
+        self.__recorded: set[tuple[int, Hashable]] = set()
+        super().__init__(model_interface.model)
+
+    def __write(self, record: tuple[Any, ...]) -> None:
+        pickle.dump(record, self.__file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__file.flush()
+
+    def __record(self, kind: str, context: CONTEXT_DATA | None, result: RUNTIME_CONFIG | str | None) -> None:
+        key = _context_key(context)
+        with self.__lock:
+            if (self.__models - 1, key) not in self.__recorded:
+                self.__recorded.add((self.__models - 1, key))
+                self.__write((kind, self.__models - 1, key, result))
+
+    def acquire_configuration(
+            self,
+            context_vars: CONTEXT_DATA | None = None,
+    ) -> RUNTIME_CONFIG | None:
+        try:
+            config = self.__interface.acquire_configuration(context_vars)
+        except ValueError as e:
+            self.__record(_FAILURE, context_vars, str(e))
+            raise
+        self.__record(_CONFIGURATION, context_vars, config)
+        return config
+
+    def acquire_configurations(
+            self,
+            contexts: Sequence[CONTEXT_DATA],
+    ) -> tuple[RUNTIME_CONFIG | None, ...]:
+        try:
+            configs = self.__interface.acquire_configurations(contexts)
+        except ValueError:
+            # the failing context is unknown, solving one after another records it and raises at the same context
+            return tuple(self.acquire_configuration(context) for context in contexts)
+        for context, config in zip(contexts, configs):
+            self.__record(_CONFIGURATION, context, config)
+        return configs
+
+    def _acquire_model_info(self) -> tuple[Feature, ...]:
+        model_info = self.__interface.model_info
+        with self.__lock:
+            self.__write((_MODEL, self.__models, model_info))
+            self.__models += 1
+        return model_info
+
+    def _update(self) -> None:
+        self.__interface.update()
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__file.close()
+
+
+class ReplayModelInterface(ModelInterface):
+    """
+    Serves model information and configurations recorded by a RecordingModelInterface from memory.
+    Each update moves on to the next recorded model information.
+    Configurations that have not been recorded for the current model are None, a strict replay raises instead.
+    Recorded failures raise a ValueError like the backend did.
+    Only replay logs you trust, the records are pickled.
+    """
+    def __init__(self, log: Path, strict: bool = False) -> None:
+        """
+        :param strict: Raise a NotRecordedError for unrecorded contexts and updates beyond the recording.
+        """
+        self.__strict = strict
+        self.__models: list[tuple[Feature, ...]] = []
+        self.__configurations: dict[tuple[int, Hashable], RUNTIME_CONFIG | None] = {}
+        self.__failures: dict[tuple[int, Hashable], str] = {}
+        with log.open("rb") as file:
+            while True:
+                try:
+                    record = pickle.load(file)
+                except (EOFError, pickle.UnpicklingError):
+                    # end of the log, possibly a truncated record of a recording that was interrupted
+                    break
+                if record[0] == _MODEL:
+                    self.__models.append(record[2])
+                elif record[0] == _CONFIGURATION:
+                    self.__configurations[record[1], record[2]] = record[3]
+                elif record[0] == _FAILURE:
+                    self.__failures[record[1], record[2]] = record[3]
+        if not self.__models:
+            raise ValueError(f"{log} does not contain any model information")
+        self.__model = -1
+        super().__init__()
+
+    def acquire_configuration(
+            self,
+            context_vars: CONTEXT_DATA | None = None,
+    ) -> RUNTIME_CONFIG | None:
+        key = self.__model, _context_key(context_vars)
+        if key in self.__failures:
+            raise ValueError(self.__failures[key])
+        if key not in self.__configurations:
+            if self.__strict:
+                raise NotRecordedError(f"No configuration recorded for {context_vars} in model {self.__model}")
+            return None
+        config = self.__configurations[key]
+        return None if config is None else dict(config)
+
+    def _acquire_model_info(self) -> tuple[Feature, ...]:
+        if self.__model + 1 < len(self.__models):
+            self.__model += 1
+        elif self.__strict:
+            raise NotRecordedError(f"Only {len(self.__models)} versions of the model have been recorded")
+        return self.__models[self.__model]
+
+    def _update(self) -> None:
+        pass
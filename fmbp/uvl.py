@@ -0,0 +1,427 @@
+import re
+from dataclasses import dataclass
+from sys import intern
+from typing import Iterator
+
+from fmbp.fm import Attribute, Feature
+
+
+class UVLSyntaxError(Exception):
+    def __init__(self, message: str, line: int) -> None:
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+@dataclass(frozen=True)
+class Constant:
+    value: float | str | bool
+
+
+@dataclass(frozen=True)
+class Reference:
+    # a feature name, an attribute path like Env.temp or an event name inside a predicate
+    name: str
+
+
+@dataclass(frozen=True)
+class Not:
+    operand: "Expression"
+
+
+@dataclass(frozen=True)
+class BinaryOperation:
+    operator: str
+    left: "Expression"
+    right: "Expression"
+
+
+@dataclass(frozen=True)
+class FunctionCall:
+    function: str
+    arguments: tuple["Expression", ...]
+
+
+Expression = Constant | Reference | Not | BinaryOperation | FunctionCall
+
+
+@dataclass(frozen=True)
+class UVLGroup:
+    kind: str
+    lower: int
+    upper: int | None
+    children: tuple["UVLFeature", ...]
+
+
+@dataclass(frozen=True)
+class UVLFeature:
+    name: str
+    attributes: tuple[Attribute, ...]
+    groups: tuple[UVLGroup, ...]
+
+
+@dataclass(frozen=True)
+class UVLModel:
+    roots: tuple[UVLFeature, ...]
+    constraints: tuple[Expression, ...]
+
+    def features(self) -> Iterator[UVLFeature]:
+        """
+        :return: All features in document order.
+        """
+        stack = list(reversed(self.roots))
+        while stack:
+            feature = stack.pop()
+            yield feature
+            for group in reversed(feature.groups):
+                stack.extend(reversed(group.children))
+
+    def export(self) -> tuple[Feature, ...]:
+        """
+        :return: The features as exported by the UVL language server.
+        """
+        return tuple(Feature(feature.name, feature.attributes) for feature in self.features())
+
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+    | (?P<string>'[^']*')
+    | (?P<quoted>"[^"]*")
+    | (?P<number>\d+(?:\.\d+)?)
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)
+    | (?P<operator><=>|=>|==|!=|<=|>=|\.\.|[<>|&!+\-*/(){}\[\],])
+""", re.VERBOSE)
+
+_GROUP_KINDS: dict[str, tuple[int | None, int | None]] = {
+    "mandatory": (None, None),
+    "optional": (0, None),
+    "alternative": (1, 1),
+    "or": (1, None),
+}
+_FEATURE_TYPES = {"Boolean", "Integer", "Real", "String"}
+_COMPARISONS = {"==", "!=", "<", ">", "<=", ">="}
+
+
+def _tokenize(text: str, line: int) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise UVLSyntaxError(f"unexpected character {text[position]!r}", line)
+        position = match.end()
+        kind = match.lastgroup
+        assert kind is not None
+        if kind == "space":
+            continue
+        if kind == "quoted":
+            kind, value = "name", match.group()[1:-1]
+        else:
+            value = match.group()
+        tokens.append((kind, value))
+    return tokens
+
+
+class _TokenStream:
+    def __init__(self, text: str, line: int) -> None:
+        self.line = line
+        self.__tokens = _tokenize(text, line)
+        self.__position = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        if self.__position < len(self.__tokens):
+            return self.__tokens[self.__position]
+        return None
+
+    def peek_value(self) -> str | None:
+        token = self.peek()
+        return None if token is None else token[1]
+
+    def next(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise UVLSyntaxError("unexpected end of line", self.line)
+        self.__position += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        kind, actual = self.next()
+        if actual != value or kind == "string":
+            raise UVLSyntaxError(f"expected {value!r}, found {actual!r}", self.line)
+
+    def expect_name(self) -> str:
+        kind, value = self.next()
+        if kind != "name":
+            raise UVLSyntaxError(f"expected a name, found {value!r}", self.line)
+        return intern(value)
+
+    def at_end(self) -> bool:
+        return self.peek() is None
+
+    def expect_end(self) -> None:
+        if not self.at_end():
+            raise UVLSyntaxError(f"unexpected {self.peek_value()!r}", self.line)
+
+
+def _strip_comments(text: str) -> str:
+    result = []
+    position = 0
+    quote: str | None = None
+    while position < len(text):
+        char = text[position]
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif text.startswith("//", position):
+            end = text.find("\n", position)
+            position = len(text) if end < 0 else end
+            continue
+        elif text.startswith("/*", position):
+            end = text.find("*/", position + 2)
+            end = len(text) if end < 0 else end + 2
+            # keep the line breaks, so line numbers stay correct
+            result.append("\n" * text.count("\n", position, end))
+            position = end
+            continue
+        result.append(char)
+        position += 1
+    return "".join(result)
+
+
+def _logical_lines(text: str) -> Iterator[tuple[int, int, str]]:
+    """
+    :return: Line number, indentation and content of every non-empty line.
+    Lines with unclosed braces or parentheses are joined with the following ones.
+    """
+    pending: list[str] = []
+    start = 0
+    indent = 0
+    depth = 0
+    for number, line in enumerate(_strip_comments(text).splitlines(), start=1):
+        if not pending:
+            if not line.strip():
+                continue
+            start = number
+            expanded = line.expandtabs(4)
+            indent = len(expanded) - len(expanded.lstrip())
+        pending.append(line.strip())
+        depth += sum(line.count(char) for char in "{([") - sum(line.count(char) for char in "})]")
+        if depth <= 0:
+            yield start, indent, " ".join(pending)
+            pending = []
+            depth = 0
+    if pending:
+        raise UVLSyntaxError("unclosed bracket", start)
+
+
+def _parse_attributes(tokens: _TokenStream) -> tuple[Attribute, ...]:
+    tokens.expect("{")
+    attributes = []
+    while tokens.peek_value() != "}":
+        name = tokens.expect_name()
+        if tokens.peek_value() in {",", "}"}:
+            value: str | float | bool | tuple[Attribute, ...] = True
+        else:
+            value = _parse_attribute_value(tokens)
+        attributes.append(Attribute(name, value))
+        if tokens.peek_value() != "}":
+            tokens.expect(",")
+    tokens.expect("}")
+    return tuple(attributes)
+
+
+def _parse_attribute_value(tokens: _TokenStream) -> str | float | bool | tuple[Attribute, ...]:
+    if tokens.peek_value() == "{":
+        return _parse_attributes(tokens)
+    kind, value = tokens.next()
+    if kind == "string":
+        return intern(value[1:-1])
+    if kind == "number":
+        return float(value)
+    if value == "-":
+        kind, value = tokens.next()
+        if kind == "number":
+            return -float(value)
+    elif value in {"true", "false"}:
+        return value == "true"
+    raise UVLSyntaxError(f"unsupported attribute value {value!r}", tokens.line)
+
+
+def _parse_group_kind(tokens: _TokenStream) -> tuple[str, int | None, int | None] | None:
+    value = tokens.peek_value()
+    if value in _GROUP_KINDS:
+        tokens.next()
+        tokens.expect_end()
+        assert value is not None
+        return (value, *_GROUP_KINDS[value])
+    if value != "[":
+        return None
+    tokens.next()
+    lower = int(tokens.next()[1])
+    upper: int | None = lower
+    if tokens.peek_value() == "..":
+        tokens.next()
+        bound = tokens.next()[1]
+        upper = None if bound == "*" else int(bound)
+    tokens.expect("]")
+    tokens.expect_end()
+    return "cardinality", lower, upper
+
+
+def _parse_feature_line(tokens: _TokenStream) -> tuple[str, tuple[Attribute, ...]]:
+    name = tokens.expect_name()
+    token = tokens.peek()
+    if name in _FEATURE_TYPES and token is not None and token[0] == "name":
+        name = tokens.expect_name()
+    if tokens.peek_value() == "cardinality":
+        raise UVLSyntaxError("feature cardinalities are not supported", tokens.line)
+    attributes: tuple[Attribute, ...] = ()
+    if tokens.peek_value() == "{":
+        attributes = _parse_attributes(tokens)
+    tokens.expect_end()
+    return name, attributes
+
+
+class _FeatureBuilder:
+    def __init__(self, name: str, attributes: tuple[Attribute, ...]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.groups: list[_GroupBuilder] = []
+
+    def build(self) -> UVLFeature:
+        return UVLFeature(self.name, self.attributes, tuple(group.build() for group in self.groups))
+
+
+class _GroupBuilder:
+    def __init__(self, kind: str, lower: int | None, upper: int | None) -> None:
+        self.kind = kind
+        self.lower = lower
+        self.upper = upper
+        self.children: list[_FeatureBuilder] = []
+
+    def build(self) -> UVLGroup:
+        children = tuple(child.build() for child in self.children)
+        if self.kind == "mandatory":
+            return UVLGroup(self.kind, len(children), len(children), children)
+        assert self.lower is not None
+        return UVLGroup(self.kind, self.lower, self.upper, children)
+
+
+def _parse_expression(tokens: _TokenStream) -> Expression:
+    return _parse_binary(tokens, 0)
+
+
+# operators per precedence level, from the weakest binding one
+_PRECEDENCE: tuple[tuple[str, ...], ...] = (("<=>",), ("=>",), ("|",), ("&",))
+_ARITHMETIC: tuple[tuple[str, ...], ...] = (("+", "-"), ("*", "/"))
+
+
+def _parse_binary(tokens: _TokenStream, level: int) -> Expression:
+    if level == len(_PRECEDENCE):
+        return _parse_negation(tokens)
+    left = _parse_binary(tokens, level + 1)
+    while tokens.peek_value() in _PRECEDENCE[level]:
+        operator = tokens.next()[1]
+        left = BinaryOperation(operator, left, _parse_binary(tokens, level + 1))
+    return left
+
+
+def _parse_negation(tokens: _TokenStream) -> Expression:
+    if tokens.peek_value() == "!":
+        tokens.next()
+        return Not(_parse_negation(tokens))
+    left = _parse_arithmetic(tokens, 0)
+    if tokens.peek_value() in _COMPARISONS:
+        operator = tokens.next()[1]
+        left = BinaryOperation(operator, left, _parse_arithmetic(tokens, 0))
+    return left
+
+
+def _parse_arithmetic(tokens: _TokenStream, level: int) -> Expression:
+    if level == len(_ARITHMETIC):
+        return _parse_unary(tokens)
+    left = _parse_arithmetic(tokens, level + 1)
+    while tokens.peek_value() in _ARITHMETIC[level]:
+        operator = tokens.next()[1]
+        left = BinaryOperation(operator, left, _parse_arithmetic(tokens, level + 1))
+    return left
+
+
+def _parse_unary(tokens: _TokenStream) -> Expression:
+    kind, value = tokens.next()
+    if kind == "operator":
+        if value == "-":
+            return BinaryOperation("-", Constant(0.0), _parse_unary(tokens))
+        if value == "(":
+            expression = _parse_expression(tokens)
+            tokens.expect(")")
+            return expression
+        raise UVLSyntaxError(f"unexpected {value!r}", tokens.line)
+    if kind == "number":
+        return Constant(float(value))
+    if kind == "string":
+        return Constant(value[1:-1])
+    if value in {"true", "false"}:
+        return Constant(value == "true")
+    if tokens.peek_value() == "(":
+        tokens.next()
+        arguments = []
+        while tokens.peek_value() != ")":
+            arguments.append(_parse_expression(tokens))
+            if tokens.peek_value() != ")":
+                tokens.expect(",")
+        tokens.expect(")")
+        return FunctionCall(value, tuple(arguments))
+    return Reference(value)
+
+
+def parse_uvl(text: str) -> UVLModel:
+    """
+    Parses the subset of UVL used by FMBP models: a feature tree with group cardinalities and attributes,
+    and constraints over features, attributes and the b-program predicates like requested(EVENT).
+    """
+    roots: list[_FeatureBuilder] = []
+    constraints: list[Expression] = []
+    section: str | None = None
+    # open features and groups of the feature tree, together with their indentation
+    stack: list[tuple[int, _FeatureBuilder | _GroupBuilder]] = []
+    for line, indent, content in _logical_lines(text):
+        tokens = _TokenStream(content, line)
+        first = tokens.peek_value()
+        if first in {"features", "constraints"} and len(content) == len(first or ""):
+            section = first
+            continue
+        if first in {"namespace", "imports", "include"} and section is None:
+            section = "ignored"
+            continue
+        if section == "constraints":
+            constraints.append(_parse_expression(tokens))
+            tokens.expect_end()
+            continue
+        if section != "features":
+            if section == "ignored":
+                continue
+            raise UVLSyntaxError(f"unexpected {first!r} outside of a section", line)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        group_kind = _parse_group_kind(tokens)
+        parent = stack[-1][1] if stack else None
+        if group_kind is not None:
+            if not isinstance(parent, _FeatureBuilder):
+                raise UVLSyntaxError("group without a parent feature", line)
+            group = _GroupBuilder(*group_kind)
+            parent.groups.append(group)
+            stack.append((indent, group))
+            continue
+        feature = _FeatureBuilder(*_parse_feature_line(tokens))
+        if parent is None:
+            roots.append(feature)
+        elif isinstance(parent, _GroupBuilder):
+            parent.children.append(feature)
+        else:
+            raise UVLSyntaxError(f"feature {feature.name} has to be part of a group", line)
+        stack.append((indent, feature))
+    if not roots:
+        raise UVLSyntaxError("the model has no features", 1)
+    return UVLModel(tuple(root.build() for root in roots), tuple(constraints))
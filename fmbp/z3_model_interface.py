@@ -0,0 +1,263 @@
+import logging
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Hashable
+
+import z3
+
+from fmbp.bp_model import BThreadFeature, b_threads_from_features
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.fm import Feature
+from fmbp.model_interface import DefectUVLModel, FileBasedModelInterface
+from fmbp.uvl import BinaryOperation, Constant, Expression, FunctionCall, Not, Reference, UVLModel, \
+    UVLSyntaxError, parse_uvl
+
+
+_LOGICAL: dict[str, Callable[[z3.ExprRef, z3.ExprRef], z3.ExprRef]] = {
+    "<=>": lambda left, right: left == right,
+    "=>": lambda left, right: z3.Implies(left, right),
+    "|": lambda left, right: z3.Or(left, right),
+    "&": lambda left, right: z3.And(left, right),
+}
+_RELATIONAL: dict[str, Callable[[z3.ExprRef, z3.ExprRef], z3.ExprRef]] = {
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    "<": lambda left, right: left < right,
+    ">": lambda left, right: left > right,
+    "<=": lambda left, right: left <= right,
+    ">=": lambda left, right: left >= right,
+    "+": lambda left, right: left + right,
+    "-": lambda left, right: left - right,
+    "*": lambda left, right: left * right,
+    "/": lambda left, right: left / right,
+}
+
+
+class InvalidContextValue(TypeError):
+    """
+    A context value does not have the type of the Env attribute it is assigned to.
+    """
+
+
+def _z3_value(value: str | float | bool) -> z3.ExprRef:
+    if isinstance(value, str):
+        return z3.StringVal(value)
+    if isinstance(value, bool):
+        return z3.BoolVal(value)
+    return z3.RealVal(value)
+
+
+class _Encoding:
+    """
+    Translation of a parsed UVL model into z3 constraints.
+    Attributes of Env features are variables fixed per solve, all other attributes are constants.
+    """
+    def __init__(self, model: UVLModel) -> None:
+        self.features: dict[str, z3.BoolRef] = {feature.name: z3.Bool(feature.name) for feature in model.features()}
+        self.terms: dict[str, z3.ExprRef] = {}
+        # context attribute name -> variables and default values of the Env features holding it
+        self.context: dict[str, list[tuple[z3.ExprRef, str | float | bool]]] = {}
+        self.constraints: list[z3.BoolRef] = []
+        self.b_threads: dict[str, BThreadFeature] = b_threads_from_features(model.export())
+        for feature in model.features():
+            is_env = any(attribute.name == "type" and attribute.value == "Env" for attribute in feature.attributes)
+            for attribute in feature.attributes:
+                if isinstance(attribute.value, tuple):
+                    continue
+                path = f"{feature.name}.{attribute.name}"
+                if is_env and attribute.name != "type":
+                    variable = self.__variable(path, attribute.value)
+                    self.terms[path] = variable
+                    self.context.setdefault(attribute.name, []).append((variable, attribute.value))
+                else:
+                    self.terms[path] = _z3_value(attribute.value)
+        for root in model.roots:
+            self.constraints.append(self.features[root.name])
+        for feature in model.features():
+            parent = self.features[feature.name]
+            for group in feature.groups:
+                children = [self.features[child.name] for child in group.children]
+                self.constraints.extend(z3.Implies(child, parent) for child in children)
+                if group.kind == "mandatory":
+                    self.constraints.extend(z3.Implies(parent, child) for child in children)
+                    continue
+                selected = z3.Sum([z3.If(child, 1, 0) for child in children])
+                self.constraints.append(z3.Implies(parent, selected >= group.lower))
+                if group.upper is not None:
+                    self.constraints.append(z3.Implies(parent, selected <= group.upper))
+        for constraint in model.constraints:
+            term = self.encode(constraint)
+            if not z3.is_bool(term):
+                raise DefectUVLModel(f"Constraint is not boolean: {constraint}")
+            self.constraints.append(term)
+
+    @staticmethod
+    def __variable(path: str, value: str | float | bool) -> z3.ExprRef:
+        if isinstance(value, str):
+            return z3.String(path)
+        if isinstance(value, bool):
+            return z3.Bool(path)
+        return z3.Real(path)
+
+    def encode(self, expression: Expression) -> z3.ExprRef:
+        try:
+            match expression:
+                case Constant(value=value):
+                    return _z3_value(value)
+                case Reference(name=name):
+                    if name in self.features:
+                        return self.features[name]
+                    if name in self.terms:
+                        return self.terms[name]
+                    raise DefectUVLModel(f"Unknown reference {name}")
+                case Not(operand=operand):
+                    return z3.Not(self.encode(operand))
+                case BinaryOperation(operator=operator, left=left, right=right):
+                    encode = _LOGICAL.get(operator) or _RELATIONAL[operator]
+                    return encode(self.encode(left), self.encode(right))
+                case FunctionCall(function=function, arguments=arguments):
+                    return self.__predicate(function, arguments)
+        except (z3.Z3Exception, TypeError) as e:
+            raise DefectUVLModel(f"Invalid expression {expression}: {e}") from e
+        raise DefectUVLModel(f"Unsupported expression {expression}")
+
+    def __predicate(self, function: str, arguments: tuple[Expression, ...]) -> z3.ExprRef:
+        events = []
+        for argument in arguments:
+            if not isinstance(argument, Reference):
+                raise DefectUVLModel(f"{function} expects event names")
+            events.append(argument.name)
+        if function == "conflicting":
+            # At most one of the events may be selectable at a time. This reading is not confirmed against uvls,
+            # tests/test_conformance.py checks it on the water tank model when uvls is available.
+            return z3.Sum([z3.If(self.__selected(event), 1, 0) for event in events]) <= 1
+        if len(events) != 1:
+            raise DefectUVLModel(f"{function} expects exactly one event")
+        if function in {"requested", "blocked", "waited_for"}:
+            return self.__flag(function, events[0])
+        if function == "selected":
+            return self.__selected(events[0])
+        raise DefectUVLModel(f"Unsupported function {function}")
+
+    def __flag(self, flag: str, event: str) -> z3.BoolRef:
+        # an event counts as requested (blocked, ...) if any selected b-thread requests (blocks, ...) it
+        return z3.Or([
+            self.features[b_thread.name]
+            for b_thread in self.b_threads.values()
+            for event_attribute in b_thread.events
+            if event_attribute.name == event and getattr(event_attribute, flag)
+        ])
+
+    def __selected(self, event: str) -> z3.BoolRef:
+        # selectable: requested by a selected b-thread, not blocked and no enabled event has a higher priority
+        requests = [
+            (self.features[b_thread.name], event_attribute)
+            for b_thread in self.b_threads.values()
+            for event_attribute in b_thread.events
+            if event_attribute.requested
+        ]
+        options = []
+        for b_thread, event_attribute in requests:
+            if event_attribute.name != event:
+                continue
+            outranked = [
+                z3.And(other_b_thread, z3.Not(self.__flag("blocked", other.name)))
+                for other_b_thread, other in requests
+                if other.name != event and other.priority > event_attribute.priority
+            ]
+            options.append(z3.And(b_thread, z3.Not(self.__flag("blocked", event)), z3.Not(z3.Or(outranked))))
+        return z3.Or(options)
+
+    def assumptions(self, context_vars: CONTEXT_DATA | None) -> list[z3.BoolRef]:
+        context_vars = context_vars or {}
+        assumptions = []
+        for name, variables in self.context.items():
+            for variable, default in variables:
+                value = context_vars.get(name, default)
+                if z3.is_string(variable) != isinstance(value, str) or \
+                        z3.is_bool(variable) and not isinstance(value, bool):
+                    raise InvalidContextValue(f"Context value {value!r} does not match the type of {variable}")
+                if isinstance(value, bool) and not z3.is_bool(variable):
+                    value = int(value)
+                assumptions.append(variable == _z3_value(value))
+        return assumptions
+
+
+class Z3ModelInterface(FileBasedModelInterface):
+    """
+    Implementation of the ModelInterface solving in-process with z3, without a language server.
+    Supports the subset of UVL used by FMBP models, see parse_uvl.
+    The solver is kept across calls, context values are passed as assumptions.
+    Among all valid configurations, the one selecting the most features in declaration order is returned,
+    so results do not depend on the model z3 happens to find. Whether uvls returns the same configuration is only
+    known once tests/test_conformance.py ran against it.
+    Context values of another type than the Env attribute raise an InvalidContextValue.
+    """
+    def __init__(self, model: Path) -> None:
+        # z3 contexts are not thread-safe
+        self.__lock = RLock()
+        self.__model = model
+        self.__load()
+        super().__init__(model)
+
+    def __load(self) -> None:
+        text = self.__model.read_text()
+        try:
+            parsed = parse_uvl(text)
+        except UVLSyntaxError as e:
+            raise DefectUVLModel(f"UVL model has errors\n\n{e}") from e
+        encoding = _Encoding(parsed)
+        solver = z3.Solver()
+        solver.add(encoding.constraints)
+        with self.__lock:
+            self.__text = text
+            self.__parsed = parsed
+            self.__encoding = encoding
+            self.__solver = solver
+
+    @property
+    def batch_key(self) -> Hashable:
+        with self.__lock:
+            return type(self), self.__text
+
+    def acquire_configuration(
+            self,
+            context_vars: CONTEXT_DATA | None = None,
+    ) -> RUNTIME_CONFIG | None:
+        with self.__lock:
+            assumptions = self.__encoding.assumptions(context_vars)
+            result = self.__solver.check(*assumptions)
+            if result == z3.unsat:
+                raise ValueError("No SAT solution for this file")
+            if result != z3.sat:
+                logging.error(f"z3 could not solve {self.__model.name}: {self.__solver.reason_unknown()}")
+                return None
+            return self.__canonical_configuration(assumptions, self.__solver.model())
+
+    def __canonical_configuration(self, assumptions: list[z3.BoolRef], solution: z3.ModelRef) -> RUNTIME_CONFIG:
+        """
+        Fixes the features one after another in declaration order, selecting each one if that is still possible.
+        The solution always satisfies the features fixed so far, so only deselected features need another check.
+
+        :return: The lexicographically greatest configuration, with selected before deselected.
+        """
+        fixed = list(assumptions)
+        config = {}
+        for name, variable in self.__encoding.features.items():
+            if not z3.is_true(solution.eval(variable, model_completion=True)):
+                if self.__solver.check(*fixed, variable) == z3.sat:
+                    solution = self.__solver.model()
+                else:
+                    config[name] = False
+                    fixed.append(z3.Not(variable))
+                    continue
+            config[name] = True
+            fixed.append(variable)
+        return config
+
+    def _acquire_model_info(self) -> tuple[Feature, ...]:
+        with self.__lock:
+            return self.__parsed.export()
+
+    def _update(self) -> None:
+        self.__load()
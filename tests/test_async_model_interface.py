@@ -0,0 +1,49 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from benchmarks.standin_server import STANDIN_SERVER
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.async_model_interface import AsyncUVLLSPInterface
+
+
+@pytest.fixture
+def model(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    # informational messages arrive while the configuration is being written
+    monkeypatch.setenv("FMBP_STANDIN_PROGRESS", "1")
+    monkeypatch.setenv("FMBP_STANDIN_SOLVE_DELAY", "0.02")
+    model = tmp_path / "model.uvl"
+    model.write_text(synthetic_uvl(3, 1) + "    Env.level < 10\n")
+    return model
+
+
+def test_messages_of_other_requests_do_not_fail_a_solve(model: Path) -> None:
+    async def run() -> None:
+        interface = await AsyncUVLLSPInterface.create(model, STANDIN_SERVER, configuration_timeout=5.0)
+        try:
+            assert await interface.acquire_configuration({"level": 0}) is not None
+            configs, model_info = await asyncio.gather(
+                interface.acquire_configurations([{"level": level} for level in range(3)]),
+                interface._acquire_model_info(),
+            )
+            assert all(config is not None for config in configs)
+            assert model_info == interface.model_info
+        finally:
+            await interface.close()
+
+    asyncio.run(run())
+
+
+def test_a_message_answering_the_solve_means_no_solution(model: Path) -> None:
+    async def run() -> None:
+        interface = await AsyncUVLLSPInterface.create(model, STANDIN_SERVER, configuration_timeout=5.0)
+        try:
+            with pytest.raises(ValueError, match="No SAT solution"):
+                await interface.acquire_configuration({"level": 20})
+            # the failed solve leaves nothing behind for the next one
+            assert await interface.acquire_configuration({"level": 1}) is not None
+        finally:
+            await interface.close()
+
+    asyncio.run(run())
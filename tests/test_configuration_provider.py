@@ -0,0 +1,119 @@
+import threading
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.configuration_provider import BackgroundConfigurationProvider, ConfigurationBatcher, \
+    ContextConfigurationProvider
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.context_gate import EventIntervalGate, ThresholdContextGate, UnchangedContextGate
+from fmbp.context_source import ContextSource
+from fmbp.fm import Feature
+from fmbp.model_interface import ModelInterface
+from fmbp.z3_model_interface import Z3ModelInterface
+
+
+class ListContextSource(ContextSource):
+    def __init__(self, contexts: list[CONTEXT_DATA]) -> None:
+        self.contexts = contexts
+        self.threads: list[threading.Thread] = []
+
+    def get_data(self) -> CONTEXT_DATA:
+        self.threads.append(threading.current_thread())
+        return self.contexts.pop(0)
+
+
+class EchoModelInterface(ModelInterface):
+    """
+    Solves a configuration naming the context's level.
+    """
+    def __init__(self) -> None:
+        self.solved: list[CONTEXT_DATA | None] = []
+        super().__init__()
+
+    def acquire_configuration(self, context_vars: CONTEXT_DATA | None = None) -> RUNTIME_CONFIG | None:
+        self.solved.append(context_vars)
+        assert context_vars is not None
+        return {f"L{context_vars['level']}": True}
+
+    def _acquire_model_info(self) -> tuple[Feature, ...]:
+        return ()
+
+    def _update(self) -> None:
+        pass
+
+
+def test_every_gate_sees_every_call() -> None:
+    unchanged = UnchangedContextGate()
+    interval = EventIntervalGate(2)
+    interface = EchoModelInterface()
+    provider = ContextConfigurationProvider(
+        ListContextSource([{"level": 1}, {"level": 1}, {"level": 2}]), interface, gates=(unchanged, interval),
+    )
+    assert provider.get_configuration() == {"L1": True}
+    # rejected by the first gate, the interval gate still counts the call
+    assert provider.get_configuration() is None
+    assert provider.get_configuration() == {"L2": True}
+    assert unchanged.skipped == 1
+    assert interval.skipped == 1
+
+
+def test_gates_are_bypassed_after_an_update() -> None:
+    interface = EchoModelInterface()
+    provider = ContextConfigurationProvider(
+        ListContextSource([{"level": 1}, {"level": 1}, {"level": 1}]), interface, gates=(UnchangedContextGate(),),
+    )
+    assert provider.get_configuration() == {"L1": True}
+    assert provider.get_configuration() is None
+    interface.update()
+    assert provider.get_configuration() == {"L1": True}
+    assert len(interface.solved) == 2
+
+
+def test_threshold_gate() -> None:
+    gate = ThresholdContextGate({"level": 5})
+    assert gate.allows({"level": 10, "mode": "a"})
+    gate.solved({"level": 10, "mode": "a"})
+    assert not gate.allows({"level": 14, "mode": "a"})
+    assert gate.allows({"level": 15, "mode": "a"})
+    assert gate.allows({"level": 10, "mode": "b"})
+    gate.reset()
+    assert gate.allows({"level": 10, "mode": "a"})
+
+
+def test_background_provider_reads_the_context_on_the_calling_thread() -> None:
+    source = ListContextSource([{"level": level} for level in range(5)])
+    interface = EchoModelInterface()
+    provider = BackgroundConfigurationProvider(source, interface, max_staleness_steps=0)
+    try:
+        configs = [provider.get_configuration() for _ in range(5)]
+    finally:
+        provider.close()
+    assert configs == [{f"L{level}": True} for level in range(5)]
+    assert set(source.threads) == {threading.current_thread()}
+    assert provider.solves == 5
+
+
+def test_batches_are_shared_by_interfaces_of_the_same_model(tmp_path: Path) -> None:
+    # one interface per program, as in a fleet, two of them serve the same model from different files
+    models = [tmp_path / f"model_{number}.uvl" for number in range(3)]
+    for model, threads in zip(models, (3, 3, 4)):
+        model.write_text(synthetic_uvl(threads, 1))
+    interfaces = [Z3ModelInterface(model) for model in models]
+    assert interfaces[0].batch_key == interfaces[1].batch_key != interfaces[2].batch_key
+    batcher = ConfigurationBatcher(window_ms=1000, expected_requests=6)
+    try:
+        futures = [
+            batcher.submit(interface, {"level": level})
+            for level in range(2)
+            for interface in interfaces
+        ]
+        configs = [future.result() for future in futures]
+    finally:
+        batcher.close()
+    assert batcher.requests == 6
+    assert batcher.batches == 2
+    assert configs == [
+        interface.acquire_configuration({"level": level})
+        for level in range(2)
+        for interface in interfaces
+    ]
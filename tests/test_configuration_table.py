@@ -0,0 +1,55 @@
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.configuration_table import ConfigurationTable, OutdatedConfigurationTable, build_configuration_table
+from fmbp.z3_model_interface import Z3ModelInterface
+
+
+DOMAIN = {"level": range(12)}
+
+
+@pytest.fixture
+def model(tmp_path: Path) -> Path:
+    model = tmp_path / "model.uvl"
+    model.write_text(synthetic_uvl(10, 1))
+    return model
+
+
+def test_table_round_trip(model: Path, tmp_path: Path) -> None:
+    path = tmp_path / "model.table"
+    assert build_configuration_table(partial(Z3ModelInterface, model), DOMAIN, path, model, processes=1) == 12
+    interface = Z3ModelInterface(model)
+    table = ConfigurationTable(path, model)
+    try:
+        assert len(table) == 12
+        configs = [table.lookup({"level": level}) for level in DOMAIN["level"]]
+        assert configs == [interface.acquire_configuration({"level": level}) for level in DOMAIN["level"]]
+        # the constraints of the synthetic model disable more b-threads with every level
+        assert len({tuple(sorted(config.items())) for config in configs if config is not None}) > 1
+        assert table.lookup({"level": 12}) is None
+        assert table.lookup({"level": 1, "other": 0}) is None
+    finally:
+        table.close()
+
+
+def test_sampled_table_leaves_other_points_out(model: Path, tmp_path: Path) -> None:
+    path = tmp_path / "model.table"
+    assert build_configuration_table(
+        partial(Z3ModelInterface, model), DOMAIN, path, model, processes=1, sample=4, seed=0,
+    ) == 4
+    table = ConfigurationTable(path, model)
+    try:
+        assert sum(table.lookup({"level": level}) is not None for level in DOMAIN["level"]) == 4
+    finally:
+        table.close()
+
+
+def test_table_of_another_model_is_rejected(model: Path, tmp_path: Path) -> None:
+    path = tmp_path / "model.table"
+    build_configuration_table(partial(Z3ModelInterface, model), DOMAIN, path, model, processes=1)
+    model.write_text(synthetic_uvl(11, 1))
+    with pytest.raises(OutdatedConfigurationTable):
+        ConfigurationTable(path, model)
@@ -0,0 +1,39 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from examples.conformance import DOMAINS
+from fmbp.conformance import check_conformance, domain_contexts
+from fmbp.model_interface import UVLLSPInterface
+from fmbp.z3_model_interface import Z3ModelInterface
+
+
+EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+def uvls_path() -> Path | None:
+    # FMBP_UVLS_PATH or the uvls_path of examples/config.json, see the README
+    if "FMBP_UVLS_PATH" in os.environ:
+        return Path(os.environ["FMBP_UVLS_PATH"])
+    config = EXAMPLES / "config.json"
+    if config.exists():
+        return Path(json.loads(config.read_text())["uvls_path"])
+    return None
+
+
+UVLS = uvls_path()
+
+
+@pytest.mark.skipif(UVLS is None or not UVLS.exists(), reason="uvls is not installed")
+@pytest.mark.parametrize("model", DOMAINS)
+def test_z3_backend_matches_uvls(model: str) -> None:
+    assert UVLS is not None
+    reference = UVLLSPInterface(EXAMPLES / model, UVLS)
+    try:
+        report = check_conformance(reference, Z3ModelInterface(EXAMPLES / model), domain_contexts(DOMAINS[model]))
+    finally:
+        reference.close_uvl()
+    assert report.model_info_matches
+    assert report.mismatches == ()
@@ -0,0 +1,43 @@
+from typing import Any
+
+import pytest
+
+from fmbp.consistency_policy import DisabledConsistencyPolicy, OnChangeConsistencyPolicy, SampledConsistencyPolicy, \
+    StrictConsistencyPolicy
+
+
+def test_strict_and_disabled_policies() -> None:
+    strict = StrictConsistencyPolicy()
+    disabled = DisabledConsistencyPolicy()
+    for model_changed, reconfigured in ((False, False), (True, False), (False, True)):
+        assert strict.should_check(model_changed, reconfigured)
+        assert not disabled.should_check(model_changed, reconfigured)
+    assert (strict.checks, strict.skipped) == (3, 0)
+    assert (disabled.checks, disabled.skipped) == (0, 3)
+
+
+def test_on_change_policy() -> None:
+    policy = OnChangeConsistencyPolicy()
+    assert not policy.should_check(False, False)
+    assert policy.should_check(True, False)
+    assert policy.should_check(False, True)
+
+
+def test_sampled_policy_checks_every_nth_event_and_after_updates() -> None:
+    policy = SampledConsistencyPolicy(every=3)
+    assert [policy.should_check(False, False) for _ in range(6)] == [False, False, True, False, False, True]
+    assert policy.should_check(True, False)
+
+
+def test_sampled_policy_checks_a_fraction() -> None:
+    policy = SampledConsistencyPolicy(fraction=0.25, seed=0)
+    checks = sum(policy.should_check(False, False) for _ in range(4000))
+    assert 800 < checks < 1200
+    assert SampledConsistencyPolicy(fraction=0.25, seed=0).should_check(False, False) == \
+        SampledConsistencyPolicy(fraction=0.25, seed=0).should_check(False, False)
+
+
+@pytest.mark.parametrize("arguments", [{}, {"every": 2, "fraction": 0.5}, {"every": 0}, {"fraction": 1.5}])
+def test_sampled_policy_rejects_invalid_arguments(arguments: dict[str, Any]) -> None:
+    with pytest.raises(ValueError):
+        SampledConsistencyPolicy(**arguments)
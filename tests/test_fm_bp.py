@@ -0,0 +1,57 @@
+import random
+
+from bppy import BEvent, SimpleEventSelectionStrategy, sync
+
+from fmbp.fm_bp import FMBProgram, fm_thread
+
+
+NAMES = [f"T{number}" for number in range(20)]
+
+
+def waiting():
+    while True:
+        yield sync(waitFor=BEvent("NEVER"))
+
+
+def b_program() -> FMBProgram:
+    return FMBProgram(
+        bthreads=[fm_thread(name)(waiting)() for name in NAMES],
+        event_selection_strategy=SimpleEventSelectionStrategy(),
+    )
+
+
+def assert_tickets_match(program: FMBProgram, enabled: set[str]) -> None:
+    assert set(program.active_b_thread_names()) == enabled
+    assert len(program.tickets) == len(enabled)
+    for name in NAMES:
+        assert program.is_enabled(name) == (name in enabled)
+    assert {id(ticket["bt"]) for ticket in program.tickets} == {id(program.get_generator(name)) for name in enabled}
+
+
+def test_enable_and_disable_keep_the_ticket_index() -> None:
+    program = b_program()
+    enabled: set[str] = set()
+    randomness = random.Random(0)
+    for _ in range(200):
+        name = randomness.choice(NAMES)
+        if randomness.random() < 0.5:
+            assert program.enable_b_thread(name) == (name not in enabled)
+            enabled.add(name)
+        else:
+            assert program.disable_b_thread(name) == (name in enabled)
+            enabled.discard(name)
+        assert_tickets_match(program, enabled)
+
+
+def test_apply_configuration_touches_only_changed_b_threads() -> None:
+    program = b_program()
+    assert program.apply_configuration({"T0": True, "T1": True, "T2": False, "Unknown": True}) == (("T0", "T1"), ())
+    assert program.apply_configuration({"T0": True, "T1": False, "T2": True}) == (("T2",), ("T1",))
+    assert_tickets_match(program, {"T0", "T2"})
+
+
+def test_unknown_b_threads_are_ignored() -> None:
+    program = b_program()
+    assert not program.enable_b_thread("Unknown")
+    assert not program.disable_b_thread("Unknown")
+    assert not program.is_enabled("Unknown")
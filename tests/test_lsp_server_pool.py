@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.standin_server import STANDIN_SERVER
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.model_interface import LSPServerPool, UVLLSPInterface, UVLLanguageServer
+
+
+@pytest.fixture(scope="module")
+def pool() -> LSPServerPool:
+    return LSPServerPool(STANDIN_SERVER, 2)
+
+
+def holders(pool: LSPServerPool, model: Path) -> list[UVLLanguageServer]:
+    return [server for server in pool.servers if server.document_version(model.as_uri()) is not None]
+
+
+def test_busy_holders_are_preferred_to_busier_servers(pool: LSPServerPool, tmp_path: Path) -> None:
+    model = tmp_path / "model.uvl"
+    model.write_text(synthetic_uvl(3, 1))
+    interface = UVLLSPInterface(model, pool)
+    (holder,) = holders(pool, model)
+    (other,) = [server for server in pool.servers if server is not holder]
+    holder.load += 2
+    other.load += 1
+    try:
+        # no server is idle, so the document stays where it is open although the other server is less loaded
+        with pool.lease(model.as_uri()) as server:
+            assert server is holder
+    finally:
+        holder.load -= 2
+        other.load -= 1
+    interface.close_uvl()
+    assert holders(pool, model) == []
+
+
+def test_documents_move_to_idle_servers_and_stale_copies_are_closed(pool: LSPServerPool, tmp_path: Path) -> None:
+    model = tmp_path / "model.uvl"
+    model.write_text(synthetic_uvl(3, 1))
+    interface = UVLLSPInterface(model, pool)
+    (holder,) = holders(pool, model)
+    holder.load += 1
+    try:
+        assert interface.acquire_configuration({"level": 0}) is not None
+    finally:
+        holder.load -= 1
+    assert len(holders(pool, model)) == 2
+    # operations stay on the servers knowing the document while they are idle
+    for level in range(5):
+        interface.acquire_configuration({"level": level})
+    assert len(holders(pool, model)) == 2
+    interface.change_uvl(synthetic_uvl(4, 1))
+    (current,) = holders(pool, model)
+    assert current.document_version(model.as_uri()) == 2
+    assert interface.acquire_configuration({"level": 0}) is not None
+    assert holders(pool, model) == [current]
+    interface.close_uvl()
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from fmbp.metrics import CONFIGURATION, SOLVES, STEP, WATCH, Histogram, StepMetrics, step_timer
+
+
+def test_quantiles_interpolate_inside_the_bucket() -> None:
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for _ in range(10):
+        histogram.observe(1.5)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == pytest.approx(2.0)
+
+
+def test_quantiles_across_buckets() -> None:
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for value in (0.5,) * 50 + (3.0,) * 49 + (100.0,):
+        histogram.observe(value)
+    # half of the observations lie in the first bucket, starting at 0
+    assert histogram.quantile(0.25) == pytest.approx(0.5)
+    assert histogram.quantile(0.5) == pytest.approx(1.0)
+    assert histogram.quantile(0.75) == pytest.approx(2.0 + 2.0 * 25 / 49)
+    # the last bucket has no upper bound
+    assert histogram.quantile(0.999) == 4.0
+    assert histogram.count == 100
+    assert histogram.sum == pytest.approx(0.5 * 50 + 3.0 * 49 + 100.0)
+
+
+def test_bucket_bounds() -> None:
+    assert Histogram().quantile(0.5) == 0.0
+    # bounds are inclusive, like the le label of Prometheus
+    histogram = Histogram((1.0, 2.0))
+    histogram.observe(1.0)
+    assert histogram.counts == [1, 0, 0]
+    with pytest.raises(ValueError):
+        Histogram((2.0, 1.0))
+    with pytest.raises(ValueError):
+        Histogram((1.0, 1.0))
+
+
+def test_step_timer_records_laps_and_step(tmp_path: Path) -> None:
+    metrics = StepMetrics()
+    timer = step_timer(metrics)
+    timer.lap(WATCH)
+    timer.lap(CONFIGURATION)
+    timer.stop()
+    metrics.count(SOLVES, 2)
+    for phase in (WATCH, CONFIGURATION, STEP):
+        histogram = metrics.histogram(phase)
+        assert histogram is not None and histogram.count == 1
+    assert metrics.quantile(0.5, STEP) >= metrics.quantile(0.5, WATCH)
+    assert metrics.counter(SOLVES) == 2
+    path = tmp_path / "fmbp.prom"
+    metrics.write_prometheus(path)
+    text = path.read_text()
+    assert 'fmbp_step_phase_seconds_bucket{phase="step",le="+Inf"} 1' in text
+    assert "fmbp_solves_total 2" in text
+
+
+def test_disabled_timer_records_nothing() -> None:
+    timer = step_timer(None)
+    timer.lap(WATCH)
+    timer.stop()
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from benchmarks.standin_server import apply_changes
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.model_interface import _incremental_changes
+
+
+def round_trip(old_text: str, new_text: str) -> str:
+    return apply_changes(old_text, [change.model_dump() for change in _incremental_changes(old_text, new_text)])
+
+
+@pytest.mark.parametrize("old_text, new_text", [
+    ("a\nb\nc\n", "a\nB\nc\n"),
+    ("a\nb\nc\n", "a\nc\n"),
+    ("a\nb\nc\n", "x\na\nb\nc\ny\n"),
+    ("a\nb\nc", "a\nb\nc\nd"),
+    ("a\r\nb\r\n", "a\r\nc\r\n"),
+    ("", "a\n"),
+    ("a\n", ""),
+    ("a\na\na\n", "a\nb\na\na\n"),
+])
+def test_changes_turn_the_old_into_the_new_text(old_text: str, new_text: str) -> None:
+    assert round_trip(old_text, new_text) == new_text
+
+
+def test_random_edits_round_trip() -> None:
+    randomness = random.Random(0)
+    lines = synthetic_uvl(20, 2).splitlines(keepends=True)
+    for _ in range(100):
+        edited = list(lines)
+        for _ in range(randomness.randint(1, 5)):
+            position = randomness.randrange(len(edited) + 1)
+            operation = randomness.choice(("insert", "delete", "replace"))
+            if operation == "insert":
+                edited.insert(position, f"    inserted {randomness.random()}\n")
+            elif position < len(edited):
+                if operation == "delete":
+                    del edited[position]
+                else:
+                    edited[position] = edited[position].replace("true", "false")
+        old_text, new_text = "".join(lines), "".join(edited)
+        assert round_trip(old_text, new_text) == new_text
+        lines = edited
+
+
+def test_unchanged_text_needs_no_changes() -> None:
+    text = synthetic_uvl(5, 1)
+    assert _incremental_changes(text, text) == []
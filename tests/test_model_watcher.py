@@ -0,0 +1,108 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.fm import Attribute, Feature
+from fmbp.model_interface import FileBasedModelInterface
+from fmbp.model_watcher import InotifyUpdatingModelWatcher
+
+
+class SlowModelInterface(FileBasedModelInterface):
+    """
+    Exports one feature named after the model's content, slowly, and remembers the threads that did.
+    """
+    def __init__(self, model: Path, delay: float) -> None:
+        # model is only set once the initial model information has been acquired
+        self.path = model
+        self.delay = delay
+        self.threads: list[threading.Thread] = []
+        super().__init__(model)
+
+    def acquire_configuration(self, context_vars: CONTEXT_DATA | None = None) -> RUNTIME_CONFIG | None:
+        return {}
+
+    def _acquire_model_info(self) -> tuple[Feature, ...]:
+        self.threads.append(threading.current_thread())
+        time.sleep(self.delay)
+        content = self.path.read_text()
+        if content == "defect":
+            raise ValueError("defect model")
+        return (Feature(content, (Attribute("type", "Env"),)),)
+
+    def _update(self) -> None:
+        pass
+
+
+def wait_for_check(watcher: InotifyUpdatingModelWatcher) -> float:
+    """
+    :return: Longest time a check took until one reported an update.
+    """
+    longest = 0.0
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        updated = watcher.check()
+        longest = max(longest, time.perf_counter() - start)
+        if updated:
+            return longest
+        time.sleep(0.005)
+    raise AssertionError("the update was not published")
+
+
+@pytest.fixture
+def model(tmp_path: Path) -> Path:
+    model = tmp_path / "model.uvl"
+    model.write_text("initial")
+    return model
+
+
+def test_updates_are_prepared_in_the_background(model: Path) -> None:
+    interface = SlowModelInterface(model, 0.2)
+    watcher = InotifyUpdatingModelWatcher(interface, debounce_ms=10, poll_interval_ms=10)
+    try:
+        model.write_text("changed")
+        longest = wait_for_check(watcher)
+    finally:
+        watcher.close()
+    assert longest < 0.1
+    assert interface.version == 1
+    assert interface.model_info[0].name == "changed"
+    assert interface.feature_model.features is interface.model_info
+    assert interface.threads[-1] is not threading.current_thread()
+
+
+def test_the_previous_state_is_served_until_the_check(model: Path) -> None:
+    interface = SlowModelInterface(model, 0.0)
+    watcher = InotifyUpdatingModelWatcher(interface, debounce_ms=10, poll_interval_ms=10)
+    try:
+        model.write_text("changed")
+        deadline = time.monotonic() + 5
+        while len(interface.threads) < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        time.sleep(0.05)
+        assert interface.version == 0
+        assert interface.model_info[0].name == "initial"
+        assert watcher.check()
+        assert not watcher.check()
+    finally:
+        watcher.close()
+    assert interface.model_info[0].name == "changed"
+
+
+def test_failed_updates_raise_in_check(model: Path) -> None:
+    interface = SlowModelInterface(model, 0.0)
+    watcher = InotifyUpdatingModelWatcher(interface, debounce_ms=10, poll_interval_ms=10)
+    try:
+        model.write_text("defect")
+        with pytest.raises(ValueError, match="defect model"):
+            wait_for_check(watcher)
+        assert interface.version == 0
+        model.write_text("fixed")
+        wait_for_check(watcher)
+    finally:
+        watcher.close()
+    assert interface.version == 1
+    assert interface.model_info[0].name == "fixed"
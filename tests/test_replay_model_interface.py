@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from fmbp.const import CONTEXT_DATA, RUNTIME_CONFIG
+from fmbp.fm import Attribute, Feature
+from fmbp.model_interface import FileBasedModelInterface
+from fmbp.model_watcher import MTimeUpdatingModelWatcher
+from fmbp.replay_model_interface import NotRecordedError, RecordingModelInterface, ReplayModelInterface
+
+
+class LevelModelInterface(FileBasedModelInterface):
+    """
+    Has one feature per update and rejects negative levels like an unsatisfiable context.
+    """
+    def __init__(self, model: Path) -> None:
+        self.updates = 0
+        super().__init__(model)
+
+    def acquire_configuration(self, context_vars: CONTEXT_DATA | None = None) -> RUNTIME_CONFIG | None:
+        assert context_vars is not None
+        level = context_vars["level"]
+        assert isinstance(level, int)
+        if level < 0:
+            raise ValueError("No SAT solution for this file")
+        return {"High": level > self.updates}
+
+    def _acquire_model_info(self) -> tuple[Feature, ...]:
+        return (Feature(f"F{self.updates}", (Attribute("type", "Env"),)),)
+
+    def _update(self) -> None:
+        self.updates += 1
+
+
+@pytest.fixture
+def model(tmp_path: Path) -> Path:
+    model = tmp_path / "model.uvl"
+    model.write_text("features\n")
+    return model
+
+
+def record(model: Path, log: Path) -> None:
+    recording = RecordingModelInterface(LevelModelInterface(model), log)
+    assert recording.model == model
+    MTimeUpdatingModelWatcher(recording)
+    assert recording.acquire_configuration({"level": 1}) == {"High": True}
+    assert recording.acquire_configurations([{"level": 0}, {"level": 2}]) == ({"High": False}, {"High": True})
+    with pytest.raises(ValueError):
+        recording.acquire_configurations([{"level": 3}, {"level": -1}])
+    recording.update()
+    assert recording.acquire_configuration({"level": 1}) == {"High": False}
+    recording.close()
+
+
+def test_replay_serves_the_recording(model: Path, tmp_path: Path) -> None:
+    log = tmp_path / "run.log"
+    record(model, log)
+    replay = ReplayModelInterface(log, strict=True)
+    assert replay.model_info == (Feature("F0", (Attribute("type", "Env"),)),)
+    assert replay.acquire_configuration({"level": 1}) == {"High": True}
+    assert replay.acquire_configuration({"level": 3}) == {"High": True}
+    with pytest.raises(ValueError, match="No SAT solution"):
+        replay.acquire_configuration({"level": -1})
+    replay.update()
+    assert replay.model_info[0].name == "F1"
+    assert replay.acquire_configuration({"level": 1}) == {"High": False}
+    with pytest.raises(NotRecordedError):
+        replay.acquire_configuration({"level": 2})
+    with pytest.raises(NotRecordedError):
+        replay.update()
+
+
+def test_lenient_replay_returns_none_for_unrecorded_contexts(model: Path, tmp_path: Path) -> None:
+    log = tmp_path / "run.log"
+    record(model, log)
+    replay = ReplayModelInterface(log)
+    assert replay.acquire_configuration({"level": 5}) is None
+    # stays at the last recorded model information
+    replay.update()
+    replay.update()
+    assert replay.model_info[0].name == "F1"
+
+
+def test_truncated_log_is_read_up_to_the_last_complete_record(model: Path, tmp_path: Path) -> None:
+    log = tmp_path / "run.log"
+    record(model, log)
+    log.write_bytes(log.read_bytes()[:-3])
+    replay = ReplayModelInterface(log)
+    assert replay.acquire_configuration({"level": 1}) == {"High": True}
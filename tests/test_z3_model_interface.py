@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import synthetic_uvl
+from fmbp.z3_model_interface import InvalidContextValue, Z3ModelInterface
+
+
+@pytest.fixture
+def interface(tmp_path: Path) -> Z3ModelInterface:
+    model = tmp_path / "model.uvl"
+    model.write_text(synthetic_uvl(3, 1) + "    Env.level < 10\n")
+    return Z3ModelInterface(model)
+
+
+def test_context_values_of_another_type_are_rejected(interface: Z3ModelInterface) -> None:
+    with pytest.raises(InvalidContextValue):
+        interface.acquire_configuration({"level": "high"})
+    # the solver is still usable afterwards
+    assert interface.acquire_configuration({"level": 1}) is not None
+
+
+def test_unsatisfiable_contexts_raise(interface: Z3ModelInterface) -> None:
+    with pytest.raises(ValueError, match="No SAT solution"):
+        interface.acquire_configuration({"level": 20})
+    assert interface.acquire_configuration({"level": True}) == interface.acquire_configuration({"level": 1})